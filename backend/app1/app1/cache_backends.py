@@ -0,0 +1,492 @@
+"""
+Two-Tier Cache Backend
+
+A django-redis backend with a bounded in-process LRU (L1) in front of Redis (L2).
+
+Hot, read-mostly keys (tile configs, timezone/geocode lookups, weather payloads)
+are served from process memory without a Redis round-trip. L1 keeps the encoded
+bytes django-redis read or wrote and decodes them on every hit, so each caller
+gets its own copy, as with any other cache backend, and may mutate it. Writes
+go to both tiers and are broadcast over Redis pub/sub so other workers drop their
+L1 copies. An L1 entry lives no longer than the key has left in Redis (read with
+PTTL in the same pipeline as the GET) and never longer than MAX_TTL, which bounds
+staleness if an invalidation message is ever missed. Nothing is serialized twice:
+the bytes L1 holds (and is sized by) are the ones sent to or read from Redis.
+
+Writes into a caller's pipeline (set(..., client=pipeline)) only land on
+execute(), so they are neither copied to L1 nor broadcast until the caller calls
+commit_pipelined() afterwards; that then publishes one message for all of them.
+
+Configuration (settings.CACHES):
+    "default": {
+        "BACKEND": "app1.cache_backends.TwoTierRedisCache",
+        "LOCATION": REDIS_URL,
+        "OPTIONS": {...},              # passed through to django-redis
+        "L1": {
+            "MAX_ENTRIES": 2048,       # entry budget
+            "MAX_BYTES": 32 * 1024 * 1024,  # encoded-size budget
+            "MAX_TTL": 60,             # L1 lifetime cap in seconds
+            "CHANNEL": "nexus:l1-invalidate",
+            "EXCLUDE_PREFIXES": [...], # keys that must always hit Redis
+        },
+    }
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+# Keys whose semantics rely on Redis atomicity or cross-worker visibility
+DEFAULT_L1_EXCLUDE_PREFIXES = (
+    "cachetag:",    # tag generation counters
+    "cachelock:",   # single-flight locks
+    "cachestats:",  # shared counters
+    "circuit:",     # circuit breaker state
+    "quota:",       # provider quota ledgers
+    "weather_hedge:",  # hedge budget counters
+    "weather_access:",    # last access per weather cell (read by the prefetcher)
+    "weather_prefetch:",  # prefetcher lease
+    "tilelock:",          # map tile fetch locks
+)
+
+
+class LocalLRU:
+    """
+    Thread-safe LRU with an entry budget, a byte budget and per-entry expiry.
+
+    Values are stored as-is (not copied); TwoTierRedisCache stores encoded bytes.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None, size=0):
+        if size > self.max_bytes:
+            self.delete(key)
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+
+class TwoTierRedisCache(RedisCache):
+    """django-redis cache with an in-process LRU tier and pub/sub invalidation."""
+
+    def __init__(self, server, params):
+        params = dict(params)
+        l1_options = params.pop("L1", {}) or {}
+        super().__init__(server, params)
+
+        self._l1 = LocalLRU(
+            max_entries=l1_options.get("MAX_ENTRIES", 2048),
+            max_bytes=l1_options.get("MAX_BYTES", 32 * 1024 * 1024),
+        )
+        self._l1_max_ttl = l1_options.get("MAX_TTL", 60)
+        self._l1_exclude = tuple(l1_options.get("EXCLUDE_PREFIXES", DEFAULT_L1_EXCLUDE_PREFIXES))
+        self._channel = l1_options.get("CHANNEL", "nexus:l1-invalidate")
+
+        self._local = threading.local()   # last encoded values and pending pipelined writes per thread
+        self._origin = uuid.uuid4().hex
+        self._listener = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+        self._stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """django-redis client whose encode() keeps what it wrote (for L1)."""
+        if self._client is None:
+            client = super().client
+            encode = client.encode
+
+            def recording_encode(value):
+                raw = encode(value)
+                self._local.encoded = raw
+                encoded = getattr(self._local, "encoded_many", None)
+                if encoded is not None:
+                    encoded.append(raw)
+                return raw
+
+            client.encode = recording_encode
+        return self._client
+
+    # ==================== L1 HELPERS ====================
+
+    def _l1_eligible(self, key):
+        return not key.startswith(self._l1_exclude)
+
+    def _l1_ttl(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self._l1_max_ttl
+        return min(timeout, self._l1_max_ttl)
+
+    def _l1_ttl_from_pttl(self, pttl):
+        """L1 lifetime for a key with pttl milliseconds left in Redis (-1: no expiry)."""
+        if pttl is None or pttl == -1:
+            return self._l1_max_ttl
+        if pttl < 0:
+            return 0
+        return min(pttl / 1000, self._l1_max_ttl)
+
+    def _l1_store(self, full_key, raw, ttl):
+        """Keep encoded bytes (as django-redis wrote or read them) for ttl seconds."""
+        if ttl is not None and ttl <= 0:
+            self._l1.delete(full_key)
+            return
+        self._ensure_listener()
+        size = len(raw) if isinstance(raw, (bytes, bytearray)) else 8
+        self._l1.set(full_key, raw, ttl, size)
+
+    def _l1_get(self, full_key, missing):
+        """A freshly decoded copy of the L1 entry, or missing."""
+        raw = self._l1.get(full_key, missing)
+        if raw is missing:
+            return missing
+        return self.client.decode(raw)
+
+    def last_encoded(self):
+        """What this thread's most recent write sent to Redis (None before any)."""
+        return getattr(self._local, "encoded", None)
+
+    def last_encoded_size(self):
+        """Encoded bytes of this thread's most recent write (0 before any)."""
+        raw = self.last_encoded()
+        if raw is None:
+            return 0
+        return len(raw) if isinstance(raw, (bytes, bytearray)) else 8
+
+    def _pending(self):
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            pending = self._local.pending = {}
+        return pending
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def tier_stats(self):
+        """
+        Get L1/L2 hit ratios for this process.
+
+        Returns:
+            Dict with hit/miss counts per tier, hit ratios (%) and L1 occupancy
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        l1_total = stats["l1_hits"] + stats["l1_misses"]
+        l2_total = stats["l2_hits"] + stats["l2_misses"]
+        stats["l1_hit_rate"] = round(stats["l1_hits"] / max(l1_total, 1) * 100, 2)
+        stats["l2_hit_rate"] = round(stats["l2_hits"] / max(l2_total, 1) * 100, 2)
+        stats["l1_entries"] = len(self._l1)
+        stats["l1_bytes"] = self._l1.size_bytes
+        return stats
+
+    # ==================== PUB/SUB INVALIDATION ====================
+
+    def _publish(self, keys=None, clear=False):
+        message = {"origin": self._origin}
+        if clear:
+            message["clear"] = True
+        else:
+            message["keys"] = list(keys)
+        try:
+            self.client.get_client(write=True).publish(self._channel, json.dumps(message))
+        except Exception as e:
+            logger.warning(f"L1 invalidation publish failed: {e}")
+
+    def _ensure_listener(self):
+        pid = os.getpid()
+        if self._listener is not None and self._listener.is_alive() and self._listener_pid == pid:
+            return
+        with self._listener_lock:
+            if self._listener is not None and self._listener.is_alive() and self._listener_pid == pid:
+                return
+            if self._listener_pid not in (None, pid):
+                # Forked worker: whatever the parent had in L1 was never subscribed here
+                self._l1.clear()
+            self._listener_pid = pid
+            self._listener = threading.Thread(
+                target=self._listen, name="cache-l1-invalidation", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.client.get_client(write=True).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                # Anything written while we were disconnected may be stale
+                self._l1.clear()
+                backoff = 1
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._handle_message(message.get("data"))
+            except Exception as e:
+                logger.warning(f"L1 invalidation listener error: {e}; reconnecting in {backoff}s")
+                self._l1.clear()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _handle_message(self, data):
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get("origin") == self._origin:
+            return
+        if message.get("clear"):
+            self._l1.clear()
+            return
+        for key in message.get("keys", []):
+            self._l1.delete(key)
+
+    # ==================== CACHE API ====================
+
+    def _l2_read(self, keys, version=None):
+        """
+        Read keys from Redis with their remaining TTL in one pipeline (GET + PTTL each).
+
+        Returns:
+            Dict of key -> (value, pttl in ms, encoded bytes) for the keys found
+        """
+        full_keys = [self.make_key(key, version=version) for key in keys]
+        pipeline = self.client.get_client(write=False).pipeline(transaction=False)
+        for full_key in full_keys:
+            pipeline.get(full_key)
+            pipeline.pttl(full_key)
+        replies = pipeline.execute()
+        found = {}
+        for key, raw, pttl in zip(keys, replies[0::2], replies[1::2]):
+            if raw is not None:
+                found[key] = (self.client.decode(raw), pttl, raw)
+        return found
+
+    def get(self, key, default=None, version=None, client=None):
+        if not self._l1_eligible(key) or client is not None:
+            return super().get(key, default=default, version=version, client=client)
+
+        full_key = self.make_key(key, version=version)
+        missing = object()
+        value = self._l1_get(full_key, missing)
+        if value is not missing:
+            self._count("l1_hits")
+            return value
+        self._count("l1_misses")
+
+        try:
+            found = self._l2_read([key], version=version)
+        except Exception as e:
+            logger.debug(f"L2 read with TTL failed for {key}: {e}")
+            return super().get(key, default=default, version=version)
+        if key not in found:
+            self._count("l2_misses")
+            return default
+        self._count("l2_hits")
+        value, pttl, raw = found[key]
+        self._l1_store(full_key, raw, self._l1_ttl_from_pttl(pttl))
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        if client is not None:
+            return super().get_many(keys, version=version, client=client)
+        result = {}
+        remaining = []
+        for key in keys:
+            if not self._l1_eligible(key):
+                remaining.append(key)
+                continue
+            missing = object()
+            value = self._l1_get(self.make_key(key, version=version), missing)
+            if value is missing:
+                self._count("l1_misses")
+                remaining.append(key)
+            else:
+                self._count("l1_hits")
+                result[key] = value
+
+        if remaining:
+            try:
+                found = self._l2_read(remaining, version=version)
+            except Exception as e:
+                logger.debug(f"L2 read with TTL failed: {e}")
+                result.update(super().get_many(remaining, version=version))
+                return result
+            self._count("l2_hits", len(found))
+            self._count("l2_misses", len(remaining) - len(found))
+            for key, (value, pttl, raw) in found.items():
+                if self._l1_eligible(key):
+                    self._l1_store(self.make_key(key, version=version), raw, self._l1_ttl_from_pttl(pttl))
+                result[key] = value
+        return result
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        result = super().set(key, value, timeout=timeout, version=version, client=client, nx=nx, xx=xx)
+        if not self._l1_eligible(key):
+            return result
+        full_key = self.make_key(key, version=version)
+        self._l1.delete(full_key)
+        conditional = nx or xx   # the stored value may not be ours
+        if client is not None:
+            # Lands on the caller's execute(); commit_pipelined() then fills L1 and publishes
+            entry = None if conditional else (self.last_encoded(), self._l1_ttl(timeout))
+            self._pending()[full_key] = entry
+            return result
+        if not conditional:
+            self._l1_store(full_key, self.last_encoded(), self._l1_ttl(timeout))
+        self._publish([full_key])
+        return result
+
+    def commit_pipelined(self, stored=True):
+        """
+        Finish the writes this thread queued with set(..., client=pipeline).
+
+        Call after the pipeline's execute(): copies the values to L1 (unless
+        stored is False, e.g. execute() raised) and publishes one invalidation
+        for all their keys.
+        """
+        pending = self._pending()
+        self._local.pending = {}
+        if not pending:
+            return
+        if stored:
+            for full_key, entry in pending.items():
+                if entry is not None:
+                    self._l1_store(full_key, *entry)
+        self._publish(list(pending))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().add(key, value, timeout=timeout, version=version, client=client)
+        if result and self._l1_eligible(key):
+            full_key = self.make_key(key, version=version)
+            self._l1_store(full_key, self.last_encoded(), self._l1_ttl(timeout))
+            self._publish([full_key])
+        return result
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        # django-redis encodes the values in order, each recorded here
+        self._local.encoded_many = []
+        try:
+            result = super().set_many(data, timeout=timeout, version=version, client=client)
+            encoded = self._local.encoded_many
+        finally:
+            self._local.encoded_many = None
+        full_keys = []
+        for key, raw in zip(data, encoded):
+            if self._l1_eligible(key):
+                full_key = self.make_key(key, version=version)
+                self._l1_store(full_key, raw, self._l1_ttl(timeout))
+                full_keys.append(full_key)
+        if full_keys:
+            self._publish(full_keys)
+        return result
+
+    def _drop(self, keys, version=None):
+        full_keys = [self.make_key(key, version=version) for key in keys if self._l1_eligible(key)]
+        for full_key in full_keys:
+            self._l1.delete(full_key)
+        if full_keys:
+            self._publish(full_keys)
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        result = super().delete(key, version=version, prefix=prefix, client=client)
+        self._drop([key], version=version)
+        return result
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, client=client)
+        self._drop(keys, version=version)
+        return result
+
+    def incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        result = super().incr(key, delta=delta, version=version, client=client, ignore_key_check=ignore_key_check)
+        self._drop([key], version=version)
+        return result
+
+    def decr(self, key, delta=1, version=None, client=None):
+        result = super().decr(key, delta=delta, version=version, client=client)
+        self._drop([key], version=version)
+        return result
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        # L1 lifetime is capped independently; nothing to refresh locally
+        return super().touch(key, timeout=timeout, version=version, client=client)
+
+    def delete_pattern(self, *args, **kwargs):
+        result = super().delete_pattern(*args, **kwargs)
+        self._l1.clear()
+        self._publish(clear=True)
+        return result
+
+    def clear(self):
+        result = super().clear()
+        self._l1.clear()
+        self._publish(clear=True)
+        return result
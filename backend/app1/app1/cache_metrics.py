@@ -0,0 +1,256 @@
+"""
+Per-Prefix Cache Metrics
+
+Counts hits, misses, sets, stored sizes and get latency per cache key prefix
+(the part of the key before the first ":", e.g. "financials_timeline" or
+"weather_combined"), so the effectiveness of each cache can be judged on its own.
+
+Counters live in process memory and are flushed to Redis hashes
+("cachestats:prefix:<prefix>") every FLUSH_INTERVAL seconds by a background
+thread, so recording costs a dict update rather than a round-trip.
+Without Redis (e.g. the LocMem fallback) the per-process totals are reported.
+
+Set sizes come from the cache backend when it reports the encoded bytes it wrote
+(the two-tier backend does); otherwise one set in SIZE_SAMPLE_EVERY is pickled to
+estimate them, so values are not serialized a second time on every write.
+
+Usage:
+    from app1.cache_metrics import metered_get, metered_set
+
+    cached = metered_get(cache_key)
+    if cached is None:
+        data = fetch()
+        metered_set(cache_key, data, ttl)
+"""
+
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY_PREFIX = "cachestats:prefix"
+PREFIX_INDEX_KEY = "cachestats:prefixes"
+FLUSH_INTERVAL = 10             # seconds between flushes to Redis
+METRICS_RETENTION = 7 * 86400   # Redis hashes expire a week after the last flush
+SIZE_SAMPLE_EVERY = 16          # sets pickled for a size estimate when the backend can't say
+
+_pending = defaultdict(Counter)   # prefix -> counts not yet flushed
+_totals = defaultdict(Counter)    # prefix -> counts for this process's lifetime
+_lock = threading.Lock()
+_flusher = None
+_flusher_pid = None
+
+_MISSING = object()
+
+
+def key_prefix(key: str) -> str:
+    """Metrics bucket for a cache key: everything before the first ":"."""
+    return key.split(":", 1)[0]
+
+
+def _approx_size(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "ignore"))
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def written_size() -> Optional[int]:
+    """Encoded bytes of this thread's last cache write, if the backend reports it."""
+    last_encoded_size = getattr(cache, "last_encoded_size", None)
+    return last_encoded_size() if last_encoded_size else None
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception as e:  # never let the flusher die
+            logger.debug(f"Cache metrics flush failed: {e}")
+
+
+def _ensure_flusher() -> None:
+    global _flusher, _flusher_pid
+    pid = os.getpid()
+    if _flusher is not None and _flusher_pid == pid:
+        return
+    with _lock:
+        if _flusher is not None and _flusher_pid == pid:
+            return
+        # (Re)started after a fork: threads don't survive it
+        _flusher_pid = pid
+        _flusher = threading.Thread(target=_flush_loop, name="cache-metrics-flush", daemon=True)
+        _flusher.start()
+
+
+def _record(prefix: str, **counts) -> None:
+    _ensure_flusher()
+    with _lock:
+        pending = _pending[prefix]
+        totals = _totals[prefix]
+        for name, amount in counts.items():
+            pending[name] += amount
+            totals[name] += amount
+
+
+def record_get(key: str, hit: bool, elapsed: float, prefix: Optional[str] = None) -> None:
+    """Record a cache lookup that took elapsed seconds."""
+    _record(
+        prefix or key_prefix(key),
+        **{"hits" if hit else "misses": 1, "get_us": int(elapsed * 1_000_000)},
+    )
+
+
+def record_set(key: str, value: Any, prefix: Optional[str] = None, size: Optional[int] = None) -> None:
+    """
+    Record a cache write and the size of the stored value.
+
+    Args:
+        size: Encoded bytes written, if known; otherwise every SIZE_SAMPLE_EVERY-th
+            write of a prefix is pickled for an estimate and the rest count without a size
+    """
+    prefix = prefix or key_prefix(key)
+    if size is None and _totals[prefix]["sets"] % SIZE_SAMPLE_EVERY == 0:
+        size = _approx_size(value)
+    if size is None:
+        _record(prefix, sets=1)
+    else:
+        _record(prefix, sets=1, sized_sets=1, set_bytes=size)
+
+
+def metered_get(key: str, default: Any = None, prefix: Optional[str] = None) -> Any:
+    """cache.get() that records a hit/miss and the lookup latency."""
+    started = time.perf_counter()
+    value = cache.get(key, _MISSING)
+    record_get(key, value is not _MISSING, time.perf_counter() - started, prefix)
+    return default if value is _MISSING else value
+
+
+def metered_set(key: str, value: Any, timeout: Optional[int] = None, prefix: Optional[str] = None) -> None:
+    """cache.set() that records the write and its size."""
+    cache.set(key, value, timeout)
+    record_set(key, value, prefix, size=written_size())
+
+
+def _redis_client():
+    client = getattr(cache, "client", None)
+    if client is None or not hasattr(client, "get_client"):
+        return None
+    try:
+        return client.get_client(write=True)
+    except Exception:
+        return None
+
+
+def flush() -> bool:
+    """
+    Push pending counters to Redis.
+
+    Returns:
+        True if counters were written (or there was nothing to write)
+    """
+    with _lock:
+        pending = {prefix: counts for prefix, counts in _pending.items() if counts}
+        _pending.clear()
+    if not pending:
+        return True
+
+    redis_client = _redis_client()
+    if redis_client is None:
+        return False
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for prefix, counts in pending.items():
+            hash_key = f"{METRICS_KEY_PREFIX}:{prefix}"
+            for name, amount in counts.items():
+                pipe.hincrby(hash_key, name, amount)
+            pipe.expire(hash_key, METRICS_RETENTION)
+            pipe.sadd(PREFIX_INDEX_KEY, prefix)
+        pipe.expire(PREFIX_INDEX_KEY, METRICS_RETENTION)
+        pipe.execute()
+        return True
+    except Exception as e:
+        logger.debug(f"Cache metrics flush failed: {e}")
+        # Keep the counts for the next attempt
+        with _lock:
+            for prefix, counts in pending.items():
+                _pending[prefix].update(counts)
+        return False
+
+
+def _summarize(counts: dict) -> dict:
+    hits = int(counts.get("hits", 0))
+    misses = int(counts.get("misses", 0))
+    sets = int(counts.get("sets", 0))
+    sized_sets = int(counts.get("sized_sets", sets))   # older hashes sized every set
+    gets = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / gets * 100, 2) if gets else 0,
+        "sets": sets,
+        "avg_set_bytes": int(counts.get("set_bytes", 0)) // sized_sets if sized_sets else 0,
+        "avg_get_ms": round(int(counts.get("get_us", 0)) / gets / 1000, 3) if gets else 0,
+    }
+
+
+def get_prefix_stats() -> dict:
+    """
+    Get per-prefix cache metrics, aggregated across workers when Redis is available.
+
+    Returns:
+        Dict of prefix -> {hits, misses, hit_rate, sets, avg_set_bytes, avg_get_ms}
+    """
+    redis_client = _redis_client() if flush() else None
+    if redis_client is not None:
+        try:
+            prefixes = sorted(
+                p.decode() if isinstance(p, bytes) else p
+                for p in redis_client.smembers(PREFIX_INDEX_KEY)
+            )
+            pipe = redis_client.pipeline(transaction=False)
+            for prefix in prefixes:
+                pipe.hgetall(f"{METRICS_KEY_PREFIX}:{prefix}")
+            stats = {}
+            for prefix, raw in zip(prefixes, pipe.execute()):
+                counts = {
+                    (k.decode() if isinstance(k, bytes) else k): int(v) for k, v in raw.items()
+                }
+                stats[prefix] = _summarize(counts)
+            return stats
+        except Exception as e:
+            logger.debug(f"Cache metrics read failed: {e}")
+
+    with _lock:
+        return {prefix: _summarize(counts) for prefix, counts in sorted(_totals.items())}
+
+
+def reset_prefix_stats() -> None:
+    """Clear in-process counters and the flushed Redis hashes."""
+    with _lock:
+        _pending.clear()
+        _totals.clear()
+    redis_client = _redis_client()
+    if redis_client is None:
+        return
+    try:
+        prefixes = redis_client.smembers(PREFIX_INDEX_KEY)
+        keys = [
+            f"{METRICS_KEY_PREFIX}:{p.decode() if isinstance(p, bytes) else p}" for p in prefixes
+        ]
+        redis_client.delete(PREFIX_INDEX_KEY, *keys)
+    except Exception as e:
+        logger.debug(f"Cache metrics reset failed: {e}")
@@ -0,0 +1,182 @@
+"""
+Compact Cache Serializer
+
+A django-redis serializer that stores plain JSON-shaped values (dicts with string
+keys, lists, strings, numbers, booleans, None) as msgpack or JSON instead of
+pickle, and compresses payloads above a size threshold with zstd or zlib.
+
+Weather and dashboard payloads repeat the same string keys on every row, so they
+shrink substantially once compressed. Values that are not plain JSON (Decimals,
+datetimes, tuples, model instances...) keep using pickle so nothing is lost.
+
+Every entry starts with a two-byte header (magic byte + codec byte) recording
+how it was encoded; entries written before this serializer (raw pickle) and
+entries written with a different codec configuration still decode.
+
+Configuration (settings.CACHES["default"]["OPTIONS"]):
+    "SERIALIZER": "app1.cache_serializers.CompactSerializer",
+    "COMPACT_SERIALIZER": {
+        "FORMAT": "msgpack",        # or "json"; msgpack falls back to json if not installed
+        "COMPRESSOR": "zstd",       # or "zlib"; zstd falls back to zlib if not installed
+        "THRESHOLD": 1024,          # compress payloads larger than this many bytes
+        "LEVEL": 3,
+    }
+
+Optional dependencies: msgpack, zstandard.
+"""
+
+import json
+import logging
+import pickle
+import zlib
+from typing import Any
+
+from django_redis.serializers.base import BaseSerializer
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_warned = set()
+
+
+def _warn_missing(package: str, fallback: str) -> None:
+    """Log once per process that a configured codec is unavailable."""
+    if package not in _warned:
+        _warned.add(package)
+        logger.warning(f"{package} not installed; compact cache serializer using {fallback}")
+
+
+# Header layout: MAGIC, then (format << 4) | compression
+MAGIC = 0xC7
+
+FORMAT_PICKLE = 0
+FORMAT_JSON = 1
+FORMAT_MSGPACK = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+FORMAT_NAMES = {FORMAT_PICKLE: "pickle", FORMAT_JSON: "json", FORMAT_MSGPACK: "msgpack"}
+COMPRESSION_NAMES = {COMPRESSION_NONE: "none", COMPRESSION_ZLIB: "zlib", COMPRESSION_ZSTD: "zstd"}
+
+_PLAIN_SCALARS = (str, int, float, bool, type(None))
+
+
+def is_plain(value: Any) -> bool:
+    """
+    Check whether a value round-trips through JSON/msgpack unchanged.
+
+    Dict/list subclasses (e.g. DRF's ReturnDict) count as plain; they come back
+    as the base type, which every consumer of cached data already handles.
+    """
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _PLAIN_SCALARS):
+            continue
+        if isinstance(item, dict):
+            for key, val in item.items():
+                if type(key) is not str:
+                    return False
+                if not isinstance(val, _PLAIN_SCALARS):
+                    stack.append(val)
+        elif isinstance(item, list):
+            stack.extend(val for val in item if not isinstance(val, _PLAIN_SCALARS))
+        else:
+            return False
+    return True
+
+
+class CompactSerializer(BaseSerializer):
+    """msgpack/JSON + zstd/zlib serializer with a codec header and pickle fallback."""
+
+    def __init__(self, options) -> None:
+        super().__init__(options=options)
+        config = options.get("COMPACT_SERIALIZER", {}) or {}
+
+        fmt = config.get("FORMAT", "msgpack")
+        if fmt == "msgpack" and msgpack is None:
+            _warn_missing("msgpack", "JSON")
+            fmt = "json"
+        self.format = FORMAT_MSGPACK if fmt == "msgpack" else FORMAT_JSON
+
+        compressor = config.get("COMPRESSOR", "zstd")
+        if compressor == "zstd" and zstandard is None:
+            _warn_missing("zstandard", "zlib")
+            compressor = "zlib"
+        self.compression = COMPRESSION_ZSTD if compressor == "zstd" else COMPRESSION_ZLIB
+
+        self.threshold = int(config.get("THRESHOLD", 1024))
+        self.level = int(config.get("LEVEL", 3 if self.compression == COMPRESSION_ZSTD else 6))
+        self._pickle_version = int(options.get("PICKLE_VERSION", pickle.HIGHEST_PROTOCOL))
+
+    # ==================== ENCODE ====================
+
+    def _encode_body(self, value):
+        if is_plain(value):
+            try:
+                if self.format == FORMAT_MSGPACK:
+                    return FORMAT_MSGPACK, msgpack.packb(value, use_bin_type=True)
+                return FORMAT_JSON, json.dumps(
+                    value, separators=(",", ":"), ensure_ascii=False, allow_nan=True
+                ).encode("utf-8")
+            except (TypeError, ValueError, OverflowError):
+                # e.g. integers beyond msgpack's 64-bit range
+                pass
+        return FORMAT_PICKLE, pickle.dumps(value, self._pickle_version)
+
+    def _compress(self, body):
+        if len(body) <= self.threshold:
+            return COMPRESSION_NONE, body
+        if self.compression == COMPRESSION_ZSTD:
+            return COMPRESSION_ZSTD, zstandard.ZstdCompressor(level=self.level).compress(body)
+        return COMPRESSION_ZLIB, zlib.compress(body, self.level)
+
+    def dumps(self, value: Any) -> bytes:
+        fmt, body = self._encode_body(value)
+        compression, body = self._compress(body)
+        return bytes((MAGIC, (fmt << 4) | compression)) + body
+
+    # ==================== DECODE ====================
+
+    def loads(self, value: bytes) -> Any:
+        value = bytes(value)
+        if len(value) < 2 or value[0] != MAGIC:
+            # Written before the compact serializer: plain pickle
+            return pickle.loads(value)
+
+        fmt, compression = value[1] >> 4, value[1] & 0x0F
+        body = value[2:]
+
+        if compression == COMPRESSION_ZLIB:
+            body = zlib.decompress(body)
+        elif compression == COMPRESSION_ZSTD:
+            if zstandard is None:
+                raise ValueError("Cache entry is zstd-compressed but zstandard is not installed")
+            body = zstandard.ZstdDecompressor().decompress(body)
+
+        if fmt == FORMAT_MSGPACK:
+            if msgpack is None:
+                raise ValueError("Cache entry is msgpack-encoded but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False)
+        if fmt == FORMAT_JSON:
+            return json.loads(body)
+        return pickle.loads(body)
+
+
+def describe(value: bytes) -> str:
+    """Describe the codec of a stored entry, e.g. "json+zlib" or "legacy-pickle"."""
+    value = bytes(value)
+    if len(value) < 2 or value[0] != MAGIC:
+        return "legacy-pickle"
+    return f"{FORMAT_NAMES.get(value[1] >> 4, '?')}+{COMPRESSION_NAMES.get(value[1] & 0x0F, '?')}"
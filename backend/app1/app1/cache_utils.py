@@ -3,25 +3,63 @@ Redis Cache Utilities for Django
 
 Provides reusable decorators and helpers for caching API responses and function results.
 Designed to work with django-redis and reduce external API/database calls.
+
+Tag invalidation:
+    Cached entries can be registered under one or more tags (e.g. "user:42:financials").
+    Each tag has a generation counter stored in the cache; the current generations are
+    folded into the entry's key, so bumping a tag makes every dependent key miss at once
+    without scanning Redis for matching keys.
 """
 
 import hashlib
 import json
 import logging
 import functools
-from typing import Any, Callable, Optional, Union
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, Tuple, Union
 
 from django.conf import settings
 from django.core.cache import cache
-from django.http import HttpRequest
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.text import compress_string
 from rest_framework.response import Response
 from rest_framework.request import Request
 
+from .cache_metrics import metered_get, metered_set, record_get, record_set, written_size
+
 logger = logging.getLogger(__name__)
 
 # Default TTL if not specified (15 minutes)
 DEFAULT_TTL = 900
 
+# Namespace for tag generation counters
+TAG_KEY_PREFIX = "cachetag"
+
+# Single-flight defaults
+LOCK_KEY_PREFIX = "cachelock"
+SINGLE_FLIGHT_LOCK_TTL = 30     # Upper bound on a recompute holding the lock
+SINGLE_FLIGHT_WAIT = 5.0        # How long followers wait for the leader's result
+SINGLE_FLIGHT_POLL = 0.05       # Poll interval while waiting on another worker
+XFETCH_BETA = 1.0               # >1 recomputes earlier, <1 later
+
+# Stale-while-revalidate background refresh pool size
+REVALIDATE_WORKERS = 4
+
+# Rendered responses smaller than this are not worth a gzip variant
+# (same threshold as django.middleware.gzip.GZipMiddleware)
+RENDERED_GZIP_MIN_SIZE = 200
+
+_accepts_gzip_re = re.compile(r"\bgzip\b")
+
 
 def generate_cache_key(*args, prefix: str = "nexus", **kwargs) -> str:
     """
@@ -33,7 +71,7 @@ def generate_cache_key(*args, prefix: str = "nexus", **kwargs) -> str:
         **kwargs: Keyword arguments to include in key
     
     Returns:
-        MD5 hash-based cache key
+        Cache key of the form "<prefix>:<md5 of arguments>"
     """
     # Build key components
     key_parts = [prefix]
@@ -49,9 +87,9 @@ def generate_cache_key(*args, prefix: str = "nexus", **kwargs) -> str:
         if val is not None:
             key_parts.append(f"{key}={val}")
     
-    # Join and hash
+    # Join and hash, keeping the prefix readable for pattern matching
     key_string = ":".join(key_parts)
-    return hashlib.md5(key_string.encode()).hexdigest()
+    return f"{prefix}:{hashlib.md5(key_string.encode()).hexdigest()}"
 
 
 def get_request_cache_key(
@@ -91,13 +129,650 @@ def get_request_cache_key(
             key_parts.append("&".join(param_items))
     
     key_string = ":".join(key_parts)
-    return hashlib.md5(key_string.encode()).hexdigest()
+    return f"{prefix}:{hashlib.md5(key_string.encode()).hexdigest()}"
+
+
+# ==================== TAG INVALIDATION ====================
+
+def user_tag(user, scope: str) -> str:
+    """
+    Build the tag for a user-scoped resource.
+    
+    Args:
+        user: User instance or user ID
+        scope: Resource scope (e.g., "financials", "subscriptions")
+    
+    Returns:
+        Tag string such as "user:42:financials"
+    """
+    user_id = getattr(user, 'pk', user)
+    return f"user:{user_id}:{scope}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"{TAG_KEY_PREFIX}:{tag}"
+
+
+def _new_tag_version() -> int:
+    # Seed from the clock so a counter that was evicted and recreated can
+    # never fall back to a generation that older entries were stored under.
+    return int(time.time() * 1000)
+
+
+def get_tag_versions(tags: Iterable[str]) -> dict:
+    """
+    Get the current generation of each tag, creating missing counters.
+    
+    Args:
+        tags: Tags to look up
+    
+    Returns:
+        Dict mapping tag -> generation
+    """
+    keys = {_tag_key(tag): tag for tag in tags}
+    if not keys:
+        return {}
+    
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, tag in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = _new_tag_version()
+            # add() keeps a counter created concurrently by another worker
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions[tag] = version
+    return versions
+
+
+def versioned_cache_key(base_key: str, tags: Optional[Iterable[str]] = None) -> str:
+    """
+    Fold the current tag generations into a cache key.
+    
+    Args:
+        base_key: Key identifying the cached entry
+        tags: Tags the entry depends on
+    
+    Returns:
+        base_key unchanged when there are no tags, otherwise base_key
+        suffixed with a digest of the tag generations
+    """
+    return f"{base_key}{_tag_suffix(tags)}"
+
+
+def _tag_suffix(tags: Optional[Iterable[str]]) -> str:
+    """Key suffix encoding the current generations of tags ("" without tags)."""
+    tags = sorted(set(tags or []))
+    if not tags:
+        return ""
+    
+    versions = get_tag_versions(tags)
+    stamp = "|".join(f"{tag}={versions[tag]}" for tag in tags)
+    return f":t{hashlib.md5(stamp.encode()).hexdigest()[:16]}"
+
+
+def invalidate_tags(*tags: str) -> None:
+    """
+    Invalidate every cache entry registered under the given tags.
+    
+    Bumps each tag's generation counter; dependent keys simply stop being
+    read and expire on their own TTL.
+    
+    Args:
+        *tags: Tags to invalidate
+    """
+    for tag in tags:
+        key = _tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter never created (or evicted): a fresh one differs from any old generation
+            cache.set(key, _new_tag_version(), None)
+        except Exception as e:
+            logger.error(f"Failed to invalidate cache tag {tag}: {e}")
+            continue
+        logger.debug(f"Cache tag invalidated: {tag}")
+
+
+def _resolve_tags(tags, *args, **kwargs) -> list:
+    """Resolve a static tag list or a callable returning tags."""
+    if not tags:
+        return []
+    if callable(tags):
+        return list(tags(*args, **kwargs) or [])
+    return list(tags)
+
+
+def _resolve_request_tags(tags, request, *args, **kwargs) -> list:
+    """
+    Resolve view tags. Static tags may use a "{user_id}" placeholder;
+    callables receive the request and the view arguments.
+    """
+    if not tags:
+        return []
+    if callable(tags):
+        return list(tags(request, *args, **kwargs) or [])
+    user = getattr(request, 'user', None)
+    user_id = user.pk if user is not None and user.is_authenticated else 'anon'
+    return [tag.format(user_id=user_id) for tag in tags]
+
+
+def register_tag_invalidation(model, scope: str, owner_path: str) -> None:
+    """
+    Invalidate a user-scoped tag whenever instances of a model change.
+    
+    Connects post_save/post_delete handlers that resolve the owning user
+    through owner_path and bump user_tag(owner, scope).
+    
+    Args:
+        model: Model class to watch
+        scope: Tag scope (e.g., "financials")
+        owner_path: Dotted attribute path to the owner's ID (e.g., "account.owner_id")
+    
+    Usage:
+        register_tag_invalidation(AccountSnapshot, "financials", "account.owner_id")
+    """
+    from django.db.models.signals import post_save, post_delete
+    
+    def _handler(sender, instance, **kwargs):
+        try:
+            owner_id = functools.reduce(getattr, owner_path.split('.'), instance)
+        except Exception:
+            # Related row already gone (e.g., during a cascade delete)
+            return
+        if owner_id is not None:
+            invalidate_tags(user_tag(owner_id, scope))
+    
+    uid = f"cache_tags:{scope}:{model._meta.label}"
+    post_save.connect(_handler, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(_handler, sender=model, weak=False, dispatch_uid=uid)
+
+
+# ==================== SINGLE-FLIGHT ====================
+
+# In-process coordination: one threading.Event per key being recomputed
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Counters: leader / coalesced / early_recompute / wait_timeout. Kept per process
+# and mirrored into the cache so `cache_manage stats` sees every worker.
+SINGLE_FLIGHT_COUNTERS = ('leader', 'coalesced', 'early_recompute', 'wait_timeout')
+STATS_KEY_PREFIX = "cachestats:single_flight"
+_single_flight_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _single_flight_stats[name] += 1
+    key = f"{STATS_KEY_PREFIX}:{name}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+    except Exception:
+        pass
+
+
+def get_single_flight_stats() -> dict:
+    """
+    Get single-flight counters.
+    
+    Returns:
+        Dict with leader (recomputes), coalesced (requests served by another
+        caller's recompute), early_recompute (XFetch refreshes) and
+        wait_timeout (followers that gave up waiting) counts across all
+        workers, plus this process's own counts under "process"
+    """
+    with _stats_lock:
+        process = {name: _single_flight_stats[name] for name in SINGLE_FLIGHT_COUNTERS}
+    try:
+        shared = cache.get_many([f"{STATS_KEY_PREFIX}:{name}" for name in SINGLE_FLIGHT_COUNTERS])
+    except Exception:
+        shared = {}
+    stats = {
+        name: shared.get(f"{STATS_KEY_PREFIX}:{name}", process[name])
+        for name in SINGLE_FLIGHT_COUNTERS
+    }
+    stats['process'] = process
+    return stats
+
+
+def _acquire_lock(cache_key: str, timeout: int) -> Optional[str]:
+    """Try to take the cross-worker recompute lock; returns a token on success."""
+    token = uuid.uuid4().hex
+    try:
+        # add() is SET NX on Redis and an atomic check-and-set on LocMem
+        if cache.add(f"{LOCK_KEY_PREFIX}:{cache_key}", token, timeout):
+            return token
+    except Exception as e:
+        logger.warning(f"Cache lock unavailable for {cache_key}: {e}")
+        return token
+    return None
+
+
+def _release_lock(cache_key: str, token: str) -> None:
+    lock_key = f"{LOCK_KEY_PREFIX}:{cache_key}"
+    try:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+    except Exception:
+        pass
+
+
+def _unwrap_envelope(entry):
+    """Return the envelope dict, or None for misses and legacy plain values."""
+    if isinstance(entry, dict) and 'expires_at' in entry and 'value' in entry:
+        return entry
+    return None
+
+
+def _should_recompute_early(envelope: dict, now: float, beta: float) -> bool:
+    """
+    XFetch: recompute before expiry with a probability that grows as expiry
+    approaches, scaled by how long the value took to compute.
+    """
+    delta = envelope.get('delta') or 0
+    if delta <= 0 or beta <= 0:
+        return now >= envelope['expires_at']
+    return now - delta * beta * math.log(1.0 - random.random()) >= envelope['expires_at']
+
+
+class Uncached:
+    """
+    Return Uncached(value) from a single-flight/revalidate compute to hand the
+    value to the caller without storing it (e.g. a partial result). A stale
+    entry being revalidated is kept rather than overwritten.
+    """
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = value
+
+
+def _compute_and_store(cache_key: str, compute: Callable, ttl: int, stale_ttl: int = 0):
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    if isinstance(value, Uncached):
+        return value.value
+    if value is not None:
+        now = time.time()
+        envelope = {
+            'value': value,
+            'stored_at': now,
+            'expires_at': now + ttl,
+            'delta': delta,
+        }
+        # Keep the entry past its logical expiry so it can be served stale
+        metered_set(cache_key, envelope, ttl + stale_ttl)
+    return value
+
+
+def single_flight_get_or_set(
+    cache_key: str,
+    compute: Callable,
+    ttl: int = DEFAULT_TTL,
+    beta: float = XFETCH_BETA,
+    lock_ttl: int = SINGLE_FLIGHT_LOCK_TTL,
+    wait_timeout: float = SINGLE_FLIGHT_WAIT,
+    stale_ttl: int = 0,
+):
+    """
+    Get a cached value, letting exactly one caller recompute it on a miss.
+    
+    Values are stored in an envelope recording their logical expiry and how
+    long they took to compute, which drives probabilistic early recomputation
+    (XFetch): shortly before expiry one caller refreshes the entry while the
+    others keep getting the current value. On a hard miss, the leader holds a
+    short cache lock (plus an in-process event for threads in the same worker)
+    and followers wait for its result instead of recomputing.
+    
+    Args:
+        cache_key: Cache key
+        compute: Zero-argument callable returning the value (None and
+            Uncached(...) are not cached)
+        ttl: Time to live in seconds
+        beta: XFetch aggressiveness (0 disables early recomputation)
+        lock_ttl: Expiry of the recompute lock in seconds
+        wait_timeout: Seconds a follower waits before computing on its own
+        stale_ttl: Extra seconds the entry is retained after expiry (see
+            get_or_revalidate)
+    
+    Returns:
+        Tuple of (value, hit) where hit is False when this caller computed it
+    """
+    envelope = _unwrap_envelope(metered_get(cache_key))
+    if envelope is not None:
+        if not _should_recompute_early(envelope, time.time(), beta):
+            return envelope['value'], True
+        # Early refresh: one caller recomputes, everyone else keeps the current value
+        token = _acquire_lock(cache_key, lock_ttl)
+        if token is None:
+            return envelope['value'], True
+        _count('early_recompute')
+        try:
+            value = _compute_and_store(cache_key, compute, ttl, stale_ttl)
+        finally:
+            _release_lock(cache_key, token)
+        return value, False
+    
+    # Hard miss: coalesce threads in this process first
+    with _inflight_lock:
+        event = _inflight.get(cache_key)
+        is_leader = event is None
+        if is_leader:
+            event = threading.Event()
+            _inflight[cache_key] = event
+    
+    if not is_leader:
+        event.wait(wait_timeout)
+        envelope = _unwrap_envelope(cache.get(cache_key))
+        if envelope is not None:
+            _count('coalesced')
+            return envelope['value'], True
+        _count('wait_timeout')
+        return _compute_and_store(cache_key, compute, ttl, stale_ttl), False
+    
+    try:
+        # Then coalesce across workers with a short cache lock
+        token = _acquire_lock(cache_key, lock_ttl)
+        if token is None:
+            deadline = time.monotonic() + wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(SINGLE_FLIGHT_POLL)
+                envelope = _unwrap_envelope(cache.get(cache_key))
+                if envelope is not None:
+                    _count('coalesced')
+                    return envelope['value'], True
+            _count('wait_timeout')
+            return _compute_and_store(cache_key, compute, ttl, stale_ttl), False
+        
+        _count('leader')
+        try:
+            return _compute_and_store(cache_key, compute, ttl, stale_ttl), False
+        finally:
+            _release_lock(cache_key, token)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(cache_key, None)
+        event.set()
+
+
+# ==================== STALE-WHILE-REVALIDATE ====================
+
+_revalidate_executor = None
+_revalidate_executor_lock = threading.Lock()
+
+
+def _get_revalidate_executor() -> ThreadPoolExecutor:
+    global _revalidate_executor
+    with _revalidate_executor_lock:
+        if _revalidate_executor is None:
+            _revalidate_executor = ThreadPoolExecutor(
+                max_workers=REVALIDATE_WORKERS,
+                thread_name_prefix="cache-revalidate",
+            )
+        return _revalidate_executor
+
+
+def run_in_background(cache_key: str, task: Callable[[], Any]) -> bool:
+    """
+    Run task on the revalidation pool unless another worker is already
+    refreshing cache_key (same cross-worker lock as single-flight recomputes).
+    
+    Returns:
+        True if the task was queued
+    """
+    token = _acquire_lock(cache_key, SINGLE_FLIGHT_LOCK_TTL)
+    if token is None:
+        return False
+    
+    def run():
+        from django.db import close_old_connections
+        
+        close_old_connections()
+        try:
+            task()
+            logger.debug(f"Cache REVALIDATED: {cache_key}")
+        except Exception as e:
+            logger.error(f"Background revalidation failed for {cache_key}: {e}")
+        finally:
+            _release_lock(cache_key, token)
+            close_old_connections()
+    
+    try:
+        _get_revalidate_executor().submit(run)
+    except RuntimeError:
+        # Interpreter shutting down
+        _release_lock(cache_key, token)
+        return False
+    return True
+
+
+def schedule_revalidation(cache_key: str, compute: Callable, ttl: int, stale_ttl: int) -> bool:
+    """
+    Refresh an entry in the background unless another worker already is.
+    
+    For callers that read envelopes themselves (e.g. through get_many) and found
+    one past expires_at; get_or_revalidate does this for single keys.
+    
+    Returns:
+        True if a refresh was queued
+    """
+    return run_in_background(cache_key, lambda: _compute_and_store(cache_key, compute, ttl, stale_ttl))
+
+
+def refresh_cached(cache_key: str, compute: Callable, ttl: int, stale_ttl: int = 0) -> Any:
+    """
+    Recompute an entry read through get_or_revalidate/single_flight_get_or_set and
+    store it unconditionally (e.g. when warming caches).
+    
+    Returns:
+        The computed value (None values are not stored)
+    """
+    return _compute_and_store(cache_key, compute, ttl, stale_ttl)
+
+
+def get_or_revalidate(
+    cache_key: str,
+    compute: Callable,
+    ttl: int = DEFAULT_TTL,
+    stale_ttl: int = 0,
+):
+    """
+    Get a cached value, serving expired entries while they are refreshed.
+    
+    Like HTTP stale-while-revalidate: for stale_ttl seconds after expiry the
+    old value is returned immediately and a background thread recomputes it.
+    Hard misses fall back to single_flight_get_or_set.
+    
+    Args:
+        cache_key: Cache key
+        compute: Zero-argument callable returning the value (None is not cached).
+            Runs on a worker thread when revalidating, so it must not depend on
+            thread-local state.
+        ttl: Seconds the value is fresh
+        stale_ttl: Seconds an expired value may still be served
+    
+    Returns:
+        Tuple of (value, state, age) where state is "HIT", "STALE" or "MISS"
+        and age is the entry's age in seconds
+    """
+    envelope = _unwrap_envelope(metered_get(cache_key))
+    if envelope is not None:
+        now = time.time()
+        age = max(0, int(now - envelope.get('stored_at', now)))
+        if now < envelope['expires_at']:
+            return envelope['value'], 'HIT', age
+        if stale_ttl:
+            schedule_revalidation(cache_key, compute, ttl, stale_ttl)
+            return envelope['value'], 'STALE', age
+    
+    value, hit = single_flight_get_or_set(cache_key, compute, ttl, stale_ttl=stale_ttl)
+    return value, ('HIT' if hit else 'MISS'), 0
+
+
+# ==================== BATCH OPERATIONS ====================
+
+def get_many(keys: Iterable[str]) -> dict:
+    """
+    Fetch several keys in one round-trip (MGET on Redis).
+    
+    Args:
+        keys: Cache keys
+    
+    Returns:
+        Dict of key -> value for the keys that were found
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    
+    started = time.perf_counter()
+    try:
+        found = cache.get_many(keys)
+    except Exception as e:
+        logger.warning(f"Cache get_many failed: {e}")
+        found = {}
+    elapsed = (time.perf_counter() - started) / len(keys)
+    for key in keys:
+        record_get(key, key in found, elapsed)
+    return found
+
+
+def _redis_pipeline():
+    client = getattr(cache, 'client', None)
+    if client is None or not hasattr(client, 'get_client'):
+        return None
+    try:
+        return client.get_client(write=True).pipeline(transaction=False)
+    except Exception:
+        return None
+
+
+def set_many(values: dict, ttl: int = DEFAULT_TTL, ttls: Optional[dict] = None) -> None:
+    """
+    Store several keys in one round-trip, each with its own TTL.
+    
+    On Redis the writes share a single pipeline; with the two-tier backend the
+    L1 copies and one invalidation for all keys follow its execute(). Other
+    backends fall back to one set_many() call per distinct TTL.
+    
+    Args:
+        values: Dict of key -> value
+        ttl: Default TTL in seconds
+        ttls: Optional dict of key -> TTL overriding the default
+    """
+    if not values:
+        return
+    ttls = ttls or {}
+    
+    sizes = {}
+    commit = getattr(cache, 'commit_pipelined', None)
+    try:
+        pipeline = _redis_pipeline()
+        if pipeline is not None:
+            for key, value in values.items():
+                cache.set(key, value, ttls.get(key, ttl), client=pipeline)
+                sizes[key] = written_size()
+            try:
+                pipeline.execute()
+            except Exception:
+                if commit:
+                    commit(stored=False)
+                raise
+            if commit:
+                commit()
+        else:
+            by_ttl = {}
+            for key, value in values.items():
+                by_ttl.setdefault(ttls.get(key, ttl), {})[key] = value
+            for group_ttl, group in by_ttl.items():
+                cache.set_many(group, group_ttl)
+    except Exception as e:
+        logger.warning(f"Cache set_many failed: {e}")
+        return
+    
+    for key, value in values.items():
+        record_set(key, value, size=sizes.get(key))
+
+
+def cached_fragments(
+    sections: dict,
+    prefix: str,
+    key_parts: Iterable = (),
+    tags: Optional[Iterable[str]] = None,
+    ttl: int = DEFAULT_TTL,
+) -> dict:
+    """
+    Fetch a set of independently cached sections in one round-trip.
+    
+    Every section is looked up with a single get_many(); only the missing ones
+    are computed, and those are written back with one set_many(). Sections
+    computing to None are returned but not cached.
+    
+    Args:
+        sections: Dict of name -> compute callable, or name -> (compute, ttl)
+        prefix: Key prefix; each section is keyed "<prefix>.<name>"
+        key_parts: Values identifying the owner/variant (e.g. user id, range)
+        tags: Tags the sections depend on (see versioned_cache_key)
+        ttl: Default TTL for sections without their own
+    
+    Returns:
+        Dict of name -> section value
+    
+    Usage:
+        data = cached_fragments(
+            {
+                'summary': service.get_dashboard_summary,
+                'forecast': (lambda: service.get_forecast(12), 3600),
+            },
+            prefix="financials_dashboard",
+            key_parts=[user.id],
+            tags=[user_tag(user, "financials")],
+        )
+    """
+    suffix = _tag_suffix(tags)
+    key_parts = list(key_parts)
+    keys = {}
+    computes = {}
+    section_ttls = {}
+    for name, section in sections.items():
+        compute, section_ttl = section if isinstance(section, tuple) else (section, ttl)
+        keys[name] = generate_cache_key(*key_parts, prefix=f"{prefix}.{name}") + suffix
+        computes[name] = compute
+        section_ttls[name] = section_ttl
+    
+    found = get_many(keys.values())
+    
+    result = {}
+    to_store = {}
+    store_ttls = {}
+    for name, key in keys.items():
+        if key in found:
+            result[name] = found[key]
+            continue
+        value = computes[name]()
+        result[name] = value
+        if value is not None:
+            to_store[key] = value
+            store_ttls[key] = section_ttls[name]
+    
+    if to_store:
+        set_many(to_store, ttl, store_ttls)
+    logger.debug(f"Fragments {prefix}: {len(found)} hit, {len(to_store)} computed")
+    return result
 
 
 def cached_result(
     ttl: int = DEFAULT_TTL,
     prefix: str = "func",
     key_func: Optional[Callable] = None,
+    tags: Optional[Union[Iterable[str], Callable]] = None,
+    single_flight: bool = False,
 ):
     """
     Decorator to cache function results.
@@ -106,30 +781,51 @@ def cached_result(
         ttl: Time to live in seconds
         prefix: Cache key prefix
         key_func: Custom function to generate cache key from args/kwargs
+        tags: Tags to register the result under, or a callable taking the
+            function's args/kwargs and returning them
+        single_flight: Coalesce concurrent recomputes of the same key and
+            refresh hot keys early (see single_flight_get_or_set)
     
     Usage:
         @cached_result(ttl=300, prefix="weather")
         def get_weather(lat, lng):
             # expensive operation
             return weather_data
+        
+        @cached_result(ttl=3600, prefix="summary", tags=lambda user: [user_tag(user, "financials")])
+        def get_summary(user):
+            ...
     """
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            # Generate cache key
+        def build_key(*args, **kwargs):
             if key_func:
-                cache_key = key_func(*args, **kwargs)
+                base_key = key_func(*args, **kwargs)
             else:
-                cache_key = generate_cache_key(
+                base_key = generate_cache_key(
                     func.__module__,
                     func.__name__,
                     *args,
                     prefix=prefix,
                     **kwargs
                 )
+            return versioned_cache_key(base_key, _resolve_tags(tags, *args, **kwargs))
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Generate cache key
+            cache_key = build_key(*args, **kwargs)
+            
+            if single_flight:
+                result, hit = single_flight_get_or_set(
+                    cache_key, lambda: func(*args, **kwargs), ttl
+                )
+                logger.debug(
+                    f"Cache {'HIT' if hit else 'MISS'}: {cache_key[:20]}... (func: {func.__name__})"
+                )
+                return result
             
             # Try to get from cache
-            cached = cache.get(cache_key)
+            cached = metered_get(cache_key)
             if cached is not None:
                 logger.debug(f"Cache HIT: {cache_key[:20]}... (func: {func.__name__})")
                 return cached
@@ -140,28 +836,112 @@ def cached_result(
             
             # Store in cache
             if result is not None:
-                cache.set(cache_key, result, ttl)
+                metered_set(cache_key, result, ttl)
                 logger.debug(f"Cache SET: {cache_key[:20]}... TTL={ttl}s")
             
             return result
         
         # Attach cache utilities to the wrapper
-        wrapper.cache_key = lambda *a, **kw: (
-            key_func(*a, **kw) if key_func 
-            else generate_cache_key(func.__module__, func.__name__, *a, prefix=prefix, **kw)
-        )
+        wrapper.cache_key = build_key
         wrapper.invalidate = lambda *a, **kw: cache.delete(wrapper.cache_key(*a, **kw))
         
         return wrapper
     return decorator
 
 
+def _etag_matches(request, etag: str) -> bool:
+    """Weak If-None-Match comparison (W/"x" matches "x"), as RFC 9110 requires for GET."""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    client_etags = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+    return etag.removeprefix('W/') in client_etags or '*' in client_etags
+
+
+def _accepts_rendered(request) -> bool:
+    """Whether the negotiated renderer produces JSON (browsable API etc. are not cached as bytes)."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    return getattr(renderer, 'format', None) == 'json'
+
+
+def _is_rendered_entry(entry) -> bool:
+    return isinstance(entry, dict) and isinstance(entry.get('body'), bytes) and 'etag' in entry
+
+
+def _render_entry(view, request, response) -> Optional[dict]:
+    """
+    Render a DRF response once and package it for the cache.
+    
+    The entry holds the final JSON bytes, a strong ETag over them and, for larger
+    bodies, a pre-compressed gzip variant, so hits skip rendering, ETagMiddleware
+    hashing and GZipMiddleware compression.
+    """
+    if response.status_code != 200 or not _accepts_rendered(request):
+        return None
+    
+    renderer = request.accepted_renderer
+    media_type = request.accepted_media_type
+    context = view.get_renderer_context() if hasattr(view, 'get_renderer_context') else {}
+    context['response'] = response
+    body = renderer.render(response.data, media_type, context)
+    if isinstance(body, str):
+        body = body.encode(renderer.charset or 'utf-8')
+    
+    content_type = media_type
+    if renderer.charset:
+        content_type = f"{media_type}; charset={renderer.charset}"
+    
+    gzipped = None
+    if len(body) >= RENDERED_GZIP_MIN_SIZE:
+        gzipped = compress_string(body)
+        if len(gzipped) >= len(body):
+            gzipped = None
+    
+    return {
+        'body': body,
+        'gzip': gzipped,
+        'etag': f'"{hashlib.md5(body).hexdigest()}"',
+        'content_type': content_type,
+        'status': response.status_code,
+    }
+
+
+def _rendered_response(request, entry) -> HttpResponse:
+    """
+    Build a raw HttpResponse from a rendered cache entry.
+    
+    Answers If-None-Match with a 304 and serves the gzip variant to clients that
+    accept it (marked Content-Encoding so GZipMiddleware leaves it alone).
+    """
+    etag = entry['etag']
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if entry.get('gzip') and _accepts_gzip_re.search(accept_encoding):
+        response = HttpResponse(entry['gzip'], content_type=entry['content_type'], status=entry['status'])
+        response['Content-Encoding'] = 'gzip'
+        response['ETag'] = f'W/{etag}'
+        patch_vary_headers(response, ('Accept-Encoding',))
+    else:
+        response = HttpResponse(entry['body'], content_type=entry['content_type'], status=entry['status'])
+        response['ETag'] = etag
+    response['Content-Length'] = str(len(response.content))
+    return response
+
+
 def cached_api_view(
     ttl: int = DEFAULT_TTL,
     key_prefix: str = "api",
     include_user: bool = False,
     param_whitelist: Optional[list] = None,
     cache_headers: bool = True,
+    tags: Optional[Union[Iterable[str], Callable]] = None,
+    single_flight: bool = False,
+    stale_ttl: int = 0,
+    rendered: bool = False,
 ):
     """
     Decorator for caching DRF APIView GET responses.
@@ -172,46 +952,75 @@ def cached_api_view(
         include_user: Include user ID in cache key
         param_whitelist: Only include these query params in key
         cache_headers: Add Cache-Control headers to response
+        tags: Tags to register the response under. Strings may contain a
+            "{user_id}" placeholder; a callable receives (request, *args, **kwargs)
+        single_flight: Coalesce concurrent misses so only one request runs the
+            view, and refresh hot keys early (see single_flight_get_or_set)
+        stale_ttl: Serve expired responses for this many seconds while the view
+            re-runs in the background (X-Cache: STALE). Implies single_flight.
+            Under conditional_get the ETag then also tracks the entry's build
+            time, since a refresh can change the body without any tag changing.
+        rendered: Cache the rendered JSON bytes with a precomputed ETag and gzip
+            variant, and serve hits as a raw HttpResponse (no response.data).
+            Only JSON-negotiated requests are cached in this mode.
     
     Usage:
         class WeatherView(APIView):
             @cached_api_view(ttl=300, key_prefix="weather")
             def get(self, request):
                 return Response(data)
+        
+        class SummaryView(APIView):
+            @cached_api_view(ttl=600, key_prefix="summary", include_user=True,
+                             tags=["user:{user_id}:financials"])
+            def get(self, request):
+                ...
     """
     def decorator(view_method: Callable) -> Callable:
+        def request_cache_key(request, *args, **kwargs):
+            return versioned_cache_key(
+                get_request_cache_key(
+                    request,
+                    prefix=key_prefix,
+                    include_user=include_user,
+                    param_whitelist=param_whitelist,
+                ),
+                _resolve_request_tags(tags, request, *args, **kwargs),
+            )
+        
         @functools.wraps(view_method)
         def wrapper(self, request, *args, **kwargs):
+            if rendered and not _accepts_rendered(request):
+                # e.g. the browsable API; cached bytes would be the wrong format
+                return view_method(self, request, *args, **kwargs)
+            
             # Generate cache key from request
-            cache_key = get_request_cache_key(
-                request,
-                prefix=key_prefix,
-                include_user=include_user,
-                param_whitelist=param_whitelist,
-            )
+            cache_key = request_cache_key(request, *args, **kwargs)
+            
+            if single_flight or stale_ttl:
+                return _single_flight_view(self, request, args, kwargs, cache_key)
             
             # Try to get from cache
-            cached = cache.get(cache_key)
+            cached = metered_get(cache_key)
             if cached is not None:
-                logger.info(f"API Cache HIT: {key_prefix}:{cache_key[:12]}...")
-                response = Response(cached['data'], status=cached.get('status', 200))
+                logger.info(f"API Cache HIT: {cache_key}")
+                response = _entry_response(request, cached)
                 if cache_headers:
                     response['Cache-Control'] = f'public, max-age={ttl}'
                     response['X-Cache'] = 'HIT'
                 return response
             
             # Cache miss - call view
-            logger.info(f"API Cache MISS: {key_prefix}:{cache_key[:12]}...")
+            logger.info(f"API Cache MISS: {cache_key}")
             response = view_method(self, request, *args, **kwargs)
             
             # Only cache successful GET responses
-            if response.status_code == 200:
-                cache_data = {
-                    'data': response.data,
-                    'status': response.status_code,
-                }
-                cache.set(cache_key, cache_data, ttl)
-                logger.debug(f"API Cache SET: {key_prefix}:{cache_key[:12]}... TTL={ttl}s")
+            cache_data = _make_entry(self, request, response) if response.status_code == 200 else None
+            if cache_data is not None:
+                metered_set(cache_key, cache_data, ttl)
+                logger.debug(f"API Cache SET: {cache_key} TTL={ttl}s")
+                if rendered:
+                    response = _rendered_response(request, cache_data)
             
             # Add cache headers
             if cache_headers:
@@ -220,6 +1029,202 @@ def cached_api_view(
             
             return response
         
+        def _make_entry(self, request, response):
+            if rendered:
+                return _render_entry(self, request, response)
+            return {'data': response.data, 'status': response.status_code}
+        
+        def _entry_response(request, entry):
+            if _is_rendered_entry(entry):
+                return _rendered_response(request, entry)
+            return Response(entry['data'], status=entry.get('status', 200))
+        
+        def _single_flight_view(self, request, args, kwargs, cache_key):
+            computed = {}
+            
+            def compute():
+                response = view_method(self, request, *args, **kwargs)
+                computed['response'] = response
+                if response.status_code != 200:
+                    return None
+                return _make_entry(self, request, response)
+            
+            cached, cache_state, age = get_or_revalidate(cache_key, compute, ttl, stale_ttl)
+            # Served from cache unless this request ran the view itself (a
+            # STALE hit's refresh runs on another thread and is not ours)
+            response = computed.get('response') if cache_state == 'MISS' else None
+            if response is not None and rendered and cached is not None:
+                response = _rendered_response(request, cached)
+            elif response is None:
+                response = _entry_response(request, cached)
+                if cache_state == 'MISS':
+                    # Another request's recompute finished while we waited
+                    cache_state = 'HIT'
+            else:
+                cache_state = 'MISS'
+            logger.info(f"API Cache {cache_state}: {cache_key}")
+            
+            if cache_headers:
+                response['Cache-Control'] = f'public, max-age={ttl}'
+                response['X-Cache'] = cache_state
+                if cache_state != 'MISS':
+                    response['Age'] = str(age)
+            return response
+        
+        if stale_ttl:
+            # Lets conditional_get version its ETag by the entry (see there)
+            wrapper.swr_cache_key = request_cache_key
+        return wrapper
+    return decorator
+
+
+# ==================== CONDITIONAL GET ====================
+
+def resource_etag(
+    request,
+    tags: Iterable[str],
+    max_age: Optional[int] = None,
+    stamp: Optional[float] = None,
+) -> str:
+    """
+    Build a version-based validator for a request without running the view.
+    
+    The ETag covers the path, query string, user and negotiated media type plus
+    the current generations of the resource's tags, so any invalidate_tags()
+    call (e.g. from register_tag_invalidation signal handlers) changes it.
+    
+    Args:
+        request: Incoming request (authenticated)
+        tags: Tags whose generations version the resource
+        max_age: Also roll the validator over every max_age seconds, for views
+            whose output depends on the current time as well as stored data
+        stamp: Build time of the cached entry serving the resource, so a
+            background refresh that changes the body changes the validator
+    
+    Returns:
+        Weak ETag string, e.g. 'W/"v-<md5>"'
+    """
+    user = getattr(request, 'user', None)
+    versions = get_tag_versions(tags)
+    parts = [
+        request.path,
+        sorted(request.GET.lists()),
+        user.pk if user is not None and user.is_authenticated else None,
+        getattr(request, 'accepted_media_type', None),
+        sorted(versions.items()),
+    ]
+    if max_age:
+        parts.append(int(time.time() // max_age))
+    if stamp is not None:
+        parts.append(stamp)
+    digest = hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest()
+    return f'W/"v-{digest}"'
+
+
+def _conditional_response(
+    request,
+    etag: Optional[str],
+    respond: Callable,
+    current_etag: Optional[Callable] = None,
+):
+    """
+    Return 304 if the client already has etag, otherwise respond() tagged with it.
+    
+    etag=None never matches. current_etag, when given, is called after respond()
+    to tag the response with the validator of what was actually served.
+    """
+    if etag is not None and _etag_matches(request, etag):
+        logger.debug(f"Conditional GET 304: {request.path}")
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    
+    response = respond()
+    if response.status_code == 200:
+        # Replaces any content hash so the client revalidates against the version
+        response['ETag'] = current_etag() if current_etag is not None else etag
+    return response
+
+
+def _entry_stamp(cache_key: str) -> Tuple[Optional[float], bool]:
+    """Build time of the SWR envelope under cache_key and whether it is still fresh."""
+    try:
+        envelope = _unwrap_envelope(cache.get(cache_key))
+    except Exception:
+        envelope = None
+    if envelope is None:
+        return None, False
+    return envelope.get('stored_at'), time.time() < envelope['expires_at']
+
+
+def _stamped_conditional_response(request, tags, max_age, cache_key: str, respond: Callable):
+    """
+    Conditional GET for a resource served through get_or_revalidate.
+    
+    Tag generations alone miss a refresh that changes the body (time-dependent
+    data), so the ETag also covers the entry's build time. Expired entries never
+    get a 304: the request has to reach the view to schedule the refresh.
+    """
+    stamp, fresh = _entry_stamp(cache_key)
+    if stamp is not None:
+        # The view will serve this entry (fresh or stale), even if a background
+        # refresh replaces it before the response is tagged
+        served_etag = resource_etag(request, tags, max_age, stamp)
+        return _conditional_response(request, served_etag if fresh else None, respond, lambda: served_etag)
+    return _conditional_response(
+        request,
+        None,
+        respond,
+        lambda: resource_etag(request, tags, max_age, _entry_stamp(cache_key)[0]),
+    )
+
+
+def conditional_get(
+    tags: Union[Iterable[str], Callable],
+    max_age: Optional[int] = None,
+):
+    """
+    Decorator answering If-None-Match from tag generations before the view runs.
+    
+    Polled endpoints get a 304 for the cost of one cache round-trip, without
+    touching the database or upstream services. Works on APIView methods and
+    @api_view functions; non-GET/HEAD requests pass straight through.
+    
+    Args:
+        tags: Tags versioning the resource ("{user_id}" placeholder or callable,
+            as for cached_api_view)
+        max_age: Roll the validator over every max_age seconds (see resource_etag)
+    
+    Usage:
+        class FullDashboardView(APIView):
+            @conditional_get(tags=["user:{user_id}:financials"], max_age=600)
+            @cached_api_view(ttl=600, key_prefix="dashboard", include_user=True)
+            def get(self, request):
+                ...
+    """
+    def decorator(view_func: Callable) -> Callable:
+        @functools.wraps(view_func)
+        def wrapper(*args, **kwargs):
+            # Function views get the request first, view methods get self first
+            is_method = not isinstance(args[0], (HttpRequest, Request))
+            request = args[1] if is_method else args[0]
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(*args, **kwargs)
+            
+            view_args = args[2:] if is_method else args[1:]
+            tag_list = _resolve_request_tags(tags, request, *view_args, **kwargs)
+            swr_cache_key = getattr(view_func, 'swr_cache_key', None)
+            if swr_cache_key is not None:
+                return _stamped_conditional_response(
+                    request,
+                    tag_list,
+                    max_age,
+                    swr_cache_key(request, *view_args, **kwargs),
+                    lambda: view_func(*args, **kwargs),
+                )
+            etag = resource_etag(request, tag_list, max_age)
+            return _conditional_response(request, etag, lambda: view_func(*args, **kwargs))
+        
         return wrapper
     return decorator
 
@@ -234,17 +1239,33 @@ class CacheableMixin:
         cache_list: Whether to cache list action (default: True)
         cache_retrieve: Whether to cache retrieve action (default: True)
         cache_per_user: Cache per-user for list (default: True)
+        cache_scope: Scope of the per-user tag, "user:<id>:<scope>" (default: prefix)
+        cache_stale_ttl: Seconds to keep serving an expired entry while it is
+            refreshed in the background (default: 0, disabled)
+        cache_rendered: Cache rendered JSON bytes with an ETag and gzip variant
+            and serve hits as a raw HttpResponse (default: False)
+        cache_conditional: Answer If-None-Match from the cache tags' generations
+            before querying the database (default: False, see conditional_get)
+    
+    Cached entries are tagged with the prefix and, when cached per user, with the
+    user's scope tag, so writes elsewhere (e.g. signal handlers registered through
+    register_tag_invalidation) invalidate them too.
     
     Usage:
         class AccountViewSet(CacheableMixin, viewsets.ModelViewSet):
             cache_ttl = 300
             cache_prefix = "accounts"
+            cache_scope = "financials"
     """
     cache_ttl = 300
     cache_prefix = None
     cache_list = True
     cache_retrieve = True
     cache_per_user = True
+    cache_scope = None
+    cache_stale_ttl = 0
+    cache_rendered = False
+    cache_conditional = False
     
     def _get_cache_prefix(self):
         """Get cache prefix, defaulting to model name."""
@@ -254,106 +1275,160 @@ class CacheableMixin:
             return self.queryset.model.__name__.lower()
         return 'viewset'
     
+    def _get_cache_tags(self, request=None):
+        """Tags for this viewset's entries: the prefix plus the user's scope tag."""
+        tags = [self._get_cache_prefix()]
+        if (
+            self.cache_per_user
+            and request is not None
+            and request.user.is_authenticated
+        ):
+            tags.append(user_tag(request.user, self.cache_scope or self._get_cache_prefix()))
+        return tags
+    
     def _get_list_cache_key(self, request):
         """Generate cache key for list action."""
-        return get_request_cache_key(
+        base_key = get_request_cache_key(
             request,
             prefix=f"{self._get_cache_prefix()}:list",
             include_user=self.cache_per_user,
         )
+        return versioned_cache_key(base_key, self._get_cache_tags(request))
     
     def _get_retrieve_cache_key(self, request, pk):
         """Generate cache key for retrieve action."""
-        key_parts = [self._get_cache_prefix(), "detail", str(pk)]
+        key_parts = ["detail", str(pk)]
         if self.cache_per_user and request.user.is_authenticated:
             key_parts.append(f"user:{request.user.id}")
-        return generate_cache_key(*key_parts)
+        base_key = generate_cache_key(*key_parts, prefix=self._get_cache_prefix())
+        return versioned_cache_key(base_key, self._get_cache_tags(request))
     
-    def list(self, request, *args, **kwargs):
-        if not self.cache_list:
-            return super().list(request, *args, **kwargs)
+    def _make_cache_entry(self, response):
+        if self.cache_rendered:
+            return _render_entry(self, self.request, response)
+        return response.data
+    
+    def _cached_response(self, entry):
+        if _is_rendered_entry(entry):
+            return _rendered_response(self.request, entry)
+        return Response(entry)
+    
+    def _cached_action(self, cache_key, label, fetch):
+        """Serve a list/retrieve response from cache, calling fetch() on a miss."""
+        if self.cache_rendered and not _accepts_rendered(self.request):
+            return fetch()
+        
+        if self.cache_stale_ttl:
+            computed = {}
+            
+            def compute():
+                response = fetch()
+                computed['response'] = response
+                return self._make_cache_entry(response) if response.status_code == 200 else None
+            
+            data, cache_state, age = get_or_revalidate(
+                cache_key, compute, self.cache_ttl, self.cache_stale_ttl
+            )
+            response = computed.get('response') if cache_state == 'MISS' else None
+            if response is not None and self.cache_rendered and data is not None:
+                response = self._cached_response(data)
+            elif response is None:
+                response = self._cached_response(data)
+                response['Age'] = str(age)
+                if cache_state == 'MISS':
+                    cache_state = 'HIT'
+            else:
+                cache_state = 'MISS'
+            response['X-Cache'] = cache_state
+            logger.info(f"ViewSet Cache {cache_state}: {label}")
+            return response
         
-        cache_key = self._get_list_cache_key(request)
-        cached = cache.get(cache_key)
+        cached = metered_get(cache_key)
         
         if cached is not None:
-            logger.info(f"ViewSet Cache HIT: {self._get_cache_prefix()}:list")
-            return Response(cached)
+            logger.info(f"ViewSet Cache HIT: {label}")
+            return self._cached_response(cached)
         
-        response = super().list(request, *args, **kwargs)
+        response = fetch()
         
-        if response.status_code == 200:
-            cache.set(cache_key, response.data, self.cache_ttl)
-            logger.debug(f"ViewSet Cache SET: {self._get_cache_prefix()}:list TTL={self.cache_ttl}s")
+        entry = self._make_cache_entry(response) if response.status_code == 200 else None
+        if entry is not None:
+            metered_set(cache_key, entry, self.cache_ttl)
+            logger.debug(f"ViewSet Cache SET: {label} TTL={self.cache_ttl}s")
+            if self.cache_rendered:
+                response = self._cached_response(entry)
         
         return response
     
+    def _conditional_action(self, request, respond, get_cache_key):
+        """Short-circuit to 304 when the client's ETag matches the tags' generations."""
+        if not self.cache_conditional:
+            return respond()
+        tags = self._get_cache_tags(request)
+        if self.cache_stale_ttl:
+            return _stamped_conditional_response(
+                request, tags, self.cache_ttl, get_cache_key(), respond
+            )
+        etag = resource_etag(request, tags, self.cache_ttl)
+        return _conditional_response(request, etag, respond)
+    
+    def list(self, request, *args, **kwargs):
+        if not self.cache_list:
+            return super().list(request, *args, **kwargs)
+        
+        parent_list = super().list
+        get_cache_key = lambda: self._get_list_cache_key(request)
+        return self._conditional_action(request, lambda: self._cached_action(
+            get_cache_key(),
+            f"{self._get_cache_prefix()}:list",
+            lambda: parent_list(request, *args, **kwargs),
+        ), get_cache_key)
+    
     def retrieve(self, request, *args, **kwargs):
         if not self.cache_retrieve:
             return super().retrieve(request, *args, **kwargs)
         
-        pk = kwargs.get('pk') or args[0] if args else None
-        cache_key = self._get_retrieve_cache_key(request, pk)
-        cached = cache.get(cache_key)
-        
-        if cached is not None:
-            logger.info(f"ViewSet Cache HIT: {self._get_cache_prefix()}:detail:{pk}")
-            return Response(cached)
-        
-        response = super().retrieve(request, *args, **kwargs)
-        
-        if response.status_code == 200:
-            cache.set(cache_key, response.data, self.cache_ttl)
-            logger.debug(f"ViewSet Cache SET: {self._get_cache_prefix()}:detail:{pk} TTL={self.cache_ttl}s")
-        
-        return response
+        lookup_kwarg = getattr(self, 'lookup_url_kwarg', None) or getattr(self, 'lookup_field', 'pk')
+        pk = kwargs.get(lookup_kwarg) or (args[0] if args else None)
+        parent_retrieve = super().retrieve
+        get_cache_key = lambda: self._get_retrieve_cache_key(request, pk)
+        return self._conditional_action(request, lambda: self._cached_action(
+            get_cache_key(),
+            f"{self._get_cache_prefix()}:detail:{pk}",
+            lambda: parent_retrieve(request, *args, **kwargs),
+        ), get_cache_key)
     
-    def invalidate_list_cache(self, request=None):
+    def invalidate_cache(self, request=None):
         """
-        Invalidate list cache. Call after create/update/delete.
-        If request is provided, invalidates for that user.
+        Invalidate list and detail caches. Call after create/update/delete.
+        If request is provided, invalidates for that user; otherwise for everyone.
         """
         if request and self.cache_per_user and request.user.is_authenticated:
-            # Invalidate user-specific list cache
-            pattern = f"{self._get_cache_prefix()}:list:user:{request.user.id}*"
-            self._delete_pattern(pattern)
+            # Bump the user's scope tag (also drops dependent dashboard caches)
+            invalidate_tags(user_tag(request.user, self.cache_scope or self._get_cache_prefix()))
         else:
-            # Invalidate all list caches for this viewset
-            pattern = f"{self._get_cache_prefix()}:list*"
-            self._delete_pattern(pattern)
+            # Bump the viewset-wide tag
+            invalidate_tags(self._get_cache_prefix())
     
-    def invalidate_detail_cache(self, pk, request=None):
-        """Invalidate detail cache for a specific object."""
-        cache_key = self._get_retrieve_cache_key(request, pk) if request else generate_cache_key(
-            self._get_cache_prefix(), "detail", str(pk)
-        )
-        cache.delete(cache_key)
+    def invalidate_list_cache(self, request=None):
+        """Invalidate list cache. List and detail entries share tags."""
+        self.invalidate_cache(request)
     
-    def _delete_pattern(self, pattern):
-        """Delete all keys matching pattern (Redis only)."""
-        try:
-            # django-redis supports delete_pattern
-            if hasattr(cache, 'delete_pattern'):
-                cache.delete_pattern(f"*{pattern}")
-            else:
-                logger.warning("Cache backend does not support pattern deletion")
-        except Exception as e:
-            logger.error(f"Failed to delete cache pattern {pattern}: {e}")
+    def invalidate_detail_cache(self, pk, request=None):
+        """Invalidate detail cache. List and detail entries share tags."""
+        self.invalidate_cache(request)
     
     def perform_create(self, serializer):
         super().perform_create(serializer)
-        self.invalidate_list_cache(self.request)
+        self.invalidate_cache(self.request)
     
     def perform_update(self, serializer):
         super().perform_update(serializer)
-        self.invalidate_list_cache(self.request)
-        self.invalidate_detail_cache(serializer.instance.pk, self.request)
+        self.invalidate_cache(self.request)
     
     def perform_destroy(self, instance):
-        pk = instance.pk
         super().perform_destroy(instance)
-        self.invalidate_list_cache(self.request)
-        self.invalidate_detail_cache(pk, self.request)
+        self.invalidate_cache(self.request)
 
 
 def invalidate_cache_key(key: str) -> bool:
@@ -406,7 +1481,7 @@ def get_cache_stats() -> dict:
     try:
         client = cache.client.get_client()
         info = client.info()
-        return {
+        stats = {
             'connected': True,
             'used_memory': info.get('used_memory_human', 'N/A'),
             'keys': client.dbsize(),
@@ -417,6 +1492,10 @@ def get_cache_stats() -> dict:
                       max(info.get('keyspace_hits', 0) + info.get('keyspace_misses', 0), 1) * 100, 2)
             ),
         }
+        # Two-tier backend: per-process L1/L2 hit ratios
+        if hasattr(cache, 'tier_stats'):
+            stats['tiers'] = cache.tier_stats()
+        return stats
     except Exception as e:
         logger.error(f"Failed to get cache stats: {e}")
         return {'connected': False, 'error': str(e)}
@@ -0,0 +1,34 @@
+"""
+Cache Monitoring Views
+
+Staff-only JSON view of cache effectiveness: Redis keyspace stats, per-prefix
+hit/miss/size/latency metrics, single-flight counters and outbound HTTP
+connection pool usage.
+"""
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache_metrics import get_prefix_stats
+from .cache_utils import get_cache_stats, get_single_flight_stats
+from .http_client import get_pool_stats
+
+
+class CacheStatsView(APIView):
+    """
+    GET /api/cache/stats/
+    
+    Returns:
+        {"cache": {...}, "prefixes": {prefix: {...}}, "single_flight": {...},
+         "http_pools": {host: {...}}}
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response({
+            "cache": get_cache_stats(),
+            "prefixes": get_prefix_stats(),
+            "single_flight": get_single_flight_stats(),
+            "http_pools": get_pool_stats(),
+        })
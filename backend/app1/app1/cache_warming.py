@@ -0,0 +1,224 @@
+"""
+Cache Warming
+
+Pre-populates the caches the first requests of the day would otherwise fill:
+combined weather payloads (forecast, AQI/UV, timezone) for every saved location,
+and the financials/subscriptions dashboards for recently active users.
+
+Coordinates that round to the same cache key are warmed once, upstream calls are
+paced per provider, and work runs on a bounded thread pool.
+
+Usage:
+    python manage.py cache_manage warm
+    python manage.py cache_manage warm --workers 4 --active-days 7 --force
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.db import close_old_connections
+
+from .cache_metrics import metered_get
+from .cache_utils import get_or_revalidate, refresh_cached
+
+logger = logging.getLogger(__name__)
+
+# Upstream requests per second while warming
+PROVIDER_RATE_LIMITS = {
+    "google": 10.0,       # Timezone API
+    "weather": 5.0,       # Open-Meteo and fallbacks
+    "air_quality": 5.0,   # WAQI / Open-Meteo AQI
+}
+
+# (request path, view) of the per-user dashboards worth warming
+DASHBOARD_VIEWS = [
+    ("/api/financials/dashboard/", "financials_app.views.FullDashboardView"),
+    ("/api/financials/dashboard/summary/", "financials_app.views.DashboardSummaryView"),
+    ("/api/subscriptions/dashboard/", "subscriptions_app.views.SubscriptionDashboardView"),
+    ("/api/subscriptions/dashboard/summary/", "subscriptions_app.views.SubscriptionSummaryView"),
+]
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CacheWarmer:
+    """
+    Warm weather and dashboard caches with a bounded thread pool.
+
+    Args:
+        workers: Maximum concurrent warm tasks
+        rate_limits: Requests/second per provider (defaults to PROVIDER_RATE_LIMITS)
+        force: Recompute combined weather payloads even if they are still fresh
+    """
+
+    def __init__(self, workers=8, rate_limits=None, force=False):
+        self.workers = max(1, workers)
+        self.force = force
+        limits = {**PROVIDER_RATE_LIMITS, **(rate_limits or {})}
+        self.limiters = {provider: RateLimiter(rate) for provider, rate in limits.items()}
+
+    # ==================== WEATHER ====================
+
+    @staticmethod
+    def saved_coordinates():
+        """
+        Distinct saved-location coordinates, one per forecast grid cell (and so
+        per combined weather cache key).
+
+        Returns:
+            List of (lat, lng) floats
+        """
+        from weather_app.grid import snap
+        from weather_app.models import SavedLocation
+
+        seen = {}
+        for lat, lng in SavedLocation.objects.values_list("latitude", "longitude").iterator():
+            lat, lng = float(lat), float(lng)
+            seen.setdefault(snap(lat, lng, "forecast").key, (lat, lng))
+        return list(seen.values())
+
+    def _through_limiter(self, provider, cache_key, fetch):
+        """Call fetch(), pacing it only when its cache entry is missing."""
+        if metered_get(cache_key) is None:
+            self.limiters[provider].wait()
+        return fetch()
+
+    def warm_location(self, lat, lng):
+        """
+        Warm the timezone, AQI/UV, forecast and combined payload for one location.
+
+        Returns:
+            "warmed", "fresh" (already cached) or "failed"
+        """
+        from weather_app.services import weather_service
+        from weather_app.timezones import get_index
+        from weather_app.views import WeatherView
+
+        view = WeatherView()
+        cache_key = view.combined_cache_key(lat, lng)
+
+        def compute():
+            # Fill the component caches first so each provider is paced separately;
+            # the combined build below then reads them back from cache
+            if get_index() is None:
+                # Otherwise timezones resolve offline and need no warming
+                self._through_limiter(
+                    "google",
+                    view.timezone_cache_key(lat, lng),
+                    lambda: view.get_time_zone(lat, lng),
+                )
+            self._through_limiter(
+                "air_quality",
+                weather_service.grid_cache_key("aqi", lat, lng, "air_quality"),
+                lambda: weather_service.get_air_quality_data(lat, lng),
+            )
+            self._through_limiter(
+                "weather",
+                weather_service.grid_cache_key("weather", lat, lng, "forecast"),
+                lambda: weather_service.get_weather_data(lat, lng),
+            )
+            return view._build_combined_data(lat, lng, {"lat": lat, "lng": lng}, {})
+
+        if self.force:
+            value = refresh_cached(
+                cache_key, compute, view.COMBINED_CACHE_TTL, view.COMBINED_STALE_TTL
+            )
+            state = "MISS"
+        else:
+            value, state, _ = get_or_revalidate(
+                cache_key, compute, view.COMBINED_CACHE_TTL, view.COMBINED_STALE_TTL
+            )
+        if value is None:
+            return "failed"
+        return "warmed" if state == "MISS" else "fresh"
+
+    # ==================== DASHBOARDS ====================
+
+    @staticmethod
+    def active_users(active_days=14):
+        """Users who logged in within active_days (all active users if None)."""
+        from django.contrib.auth import get_user_model
+        from django.utils import timezone
+
+        users = get_user_model().objects.filter(is_active=True)
+        if active_days:
+            users = users.filter(last_login__gte=timezone.now() - timedelta(days=active_days))
+        return list(users)
+
+    @staticmethod
+    def warm_dashboards(user):
+        """
+        Run each dashboard view for a user so its cached response or sections are stored.
+
+        Returns:
+            "warmed" or "failed"
+        """
+        from django.utils.module_loading import import_string
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        factory = APIRequestFactory()
+        ok = True
+        for path, view_path in DASHBOARD_VIEWS:
+            request = factory.get(path, HTTP_ACCEPT="application/json")
+            force_authenticate(request, user=user)
+            try:
+                response = import_string(view_path).as_view()(request)
+                ok = ok and response.status_code == 200
+            except Exception as e:
+                logger.warning(f"Dashboard warm failed for user {user.pk} at {path}: {e}")
+                ok = False
+        return "warmed" if ok else "failed"
+
+    # ==================== RUN ====================
+
+    def _run(self, func, items):
+        def task(item):
+            close_old_connections()
+            try:
+                return func(*item) if isinstance(item, tuple) else func(item)
+            except Exception as e:
+                logger.warning(f"Cache warm task failed for {item}: {e}")
+                return "failed"
+            finally:
+                close_old_connections()
+
+        results = Counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cache-warm") as pool:
+            for future in as_completed([pool.submit(task, item) for item in items]):
+                results[future.result()] += 1
+        return results
+
+    def warm(self, locations=True, dashboards=True, active_days=14):
+        """
+        Warm every saved location and active user's dashboards.
+
+        Returns:
+            {"locations": Counter, "dashboards": Counter} of task outcomes
+        """
+        summary = {}
+        if locations:
+            summary["locations"] = self._run(self.warm_location, self.saved_coordinates())
+        if dashboards:
+            summary["dashboards"] = self._run(self.warm_dashboards, self.active_users(active_days))
+        return summary
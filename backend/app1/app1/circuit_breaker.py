@@ -0,0 +1,153 @@
+"""
+Circuit Breaker
+
+Per-upstream circuit breaker whose state lives in the shared cache (Redis), so
+every worker stops calling a failing provider as soon as one of them trips it.
+
+States:
+    closed     Requests flow; failures are counted within a sliding window.
+    open       FAILURE_THRESHOLD failures within WINDOW seconds: requests are
+               skipped for the cooldown.
+    half-open  Cooldown elapsed: a single probe request is let through. Success
+               closes the circuit; failure re-opens it with a doubled cooldown
+               (capped at max_cooldown).
+
+Usage:
+    breaker = CircuitBreaker("waqi")
+    if breaker.allow_request():
+        try:
+            data = fetch()
+        except RequestException:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+"""
+
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "circuit"
+
+FAILURE_THRESHOLD = 3   # failures within WINDOW that open the circuit
+WINDOW = 60             # seconds over which failures are counted
+COOLDOWN = 30           # seconds the circuit stays open at first
+MAX_COOLDOWN = 600      # cap for the doubling cooldown after failed probes
+PROBE_TIMEOUT = 30      # seconds a half-open probe may take before another is allowed
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Cache-backed circuit breaker for one upstream provider."""
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=FAILURE_THRESHOLD,
+        window=WINDOW,
+        cooldown=COOLDOWN,
+        max_cooldown=MAX_COOLDOWN,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self._state_key = f"{KEY_PREFIX}:{name}:state"
+        self._failures_key = f"{KEY_PREFIX}:{name}:failures"
+        self._probe_key = f"{KEY_PREFIX}:{name}:probe"
+
+    def _get_open_state(self):
+        try:
+            return cache.get(self._state_key)
+        except Exception:
+            # Cache outage: treat the circuit as closed
+            return None
+
+    @property
+    def state(self):
+        """Current state: "closed", "open" or "half_open"."""
+        opened = self._get_open_state()
+        if opened is None:
+            return CLOSED
+        return OPEN if time.time() < opened["until"] else HALF_OPEN
+
+    def allow_request(self):
+        """
+        Whether a request to the provider should be attempted now.
+
+        In the half-open state only one caller (across all workers) gets True
+        until the probe reports back or PROBE_TIMEOUT passes.
+        """
+        opened = self._get_open_state()
+        if opened is None:
+            return True
+        if time.time() < opened["until"]:
+            return False
+        try:
+            return cache.add(self._probe_key, 1, PROBE_TIMEOUT)
+        except Exception:
+            return True
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        try:
+            # Failures in a closed circuit just age out of the window
+            if self._get_open_state() is not None:
+                cache.delete_many([self._state_key, self._failures_key, self._probe_key])
+                logger.info(f"Circuit {self.name} closed")
+        except Exception as e:
+            logger.debug(f"Circuit {self.name} success not recorded: {e}")
+
+    def record_failure(self):
+        """Count a failure; opens (or re-opens) the circuit when warranted."""
+        try:
+            opened = self._get_open_state()
+            if opened is not None:
+                if time.time() >= opened["until"]:
+                    # A failed half-open probe: back off harder
+                    self._open(min(opened["cooldown"] * 2, self.max_cooldown))
+                # Otherwise a call that started before the circuit opened
+                return
+
+            if cache.add(self._failures_key, 1, self.window):
+                failures = 1
+            else:
+                try:
+                    failures = cache.incr(self._failures_key)
+                except ValueError:
+                    # Window expired between add() and incr()
+                    cache.set(self._failures_key, 1, self.window)
+                    failures = 1
+
+            if failures >= self.failure_threshold:
+                self._open(self.cooldown)
+        except Exception as e:
+            logger.debug(f"Circuit {self.name} failure not recorded: {e}")
+
+    def _open(self, cooldown):
+        now = time.time()
+        # Remember the open state well past the cooldown so the half-open probe can see it
+        cache.set(
+            self._state_key,
+            {"until": now + cooldown, "cooldown": cooldown, "opened_at": now},
+            cooldown + self.max_cooldown,
+        )
+        cache.delete_many([self._failures_key, self._probe_key])
+        logger.warning(f"Circuit {self.name} opened for {cooldown}s")
+
+    def status(self):
+        """State summary for monitoring endpoints."""
+        opened = self._get_open_state()
+        status = {"state": self.state}
+        if opened is not None:
+            status["retry_in"] = max(0, int(opened["until"] - time.time()))
+            status["cooldown"] = opened["cooldown"]
+        return status
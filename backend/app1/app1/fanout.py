@@ -0,0 +1,239 @@
+"""
+Upstream Fan-Out
+
+Runs independent upstream calls (HTTP APIs) concurrently on a shared, bounded
+thread pool, with an overall deadline, and reports each task's result or error
+separately so callers can assemble partial responses.
+
+Every task is submitted to the pool and the caller stops waiting at the
+deadline. When the pool is saturated the calling thread takes over one task at a
+time that no worker has started within STEAL_AFTER, so nested fan-outs (a
+fanned-out task that fans out again) cannot starve it. A task running inline
+can't be cut off, so this only happens while at least STEAL_RESERVE seconds are
+left; otherwise the caller keeps waiting on the pool until the deadline.
+
+Usage:
+    results, errors = fan_out({
+        "time_zone_data": lambda: get_time_zone(lat, lng),
+        "weather_data": lambda: get_weather_data(lat, lng),
+    }, timeout=12)
+
+    # Hedged fallback chain: start the backup if the primary is slow
+    name, data = first_result(
+        [("primary", fetch_primary), ("backup", fetch_backup)],
+        hedge_delay=lambda current, following: 1.5,
+    )
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_WORKERS = 16       # shared across all requests in a worker process
+FAN_OUT_TIMEOUT = 15.0      # default overall deadline in seconds
+
+TIMEOUT_ERROR = "timeout"
+
+STEAL_AFTER = 0.25          # seconds before an attempt no worker has started runs inline
+STEAL_RESERVE = 2.0         # seconds that must be left before the caller runs one itself
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_upstream_executor() -> ThreadPoolExecutor:
+    """The process-wide pool for upstream I/O."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=UPSTREAM_WORKERS,
+                thread_name_prefix="upstream",
+            )
+        return _executor
+
+
+def _run(name: str, task: Callable, results: dict, errors: dict) -> None:
+    try:
+        value = task()
+    except Exception as e:
+        logger.warning(f"Fan-out task {name} failed: {e}")
+        errors[name] = str(e) or e.__class__.__name__
+        return
+    if value is None:
+        errors[name] = "unavailable"
+    else:
+        results[name] = value
+
+
+def fan_out(tasks: Dict[str, Callable], timeout: float = FAN_OUT_TIMEOUT) -> Tuple[dict, dict]:
+    """
+    Run tasks concurrently and collect whatever finishes before the deadline.
+
+    Args:
+        tasks: Dict of name -> zero-argument callable. A None return counts as an error.
+        timeout: Overall deadline in seconds. Tasks still running afterwards are
+            abandoned (they finish in the background; their results are dropped).
+
+    Returns:
+        Tuple of (results, errors): name -> value for successful tasks and
+        name -> error message ("timeout", "unavailable" or the exception text)
+    """
+    deadline = time.monotonic() + timeout
+    names = list(tasks)
+    results, errors = {}, {}
+    if not names:
+        return results, errors
+
+    executor = get_upstream_executor()
+    pending = {}  # future -> name
+    for name in names:
+        try:
+            pending[executor.submit(tasks[name])] = name
+        except RuntimeError:
+            # Interpreter shutting down: run it here instead
+            _run(name, tasks[name], results, errors)
+
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, _ = wait(pending, timeout=min(remaining, STEAL_AFTER), return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try:
+                value = future.result()
+            except Exception as e:
+                logger.warning(f"Fan-out task {name} failed: {e}")
+                errors[name] = str(e) or e.__class__.__name__
+                continue
+            if value is None:
+                errors[name] = "unavailable"
+            else:
+                results[name] = value
+        if done:
+            continue
+
+        # No worker has picked some tasks up yet (pool saturated): run one here
+        stolen = _steal(pending, deadline)
+        if stolen is not None:
+            name = pending.pop(stolen)
+            _run(name, tasks[name], results, errors)
+
+    for future, name in pending.items():
+        future.cancel()
+        logger.warning(f"Fan-out task {name} missed the {timeout}s deadline")
+        errors[name] = TIMEOUT_ERROR
+
+    return results, errors
+
+
+def _steal(pending: dict, deadline: float):
+    """
+    Cancel and return the first pending future no worker has started, or None.
+
+    Declines with less than STEAL_RESERVE seconds to the deadline: the caller
+    would run the task itself and could not stop it there.
+    """
+    if deadline - time.monotonic() < STEAL_RESERVE:
+        return None
+    return next((future for future in pending if future.cancel()), None)
+
+
+def _attempt(name: str, task: Callable):
+    try:
+        return task()
+    except Exception as e:
+        logger.warning(f"Attempt {name} failed: {e}")
+        return None
+
+
+def first_result(
+    attempts: List[Tuple[str, Callable]],
+    hedge_delay: Optional[Callable[[str, str], Optional[float]]] = None,
+    on_hedge: Optional[Callable[[str], None]] = None,
+    timeout: float = FAN_OUT_TIMEOUT,
+) -> Tuple[Optional[str], object]:
+    """
+    Try attempts in order and return the first truthy result, hedging slow ones.
+
+    An attempt that fails or returns a falsy result moves straight on to the
+    next. If the latest attempt has not answered within hedge_delay(latest,
+    next) seconds, the next one is started alongside it (a hedge) and whichever
+    valid result arrives first wins; the others are cancelled if not yet
+    started, otherwise their results are dropped.
+
+    Args:
+        attempts: List of (name, zero-argument callable) in priority order
+        hedge_delay: Seconds to wait before hedging to the next attempt, or None
+            to only fall back after a failure. No hedging if omitted.
+        on_hedge: Called with the name of each attempt started as a hedge
+        timeout: Overall deadline in seconds
+
+    Returns:
+        Tuple of (name, result), or (None, None) if nothing succeeded in time
+    """
+    deadline = time.monotonic() + timeout
+    executor = get_upstream_executor()
+    queue = list(attempts)
+    pending = {}  # future -> (name, task)
+    hedge_at = float("inf")
+
+    def start():
+        nonlocal hedge_at
+        name, task = queue.pop(0)
+        pending[executor.submit(task)] = (name, task)
+        delay = hedge_delay(name, queue[0][0]) if hedge_delay and queue else None
+        hedge_at = time.monotonic() + delay if delay is not None else float("inf")
+
+    def finish(name, result):
+        for future in pending:
+            future.cancel()
+        return name, result
+
+    while queue or pending:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        if not pending:
+            start()
+            continue
+
+        done, _ = wait(
+            pending,
+            timeout=max(0.0, min(deadline, hedge_at, now + STEAL_AFTER) - now),
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            name, _ = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"Attempt {name} failed: {e}")
+                result = None
+            if result:
+                return finish(name, result)
+        if done:
+            continue
+
+        # No worker has picked some attempts up yet (pool saturated): run one here
+        stolen = _steal(pending, deadline)
+        if stolen is not None:
+            name, task = pending.pop(stolen)
+            result = _attempt(name, task)
+            if result:
+                return finish(name, result)
+
+        if pending and queue and time.monotonic() >= hedge_at:
+            if on_hedge:
+                on_hedge(queue[0][0])
+            logger.info(f"Hedging to {queue[0][0]}")
+            start()
+
+    for future in pending:
+        future.cancel()
+    return None, None
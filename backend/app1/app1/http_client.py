@@ -0,0 +1,212 @@
+"""
+Outbound HTTP Client
+
+Shared keep-alive sessions for calls to upstream APIs (Open-Meteo, Google,
+Geoapify, Mapbox, WAQI, OpenWeatherMap, ...). Each worker process keeps one
+requests.Session per host, so repeated calls reuse pooled TCP+TLS connections
+instead of opening a new one per request.
+
+Every session uses the same policy:
+- connect/read timeouts (a bare number is the read timeout)
+- idempotent requests retried on connection errors and 5xx with backoff
+  (read timeouts are not retried: the caller's deadline matters more)
+- per-host pool sizes, large enough for the upstream fan-out pool
+
+Usage:
+    from app1.http_client import http_get, http_post
+
+    response = http_get(url, timeout=10)
+    response.raise_for_status()
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .fanout import UPSTREAM_WORKERS
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 3.05   # seconds to establish a connection
+READ_TIMEOUT = 10        # default seconds to wait for a response
+
+POOL_MAXSIZE = UPSTREAM_WORKERS   # connections kept per host
+HOST_POOL_MAXSIZE = {
+    # Hit on every keystroke of location search
+    "places.googleapis.com": 32,
+    "api.geoapify.com": 32,
+}
+
+RETRY_TOTAL = 2
+RETRY_BACKOFF = 0.3                       # 0s, 0.6s between attempts
+RETRY_STATUSES = (500, 502, 503, 504)     # 429 is left to callers (quota handling)
+
+_sessions = {}
+_sessions_pid = os.getpid()
+_sessions_lock = threading.Lock()
+
+_stats = defaultdict(Counter)   # host -> request counters for this process
+_stats_lock = threading.Lock()
+
+
+def _host(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _build_session(host: str) -> requests.Session:
+    retry = Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=False,
+        status=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    )
+    maxsize = HOST_POOL_MAXSIZE.get(urlsplit(host).hostname, POOL_MAXSIZE)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """The pooled session for url's host (one per host per worker process)."""
+    global _sessions_pid
+    host = _host(url)
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            # Forked worker: don't share the parent's sockets
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = _build_session(host)
+        return session
+
+
+def _timeout(timeout):
+    if timeout is None:
+        return (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if isinstance(timeout, (int, float)):
+        return (min(CONNECT_TIMEOUT, timeout), timeout)
+    return timeout
+
+
+def _record(host: str, **counts) -> None:
+    with _stats_lock:
+        _stats[host].update(counts)
+
+
+def request(method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+    """
+    Send a request through the host's pooled session.
+
+    Args:
+        method: HTTP method
+        url: Absolute URL
+        timeout: Read timeout in seconds, a (connect, read) tuple, or None for the defaults
+        **kwargs: Passed to requests.Session.request (params, json, headers, ...)
+
+    Returns:
+        requests.Response (after any retries)
+    """
+    host = _host(url)
+    started = time.perf_counter()
+    try:
+        response = get_session(url).request(method, url, timeout=_timeout(timeout), **kwargs)
+    except requests.RequestException:
+        _record(host, requests=1, errors=1, elapsed_us=int((time.perf_counter() - started) * 1_000_000))
+        raise
+
+    retries = getattr(response.raw, "retries", None)
+    _record(
+        host,
+        requests=1,
+        retries=len(retries.history) if retries is not None else 0,
+        elapsed_us=int((time.perf_counter() - started) * 1_000_000),
+    )
+    return response
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """GET through the pooled session for url's host."""
+    return request("GET", url, **kwargs)
+
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    """POST through the pooled session for url's host (not retried on 5xx)."""
+    return request("POST", url, **kwargs)
+
+
+def _pool_usage(session: requests.Session) -> dict:
+    """Connections opened and currently idle across a session's urllib3 pools."""
+    opened = idle = maxsize = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        maxsize = max(maxsize, adapter._pool_maxsize)
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            if pool.pool is not None:
+                idle += pool.pool.qsize()
+    return {"connections_opened": opened, "idle_connections": idle, "pool_maxsize": maxsize}
+
+
+def get_pool_stats() -> dict:
+    """
+    Per-host outbound HTTP stats for this worker process.
+
+    Returns:
+        Dict of host -> {requests, errors, retries, avg_ms, connections_opened,
+        idle_connections, pool_maxsize, reuse_rate}
+    """
+    with _sessions_lock:
+        sessions = dict(_sessions)
+    with _stats_lock:
+        counts = {host: Counter(c) for host, c in _stats.items()}
+
+    stats = {}
+    for host in sorted(set(sessions) | set(counts)):
+        c = counts.get(host, Counter())
+        total = c["requests"]
+        entry = {
+            "requests": total,
+            "errors": c["errors"],
+            "retries": c["retries"],
+            "avg_ms": round(c["elapsed_us"] / total / 1000, 1) if total else 0,
+        }
+        if host in sessions:
+            entry.update(_pool_usage(sessions[host]))
+            # Share of requests (including retries) that did not need a new connection
+            attempts = total + c["retries"]
+            if attempts:
+                entry["reuse_rate"] = round(
+                    max(0, attempts - entry["connections_opened"]) / attempts * 100, 2
+                )
+        stats[host] = entry
+    return stats
+
+
+def close_sessions() -> None:
+    """Close all pooled connections (e.g. in tests or on worker shutdown)."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,130 @@
+"""
+Benchmark cache serialization codecs on real weather payloads.
+
+Compares pickle (django-redis default) with the compact serializer's codecs on
+stored size and encode/decode latency, and optionally measures a Redis
+SET/GET round-trip for each.
+
+Usage:
+    python manage.py cache_benchmark                         - Fetch live weather for NYC
+    python manage.py cache_benchmark --lat 51.5 --lng -0.12  - Fetch live weather for a location
+    python manage.py cache_benchmark --fixture payload.json  - Use a recorded payload
+    python manage.py cache_benchmark --redis                 - Include Redis round-trip latency
+"""
+
+import json
+import pickle
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app1 import cache_serializers
+from app1.cache_serializers import CompactSerializer
+
+
+class PickleSerializer:
+    """Mirror of django-redis's default pickle serializer."""
+
+    def dumps(self, value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, value):
+        return pickle.loads(value)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark cache serializers (pickle vs msgpack/JSON + zlib/zstd) on weather payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lat', type=float, default=40.7128, help='Latitude for a live payload')
+        parser.add_argument('--lng', type=float, default=-74.0060, help='Longitude for a live payload')
+        parser.add_argument('--fixture', type=str, default='', help='JSON file with a recorded payload')
+        parser.add_argument('-n', '--iterations', type=int, default=200, help='Iterations per codec')
+        parser.add_argument('--redis', action='store_true', help='Also time SET/GET against the cache Redis')
+
+    def handle(self, *args, **options):
+        payload = self._load_payload(options)
+        iterations = max(options['iterations'], 1)
+
+        codecs = [('pickle', PickleSerializer())]
+        for fmt in ('json', 'msgpack'):
+            if fmt == 'msgpack' and cache_serializers.msgpack is None:
+                self.stdout.write(self.style.WARNING('  msgpack not installed, skipping'))
+                continue
+            for compressor in ('none', 'zlib', 'zstd'):
+                if compressor == 'zstd' and cache_serializers.zstandard is None:
+                    continue
+                config = {'FORMAT': fmt, 'COMPRESSOR': compressor if compressor != 'none' else 'zlib'}
+                # A threshold larger than any payload disables compression
+                config['THRESHOLD'] = 1 << 62 if compressor == 'none' else 0
+                codecs.append((f'{fmt}+{compressor}', CompactSerializer({'COMPACT_SERIALIZER': config})))
+
+        redis_client = self._get_redis_client() if options['redis'] else None
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n=== Serializer Benchmark ({iterations} iterations) ===\n'))
+        header = f"  {'codec':<16}{'bytes':>10}{'ratio':>8}{'dumps µs':>11}{'loads µs':>11}"
+        if redis_client is not None:
+            header += f"{'set µs':>10}{'get µs':>10}"
+        self.stdout.write(header)
+
+        baseline = None
+        for name, serializer in codecs:
+            blob = serializer.dumps(payload)
+            if serializer.loads(blob) != payload:
+                self.stdout.write(self.style.ERROR(f'  {name}: round-trip mismatch'))
+                continue
+            baseline = baseline or len(blob)
+
+            dumps_us = self._time(lambda: serializer.dumps(payload), iterations)
+            loads_us = self._time(lambda: serializer.loads(blob), iterations)
+            row = f"  {name:<16}{len(blob):>10}{len(blob) / baseline:>8.2f}{dumps_us:>11.1f}{loads_us:>11.1f}"
+
+            if redis_client is not None:
+                key = f'cachebench:{name}'
+                set_us = self._time(lambda: redis_client.set(key, serializer.dumps(payload), ex=60), iterations)
+                get_us = self._time(lambda: serializer.loads(redis_client.get(key)), iterations)
+                redis_client.delete(key)
+                row += f"{set_us:>10.1f}{get_us:>10.1f}"
+
+            self.stdout.write(row)
+
+        self.stdout.write('')
+
+    def _load_payload(self, options):
+        """Load the benchmark payload from a fixture or a live weather fetch."""
+        if options['fixture']:
+            try:
+                with open(options['fixture']) as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read fixture: {e}')
+
+        from weather_app.services import weather_service
+
+        payload = weather_service.get_weather_data(options['lat'], options['lng'])
+        if not payload:
+            raise CommandError('Weather fetch failed; pass --fixture with a recorded payload')
+        # Normalise to what a JSON-based cache would hand back
+        return json.loads(json.dumps(payload, default=str))
+
+    def _get_redis_client(self):
+        from django.core.cache import cache
+
+        try:
+            client = cache.client.get_client(write=True)
+            client.ping()
+            return client
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'  Redis unavailable, skipping round-trip timings ({e})'))
+            return None
+
+    @staticmethod
+    def _time(func, iterations):
+        """Median wall time of one call, in microseconds."""
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples) * 1_000_000
@@ -5,14 +5,25 @@ Provides utilities to view, clear, and manage the Redis cache.
 
 Usage:
     python manage.py cache_manage stats       - Show cache statistics
+    python manage.py cache_manage stats --by-prefix  - Include per-prefix hit/miss/latency
     python manage.py cache_manage clear       - Clear all cache
     python manage.py cache_manage clear -p weather  - Clear weather-related cache
     python manage.py cache_manage keys -p weather   - List keys matching pattern
+    python manage.py cache_manage invalidate -t user:42:financials  - Invalidate a cache tag
+    python manage.py cache_manage warm        - Warm saved-location weather and user dashboards
 """
 
+import time
+
 from django.core.management.base import BaseCommand, CommandError
 from django.core.cache import cache
-from app1.cache_utils import get_cache_stats, invalidate_cache_pattern
+from app1.cache_metrics import get_prefix_stats
+from app1.cache_utils import (
+    get_cache_stats,
+    get_single_flight_stats,
+    invalidate_cache_pattern,
+    invalidate_tags,
+)
 
 
 class Command(BaseCommand):
@@ -22,8 +33,8 @@ class Command(BaseCommand):
         parser.add_argument(
             'action',
             type=str,
-            choices=['stats', 'clear', 'keys', 'info'],
-            help='Action to perform: stats, clear, keys, or info'
+            choices=['stats', 'clear', 'keys', 'info', 'invalidate', 'warm'],
+            help='Action to perform: stats, clear, keys, info, invalidate, or warm'
         )
         parser.add_argument(
             '-p', '--pattern',
@@ -31,6 +42,39 @@ class Command(BaseCommand):
             default='',
             help='Pattern to match for clear/keys operations (e.g., "weather", "financials")'
         )
+        parser.add_argument(
+            '-t', '--tag',
+            action='append',
+            default=[],
+            help='Cache tag to invalidate (repeatable, e.g., "user:42:financials")'
+        )
+        parser.add_argument(
+            '--by-prefix',
+            action='store_true',
+            help='With stats: break hits, misses, sizes and latency down by key prefix'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='With warm: maximum concurrent warm tasks'
+        )
+        parser.add_argument(
+            '--active-days',
+            type=int,
+            default=14,
+            help='With warm: only warm dashboards of users who logged in within this many days (0 = all)'
+        )
+        parser.add_argument(
+            '--only',
+            choices=['locations', 'dashboards'],
+            help='With warm: only warm saved-location weather or user dashboards'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='With warm: recompute weather payloads even if still cached'
+        )
         parser.add_argument(
             '--confirm',
             action='store_true',
@@ -44,12 +88,18 @@ class Command(BaseCommand):
 
         if action == 'stats':
             self._show_stats()
+            if options['by_prefix']:
+                self._show_prefix_stats()
         elif action == 'info':
             self._show_info()
         elif action == 'clear':
             self._clear_cache(pattern, confirm)
         elif action == 'keys':
             self._list_keys(pattern)
+        elif action == 'invalidate':
+            self._invalidate_tags(options['tag'])
+        elif action == 'warm':
+            self._warm_cache(options)
         else:
             raise CommandError(f'Unknown action: {action}')
 
@@ -69,6 +119,41 @@ class Command(BaseCommand):
         self.stdout.write(f"  Cache Hits: {stats.get('hits', 0)}")
         self.stdout.write(f"  Cache Misses: {stats.get('misses', 0)}")
         self.stdout.write(f"  Hit Rate: {stats.get('hit_rate', 0)}%")
+        
+        tiers = stats.get('tiers')
+        if tiers:
+            self.stdout.write(self.style.MIGRATE_HEADING('\n=== Two-Tier Cache (this process) ===\n'))
+            self.stdout.write(f"  L1 Hits / Misses: {tiers['l1_hits']} / {tiers['l1_misses']} ({tiers['l1_hit_rate']}%)")
+            self.stdout.write(f"  L2 Hits / Misses: {tiers['l2_hits']} / {tiers['l2_misses']} ({tiers['l2_hit_rate']}%)")
+            self.stdout.write(f"  L1 Entries: {tiers['l1_entries']} ({tiers['l1_bytes']} bytes)")
+        
+        self.stdout.write(self.style.MIGRATE_HEADING('\n=== Single-Flight ===\n'))
+        
+        flight = get_single_flight_stats()
+        self.stdout.write(f"  Recomputes (leader): {flight['leader']}")
+        self.stdout.write(f"  Coalesced Requests: {flight['coalesced']}")
+        self.stdout.write(f"  Early Recomputes: {flight['early_recompute']}")
+        self.stdout.write(f"  Wait Timeouts: {flight['wait_timeout']}")
+        self.stdout.write('')
+
+    def _show_prefix_stats(self):
+        """Display per-prefix cache metrics."""
+        self.stdout.write(self.style.MIGRATE_HEADING('\n=== Cache by Prefix ===\n'))
+        
+        stats = get_prefix_stats()
+        if not stats:
+            self.stdout.write('  No metrics recorded yet.')
+            self.stdout.write('')
+            return
+        
+        self.stdout.write(
+            f"  {'prefix':<32}{'hits':>9}{'misses':>9}{'hit %':>8}{'sets':>8}{'avg set B':>11}{'avg get ms':>12}"
+        )
+        for prefix, row in sorted(stats.items(), key=lambda item: -(item[1]['hits'] + item[1]['misses'])):
+            self.stdout.write(
+                f"  {prefix:<32}{row['hits']:>9}{row['misses']:>9}{row['hit_rate']:>8}"
+                f"{row['sets']:>8}{row['avg_set_bytes']:>11}{row['avg_get_ms']:>12}"
+            )
         self.stdout.write('')
 
     def _show_info(self):
@@ -115,6 +200,35 @@ class Command(BaseCommand):
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f'Failed to clear cache: {e}'))
 
+    def _invalidate_tags(self, tags):
+        """Invalidate all cache entries registered under the given tags."""
+        if not tags:
+            raise CommandError('At least one --tag is required for invalidate')
+        
+        invalidate_tags(*tags)
+        for tag in tags:
+            self.stdout.write(self.style.SUCCESS(f'Invalidated cache tag "{tag}"'))
+
+    def _warm_cache(self, options):
+        """Warm saved-location weather and active users' dashboards."""
+        from app1.cache_warming import CacheWarmer
+        
+        only = options['only']
+        warmer = CacheWarmer(workers=options['workers'], force=options['force'])
+        
+        self.stdout.write(self.style.MIGRATE_HEADING('\n=== Warming Cache ===\n'))
+        started = time.monotonic()
+        summary = warmer.warm(
+            locations=only in (None, 'locations'),
+            dashboards=only in (None, 'dashboards'),
+            active_days=options['active_days'] or None,
+        )
+        
+        for section, results in summary.items():
+            counts = ', '.join(f"{outcome}: {count}" for outcome, count in sorted(results.items())) or 'nothing to warm'
+            self.stdout.write(f"  {section.title()}: {counts}")
+        self.stdout.write(self.style.SUCCESS(f'\nDone in {time.monotonic() - started:.1f}s'))
+
     def _list_keys(self, pattern):
         """List cache keys matching pattern."""
         try:
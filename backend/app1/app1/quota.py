@@ -0,0 +1,105 @@
+"""
+Provider Quota Ledger
+
+Counts calls against an upstream provider's daily quota in the shared cache
+(Redis), so all workers draw from one budget and a fallback storm stops at the
+limit instead of locking the account out.
+
+Each call takes one unit with an atomic INCR on a per-day key
+("quota:<name>:<YYYYMMDD>", UTC) that expires after the day ends. A unit that
+would exceed the limit is handed back. Callers may hold back a reservation:
+acquire(reserve=n) only succeeds while more than n units remain, which keeps the
+tail of the quota for calls that matter more (e.g. real fallbacks over hedges).
+
+Usage:
+    ledger = QuotaLedger("tomorrow_io", daily_limit=500)
+    if ledger.acquire():
+        fetch()
+"""
+
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "quota"
+EXPIRY_GRACE = 3600   # keep a day's counter an hour past UTC midnight
+
+
+class QuotaLedger:
+    """Cache-backed daily call counter for one provider."""
+
+    def __init__(self, name, daily_limit):
+        self.name = name
+        self.daily_limit = daily_limit
+
+    def _key(self, now=None):
+        return f"{KEY_PREFIX}:{self.name}:{time.strftime('%Y%m%d', time.gmtime(now))}"
+
+    @staticmethod
+    def _seconds_until_reset(now=None):
+        now = time.time() if now is None else now
+        return int(86400 - now % 86400) + EXPIRY_GRACE
+
+    def used(self):
+        """Units taken today."""
+        try:
+            return int(cache.get(self._key(), 0))
+        except Exception:
+            return 0
+
+    def remaining(self):
+        """Units left today."""
+        return max(0, self.daily_limit - self.used())
+
+    def acquire(self, reserve=0):
+        """
+        Take one unit of today's quota.
+
+        Args:
+            reserve: Units that must remain untouched after this call
+
+        Returns:
+            True if the call may proceed
+        """
+        key = self._key()
+        try:
+            cache.add(key, 0, self._seconds_until_reset())
+            try:
+                used = cache.incr(key)
+            except ValueError:
+                # Counter expired between add() and incr()
+                cache.set(key, 1, self._seconds_until_reset())
+                used = 1
+        except Exception as e:
+            # Cache outage: don't block upstream calls on bookkeeping
+            logger.debug(f"Quota {self.name} not recorded: {e}")
+            return True
+
+        if used > self.daily_limit - reserve:
+            try:
+                cache.decr(key)
+            except Exception:
+                pass
+            return False
+        return True
+
+    def exhaust(self):
+        """Mark today's quota as used up (e.g. the provider answered 429)."""
+        try:
+            cache.set(self._key(), self.daily_limit, self._seconds_until_reset())
+            logger.warning(f"Quota {self.name} exhausted for today")
+        except Exception as e:
+            logger.debug(f"Quota {self.name} not recorded: {e}")
+
+    def status(self):
+        """Quota summary for monitoring endpoints."""
+        used = self.used()
+        return {
+            "daily_limit": self.daily_limit,
+            "used": used,
+            "remaining": max(0, self.daily_limit - used),
+            "resets_in": self._seconds_until_reset() - EXPIRY_GRACE,
+        }
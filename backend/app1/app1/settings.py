@@ -241,6 +241,13 @@ _redis_options = {
         'max_connections': 50,
         'retry_on_timeout': True,
     },
+    # msgpack/JSON + zstd/zlib instead of pickle; legacy pickle entries still decode
+    'SERIALIZER': 'app1.cache_serializers.CompactSerializer',
+    'COMPACT_SERIALIZER': {
+        'FORMAT': os.getenv('CACHE_SERIALIZER_FORMAT', 'msgpack'),  # falls back to json
+        'COMPRESSOR': os.getenv('CACHE_COMPRESSOR', 'zstd'),  # falls back to zlib
+        'THRESHOLD': int(os.getenv('CACHE_COMPRESS_THRESHOLD', 1024)),
+    },
 }
 
 # Extract password and SSL flag from the URL when present
@@ -259,6 +266,9 @@ if _redis_ssl:
 # Cache configuration - use Redis if available, fallback to LocMem
 CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes')
 
+# In-process L1 tier in front of Redis (see app1/cache_backends.py)
+CACHE_L1_ENABLED = os.getenv('CACHE_L1_ENABLED', 'true').lower() in ('true', '1', 'yes')
+
 # Attempt to use Redis when enabled, otherwise fall back to LocMem
 if CACHE_ENABLED:
     try:
@@ -270,11 +280,22 @@ if CACHE_ENABLED:
 
         CACHES = {
             "default": {
-                "BACKEND": "django_redis.cache.RedisCache",
+                # Redis (L2) fronted by a bounded per-process LRU (L1) unless disabled
+                "BACKEND": (
+                    "app1.cache_backends.TwoTierRedisCache"
+                    if CACHE_L1_ENABLED
+                    else "django_redis.cache.RedisCache"
+                ),
                 "LOCATION": REDIS_URL,
                 "TIMEOUT": 900,  # 15 minutes default
                 "OPTIONS": _redis_options,
                 "KEY_PREFIX": "nexus",
+                "L1": {
+                    "MAX_ENTRIES": int(os.getenv('CACHE_L1_MAX_ENTRIES', 2048)),
+                    "MAX_BYTES": int(os.getenv('CACHE_L1_MAX_BYTES', 32 * 1024 * 1024)),
+                    "MAX_TTL": int(os.getenv('CACHE_L1_MAX_TTL', 60)),  # caps staleness if an invalidation is missed
+                    "CHANNEL": "nexus:l1-invalidate",
+                },
             },
             # Separate cache for sessions (if using Redis for sessions)
             "sessions": {
@@ -329,6 +350,79 @@ WEATHER_CACHE_TTL = {
     "timezone": 86400,  # 24 hours for timezone (static data)
 }
 
+# Grid cell sizes (km) that weather lookups snap to, per data type; coordinates in
+# the same cell share one cache entry and upstream call
+WEATHER_GRID_KM = {
+    "forecast": float(os.getenv("WEATHER_GRID_FORECAST_KM", "2")),
+    "air_quality": float(os.getenv("WEATHER_GRID_AQI_KM", "10")),
+    "timezone": float(os.getenv("WEATHER_GRID_TIMEZONE_KM", "25")),
+}
+# Answer a cold cell by blending cached neighbouring cells
+WEATHER_GRID_INTERPOLATE = os.getenv("WEATHER_GRID_INTERPOLATE", "false").lower() == "true"
+
+# Saved-location weather prefetcher (`manage.py weather_prefetch`): refreshes
+# combined payloads LEAD_FRACTION of their TTL before expiry; while fallbacks with
+# daily quotas would be used, QUOTA_RESERVE of each quota is left for live requests
+WEATHER_PREFETCH = {
+    "WORKERS": int(os.getenv("WEATHER_PREFETCH_WORKERS", "4")),
+    "LEAD_FRACTION": 0.2,
+    "ACCESS_WINDOW": 86400,
+    "RELOAD_INTERVAL": 300,
+    "RETRY_DELAY": 60,
+    "QUOTA_RESERVE": 0.5,
+    "LEASE_TTL": 60,
+}
+
+# Persistent geocodes (weather_app.geocoding): size of the per-process LRU in
+# front of the GeocodeEntry table, and the shortest query answered by prefix
+WEATHER_GEOCODE = {
+    "LRU_SIZE": int(os.getenv("WEATHER_GEOCODE_LRU_SIZE", "4096")),
+}
+
+# Place autocomplete prefix cache (weather_app.autocomplete): suggestion lists
+# per endpoint and location-bias bucket of BIAS_KM
+AUTOCOMPLETE_CACHE = {
+    "TTL": int(os.getenv("AUTOCOMPLETE_CACHE_TTL", "3600")),
+    "MAX_ENTRIES": 20000,
+    "BIAS_KM": 25.0,
+}
+
+# OpenWeatherMap tile proxy (weather_app.tiles): on-disk LRU of tiles bounded to
+# MAX_BYTES, each layer fresh for its LAYER_TTL seconds; HOT_ENTRIES tiles per
+# worker are indexed in memory
+WEATHER_TILES = {
+    "DIR": os.getenv("WEATHER_TILE_DIR", str(BASE_DIR / "tile_cache")),
+    "MAX_BYTES": int(os.getenv("WEATHER_TILE_CACHE_MB", "512")) * 1024 * 1024,
+    "HOT_ENTRIES": 2048,
+    "MAX_ZOOM": 18,
+    "LAYER_TTL": {
+        "precipitation_new": 600,
+        "clouds_new": 900,
+        "temp_new": 1800,
+        "pressure_new": 1800,
+        "wind_new": 1800,
+    },
+}
+
+# Packed timezone polygon index for offline timezone lookups (built with
+# `manage.py build_timezone_index`); the Google Timezone API is used while it's missing
+TIMEZONE_INDEX_PATH = os.getenv("TIMEZONE_INDEX_PATH", str(BASE_DIR / "weather_app" / "data" / "timezones.idx"))
+
+# Hedged weather requests: if a provider hasn't answered within its recent p95
+# latency (clamped to MIN/MAX_DELAY), the next provider is started in parallel.
+# Quota-limited providers are hedged to at most BUDGET_FRACTION of their daily limit.
+WEATHER_HEDGE = {
+    "ENABLED": os.getenv("WEATHER_HEDGE_ENABLED", "true").lower() == "true",
+    "PERCENTILE": 95,
+    "MIN_DELAY": 0.5,
+    "MAX_DELAY": 4.0,
+    "DEFAULT_DELAY": 2.0,       # until MIN_SAMPLES latencies are known
+    "MIN_SAMPLES": 20,
+    "BUDGET_FRACTION": float(os.getenv("WEATHER_HEDGE_BUDGET_FRACTION", "0.2")),
+    "QUOTA_RESERVE": 0.1,       # share of a daily quota never spent on hedges
+    "TIMEOUT": 20,              # overall deadline for the fallback chain
+}
+
 # General Cache TTLs (in seconds) for different data types
 CACHE_TTL = {
     # Weather-related
@@ -355,6 +449,13 @@ CACHE_TTL = {
     "static_content": 86400,      # 24 hours
 }
 
+# Stale-while-revalidate windows (in seconds): how long an expired entry may still be
+# served while a background thread refreshes it. Only for slow-to-recompute payloads.
+CACHE_STALE_TTL = {
+    "weather_combined": 900,          # 15 minutes (seconds of upstream I/O)
+    "subscriptions_dashboard": 600,   # 10 minutes (dozens of queries)
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
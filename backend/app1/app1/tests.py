@@ -0,0 +1,881 @@
+"""
+Cache Utilities Tests
+"""
+
+import gzip
+import json
+import pickle
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+from django.core.cache import cache, caches
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from .cache_backends import LocalLRU, TwoTierRedisCache
+from .cache_metrics import SIZE_SAMPLE_EVERY, _totals, get_prefix_stats, metered_get, metered_set, reset_prefix_stats
+from .cache_serializers import CompactSerializer, describe
+from .cache_warming import RateLimiter
+from .circuit_breaker import CircuitBreaker
+from .quota import QuotaLedger
+from .fanout import STEAL_RESERVE, TIMEOUT_ERROR, UPSTREAM_WORKERS, fan_out, first_result, get_upstream_executor
+from .http_client import close_sessions, get_pool_stats, http_get
+from .cache_views import CacheStatsView
+from .cache_utils import (
+    cached_api_view,
+    cached_fragments,
+    cached_result,
+    conditional_get,
+    generate_cache_key,
+    get_many,
+    get_or_revalidate,
+    get_single_flight_stats,
+    get_tag_versions,
+    invalidate_tags,
+    set_many,
+    single_flight_get_or_set,
+    Uncached,
+    user_tag,
+    versioned_cache_key,
+)
+
+
+class TagInvalidationTests(SimpleTestCase):
+    """Tests for tag/generation based invalidation."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_generate_cache_key_keeps_prefix(self):
+        """Test generated keys stay matchable by prefix."""
+        key = generate_cache_key(29.76, -95.37, prefix="weather_combined")
+        
+        self.assertTrue(key.startswith("weather_combined:"))
+    
+    def test_versioned_key_changes_on_invalidate(self):
+        """Test bumping a tag changes every dependent key."""
+        tag = user_tag(42, "financials")
+        before = versioned_cache_key("summary:abc", [tag])
+        
+        invalidate_tags(tag)
+        
+        self.assertNotEqual(before, versioned_cache_key("summary:abc", [tag]))
+    
+    def test_invalidate_missing_tag(self):
+        """Test invalidating a tag that was never read creates a counter."""
+        invalidate_tags("user:7:travel")
+        
+        self.assertIn("user:7:travel", get_tag_versions(["user:7:travel"]))
+    
+    def test_cached_result_with_tags(self):
+        """Test cached_result recomputes after its tag is invalidated."""
+        calls = []
+        
+        @cached_result(ttl=60, prefix="test", tags=lambda user_id: [user_tag(user_id, "financials")])
+        def compute(user_id):
+            calls.append(user_id)
+            return len(calls)
+        
+        self.assertEqual(compute(1), 1)
+        self.assertEqual(compute(1), 1)
+        
+        invalidate_tags(user_tag(1, "financials"))
+        
+        self.assertEqual(compute(1), 2)
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Tests for single-flight recomputation."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_concurrent_misses_compute_once(self):
+        """Test concurrent callers of a cold key share one recompute."""
+        calls = []
+        results = []
+        
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'value': 42}
+        
+        def worker():
+            value, _ = single_flight_get_or_set("sf:test", compute, ttl=60)
+            results.append(value)
+        
+        before = get_single_flight_stats()['process']['coalesced']
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'value': 42}] * 5)
+        self.assertEqual(get_single_flight_stats()['process']['coalesced'] - before, 4)
+    
+    def test_expired_envelope_is_recomputed(self):
+        """Test an entry past its logical expiry is refreshed."""
+        cache.set("sf:stale", {'value': 'old', 'expires_at': time.time() - 1, 'delta': 0.1}, 60)
+        
+        value, hit = single_flight_get_or_set("sf:stale", lambda: 'new', ttl=60)
+        
+        self.assertEqual(value, 'new')
+        self.assertFalse(hit)
+    
+    def test_uncached_value_is_returned_but_not_stored(self):
+        """Test Uncached(...) results reach the caller without being cached."""
+        value, hit = single_flight_get_or_set("sf:partial", lambda: Uncached({'partial': True}), ttl=60)
+        
+        self.assertEqual(value, {'partial': True})
+        self.assertFalse(hit)
+        self.assertIsNone(cache.get("sf:partial"))
+
+
+class StaleWhileRevalidateTests(SimpleTestCase):
+    """Tests for serving stale entries during background refresh."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_expired_entry_served_stale_then_refreshed(self):
+        """Test an expired entry is returned immediately and refreshed in the background."""
+        now = time.time()
+        cache.set("swr:test", {'value': 'old', 'stored_at': now - 120, 'expires_at': now - 60, 'delta': 0}, 600)
+        
+        value, state, age = get_or_revalidate("swr:test", lambda: 'new', ttl=60, stale_ttl=300)
+        
+        self.assertEqual((value, state), ('old', 'STALE'))
+        self.assertGreaterEqual(age, 120)
+        
+        deadline = time.time() + 2
+        while time.time() < deadline and cache.get("swr:test")['value'] != 'new':
+            time.sleep(0.01)
+        self.assertEqual(get_or_revalidate("swr:test", lambda: 'newer', ttl=60, stale_ttl=300)[:2], ('new', 'HIT'))
+    
+    def test_expired_entry_without_stale_window_recomputes(self):
+        """Test stale_ttl=0 keeps the synchronous recompute behaviour."""
+        now = time.time()
+        cache.set("swr:sync", {'value': 'old', 'stored_at': now - 120, 'expires_at': now - 60, 'delta': 0}, 600)
+        
+        value, state, _ = get_or_revalidate("swr:sync", lambda: 'new', ttl=60)
+        
+        self.assertEqual((value, state), ('new', 'MISS'))
+
+
+class TwoTierCacheTests(SimpleTestCase):
+    """Tests for the in-process L1 tier."""
+    
+    def test_lru_respects_entry_and_byte_budgets(self):
+        """Test least recently used entries are evicted first."""
+        lru = LocalLRU(max_entries=2, max_bytes=100)
+        lru.set('a', 1, size=10)
+        lru.set('b', 2, size=10)
+        lru.get('a')
+        lru.set('c', 3, size=10)
+        
+        self.assertEqual(lru.get('b'), None)
+        self.assertEqual(lru.get('a'), 1)
+        
+        lru.set('big', 4, size=95)
+        
+        self.assertEqual(len(lru), 1)
+        self.assertEqual(lru.size_bytes, 95)
+    
+    def test_lru_entries_expire(self):
+        """Test entries are dropped once their TTL passes."""
+        lru = LocalLRU()
+        lru.set('a', 1, ttl=0.01)
+        time.sleep(0.02)
+        
+        self.assertIsNone(lru.get('a'))
+    
+    def test_invalidation_message_drops_l1_copy(self):
+        """Test pub/sub messages from other workers evict L1 entries."""
+        backend = TwoTierRedisCache('redis://localhost:6379/0', {'KEY_PREFIX': 'test'})
+        full_key = backend.make_key('map_tile_config')
+        backend._l1.set(full_key, {'precipitation': {}}, size=10)
+        
+        backend._handle_message(json.dumps({'origin': backend._origin, 'keys': [full_key]}))
+        self.assertIsNotNone(backend._l1.get(full_key))
+        
+        backend._handle_message(json.dumps({'origin': 'other-worker', 'keys': [full_key]}))
+        self.assertIsNone(backend._l1.get(full_key))
+
+
+class RedisStubHandler(StreamRequestHandler):
+    """Minimal RESP server: the commands the two-tier backend sends, with key expiry."""
+    data = {}       # key -> (value, expires_at or None)
+    commands = []   # (command, *args) in arrival order
+    
+    @classmethod
+    def reset(cls):
+        cls.data = {}
+        cls.commands = []
+    
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line.startswith(b'*'):
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+    
+    def _live(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            return None, None
+        return value, expires_at
+    
+    def _bulk(self, value):
+        return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+    
+    def _reply(self, name, args):
+        if name == 'GET':
+            return self._bulk(self._live(args[0])[0])
+        if name == 'MGET':
+            return b'*%d\r\n' % len(args) + b''.join(self._bulk(self._live(k)[0]) for k in args)
+        if name == 'PTTL':
+            value, expires_at = self._live(args[0])
+            if value is None:
+                return b':-2\r\n'
+            return b':-1\r\n' if expires_at is None else b':%d\r\n' % int((expires_at - time.monotonic()) * 1000)
+        if name == 'SET':
+            options = [a.upper() for a in args[2:]]
+            exists = self._live(args[0])[0] is not None
+            if (b'NX' in options and exists) or (b'XX' in options and not exists):
+                return b'$-1\r\n'
+            expires_at = None
+            if b'PX' in options:
+                expires_at = time.monotonic() + int(args[2 + options.index(b'PX') + 1]) / 1000
+            self.data[args[0]] = (args[1], expires_at)
+            return b'+OK\r\n'
+        if name == 'DEL':
+            return b':%d\r\n' % sum(self.data.pop(k, None) is not None for k in args)
+        if name == 'PUBLISH':
+            return b':0\r\n'
+        if name == 'SUBSCRIBE':
+            return b'*3\r\n$9\r\nsubscribe\r\n' + self._bulk(args[0]) + b':1\r\n'
+        if name == 'PING':
+            return b'+PONG\r\n'
+        return b'+OK\r\n'
+    
+    def handle(self):
+        while True:
+            try:
+                args = self._read_command()
+            except (OSError, ValueError):
+                return
+            if args is None:
+                return
+            name = args[0].decode().upper()
+            self.commands.append((name, *args[1:]))
+            self.wfile.write(self._reply(name, args[1:]))
+
+
+class TwoTierRedisTests(SimpleTestCase):
+    """Tests for the two-tier backend's Redis traffic, against a RESP stub."""
+    
+    def setUp(self):
+        RedisStubHandler.reset()
+        self.server = ThreadingTCPServer(('127.0.0.1', 0), RedisStubHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.location = f"redis://127.0.0.1:{self.server.server_address[1]}/0"
+        self.backend = self._subscribed(TwoTierRedisCache(self.location, {'KEY_PREFIX': 'test'}))
+    
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def _subscribed(self, backend):
+        """Start the backend's invalidation listener and wait until it has subscribed."""
+        backend._ensure_listener()
+        deadline = time.monotonic() + 2
+        while not any(c[0] == 'SUBSCRIBE' for c in RedisStubHandler.commands) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)   # the listener clears L1 right after subscribing
+        return backend
+    
+    def _commands(self, name):
+        return [c for c in RedisStubHandler.commands if c[0] == name]
+    
+    def test_l1_copy_expires_with_redis_key(self):
+        """Test an L1 copy lives no longer than the key's remaining Redis TTL."""
+        TwoTierRedisCache(self.location, {'KEY_PREFIX': 'test'}).set('short', {'v': 1}, timeout=0.2)
+        
+        self.assertEqual(self.backend.get('short'), {'v': 1})
+        self.assertEqual(self.backend._l1.size_bytes, len(RedisStubHandler.data[b'test:1:short'][0]))
+        time.sleep(0.3)
+        
+        self.assertIsNone(self.backend.get('short'))
+    
+    def test_pipelined_sets_publish_once_after_execute(self):
+        """Test writes into a caller's pipeline are broadcast only once it has executed."""
+        pipeline = self.backend.client.get_client(write=True).pipeline(transaction=False)
+        self.backend.set('a', 1, 60, client=pipeline)
+        self.backend.set('b', {'x': 2}, 60, client=pipeline)
+        
+        self.assertEqual(self._commands('PUBLISH'), [])
+        pipeline.execute()
+        self.backend.commit_pipelined()
+        
+        publishes = self._commands('PUBLISH')
+        self.assertEqual(len(publishes), 1)
+        self.assertEqual(json.loads(publishes[0][2])['keys'], ['test:1:a', 'test:1:b'])
+        self.assertEqual(self.backend.get('b'), {'x': 2})
+        self.assertEqual(self._commands('GET'), [])
+    
+    def test_l1_hits_return_independent_copies(self):
+        """Test mutating a value returned by get does not change what later gets see."""
+        self.backend.set('written', {'rows': [1, 2]}, 60)
+        TwoTierRedisCache(self.location, {'KEY_PREFIX': 'test'}).set('read', {'rows': [1, 2]}, 60)
+        
+        for key in ('written', 'read'):
+            self.backend.get(key)['rows'].append(3)
+            value = self.backend.get(key)
+            value['rows'].append(4)
+            
+            self.assertEqual(self.backend.get(key), {'rows': [1, 2]})
+            self.assertEqual(self.backend.get_many([key]), {key: {'rows': [1, 2]}})
+        self.assertEqual(len(self._commands('GET')), 1)
+
+
+class CompactSerializerTests(SimpleTestCase):
+    """Tests for the compact msgpack/JSON + compression cache serializer."""
+    
+    def setUp(self):
+        self.serializer = CompactSerializer({'COMPACT_SERIALIZER': {'FORMAT': 'json', 'COMPRESSOR': 'zlib', 'THRESHOLD': 256}})
+        self.payload = {
+            'current': {'temperature': 21.5, 'condition': 'Clear', 'is_day': True},
+            'hourly': [{'time': f'2024-01-01T{h:02d}:00', 'temperature': 20 + h / 10, 'precip': None} for h in range(48)],
+        }
+    
+    def test_plain_payload_round_trips_compressed(self):
+        """Test JSON-shaped payloads are stored as compressed JSON, smaller than pickle."""
+        blob = self.serializer.dumps(self.payload)
+        
+        self.assertEqual(describe(blob), 'json+zlib')
+        self.assertLess(len(blob), len(pickle.dumps(self.payload, pickle.HIGHEST_PROTOCOL)))
+        self.assertEqual(self.serializer.loads(blob), self.payload)
+    
+    def test_small_payload_is_not_compressed(self):
+        """Test values under the threshold skip compression."""
+        blob = self.serializer.dumps({'ok': True})
+        
+        self.assertEqual(describe(blob), 'json+none')
+        self.assertEqual(self.serializer.loads(blob), {'ok': True})
+    
+    def test_non_json_values_fall_back_to_pickle(self):
+        """Test Decimals, tuples and int-keyed dicts keep their types."""
+        value = {'balance': Decimal('10.50'), 'point': (1, 2), 'by_id': {1: 'a'}}
+        blob = self.serializer.dumps(value)
+        
+        self.assertTrue(describe(blob).startswith('pickle+'))
+        self.assertEqual(self.serializer.loads(blob), value)
+    
+    def test_legacy_pickle_entries_still_decode(self):
+        """Test entries written by the default pickle serializer are readable."""
+        legacy = pickle.dumps(self.payload, pickle.HIGHEST_PROTOCOL)
+        
+        self.assertEqual(describe(legacy), 'legacy-pickle')
+        self.assertEqual(self.serializer.loads(legacy), self.payload)
+
+
+class RenderedReportView(APIView):
+    permission_classes = [AllowAny]
+    calls = 0
+    
+    @cached_api_view(ttl=60, key_prefix="test_rendered", rendered=True)
+    def get(self, request):
+        RenderedReportView.calls += 1
+        return Response({'rows': [{'label': f'row {i}', 'value': i} for i in range(50)]})
+
+
+class RenderedResponseCacheTests(SimpleTestCase):
+    """Tests for caching rendered response bytes."""
+    
+    def setUp(self):
+        cache.clear()
+        RenderedReportView.calls = 0
+        self.factory = APIRequestFactory()
+        self.view = RenderedReportView.as_view()
+    
+    def test_hit_served_from_rendered_bytes(self):
+        """Test a hit returns the same bytes and ETag without running the view."""
+        first = self.view(self.factory.get('/report/'))
+        second = self.view(self.factory.get('/report/'))
+        
+        self.assertEqual(RenderedReportView.calls, 1)
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(json.loads(second.content)['rows'][3], {'label': 'row 3', 'value': 3})
+    
+    def test_gzip_variant_served_when_accepted(self):
+        """Test clients accepting gzip get the precompressed body."""
+        plain = self.view(self.factory.get('/report/'))
+        gzipped = self.view(self.factory.get('/report/', HTTP_ACCEPT_ENCODING='gzip, br'))
+        
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzipped['ETag'], f"W/{plain['ETag']}")
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+    
+    def test_matching_if_none_match_returns_304(self):
+        """Test a cached ETag short-circuits to 304 Not Modified."""
+        etag = self.view(self.factory.get('/report/'))['ETag']
+        
+        response = self.view(self.factory.get('/report/', HTTP_IF_NONE_MATCH=f'W/{etag}'))
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+
+class StaleReportView(APIView):
+    permission_classes = [AllowAny]
+    build = 0
+    
+    @conditional_get(tags=["report"], max_age=600)
+    @cached_api_view(ttl=60, key_prefix="test_stale_report", tags=["report"], stale_ttl=300, rendered=True)
+    def get(self, request):
+        StaleReportView.build += 1
+        return Response({'build': StaleReportView.build})
+
+
+class StaleConditionalGetTests(SimpleTestCase):
+    """Tests for conditional GET over stale-while-revalidate responses."""
+    
+    def setUp(self):
+        cache.clear()
+        StaleReportView.build = 0
+        self.factory = APIRequestFactory()
+        self.view = StaleReportView.as_view()
+    
+    def test_etag_changes_when_refresh_changes_body(self):
+        """Test a background refresh yields a new ETag although no tag was invalidated."""
+        first = self.view(self.factory.get('/stale-report/'))
+        etag = first['ETag']
+        self.assertEqual(self.view(self.factory.get('/stale-report/', HTTP_IF_NONE_MATCH=etag)).status_code, 304)
+        
+        # Expire the entry in place, as the TTL would
+        cache_key = StaleReportView.get.swr_cache_key(self.factory.get('/stale-report/'))
+        envelope = cache.get(cache_key)
+        envelope['expires_at'] = time.time() - 1
+        cache.set(cache_key, envelope, 300)
+        
+        stale = self.view(self.factory.get('/stale-report/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual((stale.status_code, stale['X-Cache']), (200, 'STALE'))
+        self.assertEqual(json.loads(stale.content), {'build': 1})
+        self.assertEqual(stale['ETag'], etag)
+        
+        deadline = time.time() + 2
+        while time.time() < deadline and cache.get(cache_key)['value']['body'] == first.content:
+            time.sleep(0.01)
+        
+        fresh = self.view(self.factory.get('/stale-report/', HTTP_IF_NONE_MATCH=stale['ETag']))
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(json.loads(fresh.content), {'build': 2})
+        self.assertNotEqual(fresh['ETag'], etag)
+        self.assertEqual(self.view(self.factory.get('/stale-report/', HTTP_IF_NONE_MATCH=fresh['ETag'])).status_code, 304)
+
+
+class CacheMetricsTests(SimpleTestCase):
+    """Tests for per-prefix cache instrumentation."""
+    
+    def setUp(self):
+        cache.clear()
+        reset_prefix_stats()
+    
+    def test_hits_misses_and_sizes_recorded_per_prefix(self):
+        """Test lookups and writes are bucketed by key prefix."""
+        metered_get("financials_timeline:abc")
+        metered_set("financials_timeline:abc", {'points': list(range(100))}, 60)
+        metered_get("financials_timeline:abc")
+        metered_get("weather:xyz")
+        
+        stats = get_prefix_stats()
+        
+        self.assertEqual(stats['financials_timeline']['hits'], 1)
+        self.assertEqual(stats['financials_timeline']['misses'], 1)
+        self.assertEqual(stats['financials_timeline']['hit_rate'], 50.0)
+        self.assertGreater(stats['financials_timeline']['avg_set_bytes'], 100)
+        self.assertEqual(stats['weather']['misses'], 1)
+    
+    def test_set_sizes_are_sampled_without_backend_sizes(self):
+        """Test only one write in SIZE_SAMPLE_EVERY is pickled when the backend can't report sizes."""
+        for i in range(SIZE_SAMPLE_EVERY + 1):
+            metered_set(f"weather_combined:{i}", {'rows': list(range(50))}, 60)
+        
+        stats = get_prefix_stats()['weather_combined']
+        
+        self.assertEqual(stats['sets'], SIZE_SAMPLE_EVERY + 1)
+        self.assertGreater(stats['avg_set_bytes'], 50)
+        self.assertEqual(_totals['weather_combined']['sized_sets'], 2)
+    
+    def test_stats_endpoint_is_staff_only(self):
+        """Test the JSON endpoint rejects non-staff users."""
+        view = CacheStatsView.as_view()
+        factory = APIRequestFactory()
+        metered_get("weather:xyz")
+        
+        request = factory.get('/api/cache/stats/')
+        force_authenticate(request, user=User(username='member', is_staff=False))
+        self.assertEqual(view(request).status_code, 403)
+        
+        request = factory.get('/api/cache/stats/')
+        force_authenticate(request, user=User(username='admin', is_staff=True))
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['prefixes']['weather']['misses'], 1)
+
+
+class CacheWarmingTests(SimpleTestCase):
+    """Tests for cache warming helpers."""
+    
+    def test_rate_limiter_spaces_calls_across_threads(self):
+        """Test a limiter paces concurrent callers to its rate."""
+        limiter = RateLimiter(rate=50)
+        started = time.monotonic()
+        
+        threads = [threading.Thread(target=limiter.wait) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50 - 0.01)
+
+
+class BatchOperationTests(SimpleTestCase):
+    """Tests for multi-key cache helpers and fragments."""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_set_many_applies_per_key_ttls(self):
+        """Test each key gets its own TTL."""
+        set_many({'batch:a': 1, 'batch:b': 2}, ttl=60, ttls={'batch:b': 0.05})
+        time.sleep(0.1)
+        
+        self.assertEqual(get_many(['batch:a', 'batch:b', 'batch:c']), {'batch:a': 1})
+    
+    def test_set_many_on_two_tier_backend_is_one_round_trip(self):
+        """Test a two-tier set_many sends its writes and a single invalidation after them."""
+        RedisStubHandler.reset()
+        server = ThreadingTCPServer(('127.0.0.1', 0), RedisStubHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        location = f"redis://127.0.0.1:{server.server_address[1]}/0"
+        
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'app1.cache_backends.TwoTierRedisCache', 'LOCATION': location, 'KEY_PREFIX': 'test',
+        }}):
+            TwoTierRedisTests._subscribed(self, caches['default'])
+            set_many({'batch:a': 1, 'batch:b': {'rows': [1, 2]}, 'batch:c': 'x'}, ttl=60)
+            found = get_many(['batch:a', 'batch:b', 'batch:c'])
+        
+        names = [c[0] for c in RedisStubHandler.commands if c[0] not in ('SUBSCRIBE', 'CLIENT')]
+        self.assertEqual(names, ['SET', 'SET', 'SET', 'PUBLISH'])
+        self.assertEqual(found, {'batch:a': 1, 'batch:b': {'rows': [1, 2]}, 'batch:c': 'x'})
+    
+    def test_fragments_compute_only_misses(self):
+        """Test cached sections are reused and only missing ones are computed."""
+        calls = []
+        
+        def section(name):
+            def compute():
+                calls.append(name)
+                return {'name': name}
+            return compute
+        
+        sections = {'summary': section('summary'), 'timeline': (section('timeline'), 60)}
+        first = cached_fragments(sections, prefix="test_dashboard", key_parts=[1])
+        
+        sections['alerts'] = section('alerts')
+        second = cached_fragments(sections, prefix="test_dashboard", key_parts=[1])
+        
+        self.assertEqual(first, {'summary': {'name': 'summary'}, 'timeline': {'name': 'timeline'}})
+        self.assertEqual(second['alerts'], {'name': 'alerts'})
+        self.assertEqual(calls, ['summary', 'timeline', 'alerts'])
+    
+    def test_fragments_invalidated_by_tag(self):
+        """Test bumping a tag recomputes every section."""
+        calls = []
+        sections = {'summary': lambda: calls.append(1) or len(calls)}
+        
+        cached_fragments(sections, prefix="test_dashboard", key_parts=[2], tags=['user:2:test'])
+        invalidate_tags('user:2:test')
+        value = cached_fragments(sections, prefix="test_dashboard", key_parts=[2], tags=['user:2:test'])
+        
+        self.assertEqual(value, {'summary': 2})
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """Tests for the cache-backed circuit breaker."""
+    
+    def setUp(self):
+        cache.clear()
+        self.breaker = CircuitBreaker("test", failure_threshold=2, cooldown=0.1)
+    
+    def test_opens_after_threshold_failures(self):
+        """Test repeated failures open the circuit for every caller."""
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow_request())
+        
+        self.breaker.record_failure()
+        
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertFalse(CircuitBreaker("test").allow_request())
+    
+    def test_half_open_allows_single_probe(self):
+        """Test one probe is let through after the cooldown and success closes it."""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        time.sleep(0.15)
+        
+        self.assertEqual(self.breaker.state, 'half_open')
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+        
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+    
+    def test_failed_probe_doubles_cooldown(self):
+        """Test a failing half-open probe re-opens with a longer cooldown."""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        time.sleep(0.15)
+        self.breaker.allow_request()
+        
+        self.breaker.record_failure()
+        
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertEqual(self.breaker.status()['cooldown'], 0.2)
+
+
+class QuotaLedgerTests(SimpleTestCase):
+    """Tests for the shared daily quota ledger."""
+    
+    def setUp(self):
+        cache.clear()
+        self.ledger = QuotaLedger("test", daily_limit=3)
+    
+    def test_calls_stop_at_daily_limit(self):
+        """Test acquire() fails once the day's quota is used."""
+        self.assertEqual([self.ledger.acquire() for _ in range(4)], [True, True, True, False])
+        self.assertEqual(self.ledger.status()['used'], 3)
+        self.assertEqual(self.ledger.remaining(), 0)
+    
+    def test_reservation_is_held_back(self):
+        """Test a reserving caller leaves the reserved units for others."""
+        self.assertTrue(self.ledger.acquire(reserve=1))
+        self.assertTrue(self.ledger.acquire(reserve=1))
+        self.assertFalse(self.ledger.acquire(reserve=1))
+        
+        self.assertTrue(self.ledger.acquire())
+    
+    def test_exhaust_blocks_rest_of_day(self):
+        """Test a provider-side rate limit uses up the remaining quota."""
+        self.ledger.exhaust()
+        
+        self.assertFalse(self.ledger.acquire())
+
+
+class FanOutTests(SimpleTestCase):
+    """Tests for concurrent upstream fan-out."""
+    
+    def test_runs_tasks_concurrently(self):
+        """Test independent tasks overlap instead of running back to back."""
+        started = time.monotonic()
+        results, errors = fan_out({
+            name: (lambda name=name: time.sleep(0.2) or name) for name in ('a', 'b', 'c')
+        }, timeout=5)
+        
+        self.assertEqual(results, {'a': 'a', 'b': 'b', 'c': 'c'})
+        self.assertEqual(errors, {})
+        self.assertLess(time.monotonic() - started, 0.5)
+    
+    def test_partial_results_carry_error_markers(self):
+        """Test failed, empty and late tasks are reported per section."""
+        def boom():
+            raise ValueError("upstream down")
+        
+        results, errors = fan_out({
+            'ok': lambda: {'temp': 20},
+            'failed': boom,
+            'empty': lambda: None,
+            'slow': lambda: time.sleep(0.5) or 'late',
+        }, timeout=0.1)
+        
+        self.assertEqual(results, {'ok': {'temp': 20}})
+        self.assertEqual(errors['failed'], 'upstream down')
+        self.assertEqual(errors['empty'], 'unavailable')
+        self.assertEqual(errors['slow'], TIMEOUT_ERROR)
+    
+    def test_slow_first_task_is_bounded_by_deadline(self):
+        """Test the first task is cut off at the deadline like the others."""
+        started = time.monotonic()
+        results, errors = fan_out({
+            'first': lambda: time.sleep(1) or 'late',
+            'second': lambda: 'ok',
+        }, timeout=0.2)
+        
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(results, {'second': 'ok'})
+        self.assertEqual(errors, {'first': TIMEOUT_ERROR})
+    
+    def saturate_pool(self):
+        """Occupy every upstream worker until the returned event is set."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        executor = get_upstream_executor()
+        for _ in range(UPSTREAM_WORKERS):
+            executor.submit(release.wait)
+        return release
+    
+    def test_saturated_pool_still_meets_deadline(self):
+        """Test the caller does not run tasks itself when it could not stop them in time."""
+        self.saturate_pool()
+        started = time.monotonic()
+        
+        results, errors = fan_out({
+            name: (lambda: time.sleep(STEAL_RESERVE) or 'late') for name in ('a', 'b', 'c')
+        }, timeout=0.5)
+        
+        self.assertLess(time.monotonic() - started, 0.5 + 0.3)
+        self.assertEqual(results, {})
+        self.assertEqual(errors, {name: TIMEOUT_ERROR for name in ('a', 'b', 'c')})
+    
+    def test_saturated_pool_tasks_run_inline_one_at_a_time(self):
+        """Test queued tasks are taken over one per pass while there is time left."""
+        self.saturate_pool()
+        running, overlaps = [], []
+        
+        def task(name):
+            running.append(name)
+            overlaps.append(len(running))
+            time.sleep(0.05)
+            running.remove(name)
+            return name
+        
+        results, errors = fan_out({name: (lambda name=name: task(name)) for name in ('a', 'b', 'c')}, timeout=5)
+        
+        self.assertEqual(results, {'a': 'a', 'b': 'b', 'c': 'c'})
+        self.assertEqual(errors, {})
+        self.assertEqual(overlaps, [1, 1, 1])
+    
+    def test_nested_fan_out_completes(self):
+        """Test tasks that fan out again finish even with many callers at once."""
+        def inner():
+            results, _ = fan_out({n: (lambda n=n: n) for n in range(3)}, timeout=5)
+            return len(results)
+        
+        outcomes = []
+        threads = [
+            threading.Thread(target=lambda: outcomes.append(fan_out({
+                n: inner for n in range(4)
+            }, timeout=5)[0]))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(outcomes, [{n: 3 for n in range(4)}] * 10)
+    
+    def test_slow_attempt_is_hedged(self):
+        """Test the backup starts after the hedge delay and the first valid result wins."""
+        hedged = []
+        
+        name, result = first_result(
+            [('primary', lambda: time.sleep(0.5) or 'slow'), ('backup', lambda: 'fast')],
+            hedge_delay=lambda current, following: 0.05,
+            on_hedge=hedged.append,
+        )
+        
+        self.assertEqual((name, result), ('backup', 'fast'))
+        self.assertEqual(hedged, ['backup'])
+    
+    def test_no_hedge_without_delay(self):
+        """Test attempts fall back only after a failure when hedging is declined."""
+        started = []
+        
+        def attempt(name, value):
+            started.append(name)
+            return value
+        
+        name, result = first_result(
+            [('primary', lambda: attempt('primary', None)), ('backup', lambda: attempt('backup', 'ok'))],
+            hedge_delay=lambda current, following: None,
+        )
+        
+        self.assertEqual((name, result), ('backup', 'ok'))
+        self.assertEqual(started, ['primary', 'backup'])
+
+
+class UpstreamStubHandler(BaseHTTPRequestHandler):
+    """Keep-alive upstream that fails the first `failures` requests with a 503."""
+    protocol_version = 'HTTP/1.1'
+    failures = 0
+    
+    def do_GET(self):
+        cls = type(self)
+        status_code = 503 if cls.failures > 0 else 200
+        cls.failures -= 1
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+class HttpClientTests(SimpleTestCase):
+    """Tests for pooled outbound HTTP sessions."""
+    
+    def setUp(self):
+        UpstreamStubHandler.failures = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), UpstreamStubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        close_sessions()
+    
+    def tearDown(self):
+        close_sessions()
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def test_connections_are_reused(self):
+        """Test sequential calls to one host share a single connection."""
+        for i in range(3):
+            self.assertEqual(http_get(f"{self.base}/forecast?i={i}", timeout=5).status_code, 200)
+        
+        stats = get_pool_stats()[self.base]
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['connections_opened'], 1)
+    
+    def test_server_errors_are_retried(self):
+        """Test a transient 5xx is retried transparently."""
+        UpstreamStubHandler.failures = 1
+        
+        response = http_get(f"{self.base}/forecast", timeout=5)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_pool_stats()[self.base]['retries'], 1)
@@ -18,6 +18,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .cache_views import CacheStatsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("auth/", include("auth_app.urls")),
@@ -27,4 +29,5 @@ urlpatterns = [
     path("api/financials/", include("financials_app.urls")),
     path("api/subscriptions/", include("subscriptions_app.urls")),
     path("api/travel/", include("travel_app.urls")),
+    path("api/cache/stats/", CacheStatsView.as_view(), name="cache_stats"),
 ]
@@ -5,3 +5,7 @@ class FinancialsAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "financials_app"
     verbose_name = "Financials Dashboard"
+
+    def ready(self):
+        # Register cache invalidation signals
+        from . import signals  # noqa: F401
@@ -0,0 +1,26 @@
+"""
+Cache invalidation for the financials dashboard.
+
+Any write to a user's financial data bumps the "user:<id>:financials" tag so
+cached accounts, timeline and dashboard responses are refreshed immediately.
+"""
+
+from app1.cache_utils import register_tag_invalidation
+
+from .models import (
+    FinancialAccount,
+    AccountSnapshot,
+    FinancialsSnapshot,
+    CashFlowEntry,
+    FinancialsMilestone,
+    ChangeLog,
+    AccountGroup,
+)
+
+register_tag_invalidation(FinancialAccount, "financials", "owner_id")
+register_tag_invalidation(AccountSnapshot, "financials", "account.owner_id")
+register_tag_invalidation(FinancialsSnapshot, "financials", "owner_id")
+register_tag_invalidation(CashFlowEntry, "financials", "owner_id")
+register_tag_invalidation(FinancialsMilestone, "financials", "owner_id")
+register_tag_invalidation(ChangeLog, "financials", "owner_id")
+register_tag_invalidation(AccountGroup, "financials", "owner_id")
@@ -236,15 +236,69 @@ class FinancialsAPITests(APITestCase):
         response = self.client.get('/api/financials/dashboard/summary/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('net_worth', response.data)
+        self.assertIn('net_worth', response.json())
     
     def test_full_dashboard(self):
         """Test full dashboard data endpoint."""
         response = self.client.get('/api/financials/dashboard/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('summary', response.data)
-        self.assertIn('accounts', response.data)
-        self.assertIn('milestones', response.data)
-
-
+        data = response.json()
+        self.assertIn('summary', data)
+        self.assertIn('accounts', data)
+        self.assertIn('milestones', data)
+    
+    def test_dashboard_summary_refreshes_after_write(self):
+        """Test cached summary is invalidated when account data changes."""
+        first = self.client.get('/api/financials/dashboard/summary/')
+        
+        account = FinancialAccount.objects.create(
+            owner=self.user,
+            name='Savings',
+            account_type='cash',
+        )
+        AccountSnapshot.objects.create(
+            account=account,
+            value=Decimal('2500.00'),
+            recorded_at=date.today(),
+        )
+        FinancialsService(self.user).create_financials_snapshot()
+        
+        second = self.client.get('/api/financials/dashboard/summary/')
+        
+        self.assertEqual(second['X-Cache'], 'MISS')
+        self.assertNotEqual(first.json()['net_worth'], second.json()['net_worth'])
+    
+    def test_dashboard_summary_conditional_get(self):
+        """Test matching If-None-Match returns 304 until account data changes."""
+        etag = self.client.get('/api/financials/dashboard/summary/')['ETag']
+        
+        not_modified = self.client.get('/api/financials/dashboard/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        FinancialAccount.objects.create(
+            owner=self.user,
+            name='Brokerage',
+            account_type='investment',
+        )
+        
+        modified = self.client.get('/api/financials/dashboard/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(modified['ETag'], etag)
+    
+    def test_warmed_dashboard_served_from_cache(self):
+        """Test the cache warmer stores the dashboard sections a real request then hits."""
+        from app1.cache_warming import CacheWarmer
+        
+        account = FinancialAccount.objects.create(
+            owner=self.user,
+            name='Checking',
+            account_type='cash',
+        )
+        
+        self.assertEqual(CacheWarmer.warm_dashboards(self.user), 'warmed')
+        
+        # update() sends no signals, so the warmed sections stay current
+        FinancialAccount.objects.filter(pk=account.pk).update(name='Renamed')
+        response = self.client.get('/api/financials/dashboard/')
+        self.assertEqual(response.json()['accounts']['cash'][0]['name'], 'Checking')
@@ -15,7 +15,14 @@ from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.conf import settings
 
-from app1.cache_utils import CacheableMixin, cached_api_view, generate_cache_key
+from app1.cache_utils import (
+    CacheableMixin,
+    cached_api_view,
+    cached_fragments,
+    conditional_get,
+    generate_cache_key,
+    user_tag,
+)
 
 from .models import (
     FinancialAccount,
@@ -53,6 +60,8 @@ class FinancialAccountViewSet(CacheableMixin, viewsets.ModelViewSet):
     cache_ttl = settings.CACHE_TTL.get("financials_accounts", 300)
     cache_prefix = "financials_accounts"
     cache_per_user = True
+    cache_scope = "financials"
+    cache_conditional = True
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -297,10 +306,16 @@ class DashboardSummaryView(APIView):
     
     permission_classes = [IsAuthenticated]
     
+    @conditional_get(
+        tags=["user:{user_id}:financials"],
+        max_age=settings.CACHE_TTL.get("financials_summary", 600),
+    )
     @cached_api_view(
         ttl=settings.CACHE_TTL.get("financials_summary", 600),
         key_prefix="financials_summary",
-        include_user=True
+        include_user=True,
+        tags=["user:{user_id}:financials"],
+        rendered=True,
     )
     def get(self, request):
         service = FinancialsService(request.user)
@@ -312,10 +327,16 @@ class TimelineView(APIView):
     
     permission_classes = [IsAuthenticated]
     
+    @conditional_get(
+        tags=["user:{user_id}:financials"],
+        max_age=settings.CACHE_TTL.get("financials_snapshots", 600),
+    )
     @cached_api_view(
         ttl=settings.CACHE_TTL.get("financials_snapshots", 600),
         key_prefix="financials_timeline",
-        include_user=True
+        include_user=True,
+        tags=["user:{user_id}:financials"],
+        rendered=True,
     )
     def get(self, request):
         # Parse query params
@@ -370,14 +391,18 @@ class InsightsView(APIView):
 
 
 class FullDashboardView(APIView):
-    """Get all dashboard data in one request."""
+    """
+    Get all dashboard data in one request.
+    
+    Caching is per section (cached_fragments) rather than per response, so
+    switching the range reuses every section but the timeline.
+    """
     
     permission_classes = [IsAuthenticated]
     
-    @cached_api_view(
-        ttl=settings.CACHE_TTL.get("financials_summary", 600),
-        key_prefix="financials_full_dashboard",
-        include_user=True
+    @conditional_get(
+        tags=["user:{user_id}:financials"],
+        max_age=settings.CACHE_TTL.get("financials_summary", 600),
     )
     def get(self, request):
         user = request.user
@@ -397,20 +422,47 @@ class FullDashboardView(APIView):
             '1y': timedelta(days=365),
             'all': timedelta(days=365 * 10),
         }
-        delta = ranges.get(range_param, timedelta(days=365))
-        start_date = end_date - delta
+        if range_param not in ranges:
+            range_param = '1y'
+        start_date = end_date - ranges[range_param]
         
-        return Response({
-            'summary': nw_service.get_dashboard_summary(),
-            'timeline': nw_service.get_timeline_data(start_date, end_date),
-            'forecast': nw_service.get_forecast(12),
-            'accounts': nw_service.get_accounts_breakdown(),
-            'cash_flow': cf_service.get_monthly_summary(),
-            'insights': {
-                'recent_changes': insight_service.get_recent_changes(10),
-                'monthly_insights': insight_service.get_monthly_insights(),
+        # Sections are cached independently (one round-trip for all of them), so
+        # switching the range only recomputes the timeline
+        ttl = settings.CACHE_TTL.get("financials_summary", 600)
+        timeline_section = f'timeline_{range_param}'
+        sections = cached_fragments(
+            {
+                'summary': nw_service.get_dashboard_summary,
+                timeline_section: (
+                    lambda: nw_service.get_timeline_data(start_date, end_date),
+                    settings.CACHE_TTL.get("financials_snapshots", 600),
+                ),
+                'forecast': lambda: nw_service.get_forecast(12),
+                'accounts': (
+                    nw_service.get_accounts_breakdown,
+                    settings.CACHE_TTL.get("financials_accounts", 300),
+                ),
+                'cash_flow': cf_service.get_monthly_summary,
+                'insights': lambda: {
+                    'recent_changes': insight_service.get_recent_changes(10),
+                    'monthly_insights': insight_service.get_monthly_insights(),
+                },
+                'milestones': milestone_service.get_all_with_progress,
             },
-            'milestones': milestone_service.get_all_with_progress(),
+            prefix="financials_dashboard",
+            key_parts=[user.id],
+            tags=[user_tag(user, "financials")],
+            ttl=ttl,
+        )
+        
+        return Response({
+            'summary': sections['summary'],
+            'timeline': sections[timeline_section],
+            'forecast': sections['forecast'],
+            'accounts': sections['accounts'],
+            'cash_flow': sections['cash_flow'],
+            'insights': sections['insights'],
+            'milestones': sections['milestones'],
         })
 
 
@@ -6,6 +6,8 @@ from dateutil.rrule import rrulestr
 from django.db import transaction
 from django.utils import timezone
 
+from app1.cache_utils import invalidate_tags, user_tag
+
 from .models import Calendar, Event, EventOccurrence, Reminder
 
 
@@ -60,6 +62,8 @@ def regenerate_occurrences(
         )
 
     EventOccurrence.objects.bulk_create(occurrences, ignore_conflicts=True)
+    # bulk_create() skips post_save, so bump the tag ourselves.
+    invalidate_tags(user_tag(event.calendar.owner_id, "events"))
 
     if reminder_minutes_before is not None and reminder_minutes_before >= 0:
         occs = EventOccurrence.objects.filter(
@@ -9,3 +9,13 @@ from .models import Event
 def prevent_immutable_event_delete(sender, instance, **kwargs):
     if getattr(instance, "is_immutable", False):
         raise PermissionDenied("Cannot delete an immutable system event")
+
+
+# Cache invalidation: bump "user:<id>:events" whenever calendar data changes
+from app1.cache_utils import register_tag_invalidation  # noqa: E402
+from .models import Calendar, EventCategory, EventOccurrence  # noqa: E402
+
+register_tag_invalidation(Calendar, "events", "owner_id")
+register_tag_invalidation(EventCategory, "events", "owner_id")
+register_tag_invalidation(Event, "events", "calendar.owner_id")
+register_tag_invalidation(EventOccurrence, "events", "event.calendar.owner_id")
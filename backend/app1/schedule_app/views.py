@@ -8,6 +8,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from app1.cache_utils import conditional_get
+
 from .models import Event, EventOccurrence, Reminder
 from .serializers import EventCreateSerializer, OccurrenceSerializer, ReminderSerializer
 from .services import (
@@ -34,6 +36,7 @@ def parse_datetime_param(value):
 
 @api_view(["GET", "POST", "PUT", "DELETE"])
 @permission_classes([IsAuthenticated])
+@conditional_get(tags=["user:{user_id}:events"])
 def schedule(request, pk=None):
     """
     Handle calendar events CRUD operations.
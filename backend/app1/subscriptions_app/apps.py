@@ -7,5 +7,5 @@ class SubscriptionsAppConfig(AppConfig):
     verbose_name = 'Subscriptions'
     
     def ready(self):
-        # Import signals if needed
-        pass
+        # Register cache invalidation signals
+        from . import signals  # noqa: F401
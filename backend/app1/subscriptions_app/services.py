@@ -16,6 +16,8 @@ from django.db.models import Sum, Count, Q, F
 from django.utils import timezone
 from django.db import transaction
 
+from app1.cache_utils import invalidate_tags, user_tag
+
 from .models import (
     Subscription,
     SubscriptionCharge,
@@ -508,6 +510,8 @@ class SubscriptionAlertingService:
                 id=event_id,
                 alert__user=self.user
             ).update(is_read=True)
+            # QuerySet.update() skips post_save, so bump the tag ourselves.
+            invalidate_tags(user_tag(self.user, "subscriptions"))
             return True
         except Exception:
             return False
@@ -716,7 +720,8 @@ class SubscriptionCalendarService:
             
             event = Event.objects.get(id=subscription.calendar_event_id)
             
-            # Cancel future occurrences
+            # Cancel future occurrences (the event.save() below bumps
+            # the owner's events tag, covering this signal-less update)
             EventOccurrence.objects.filter(
                 event=event,
                 start_at__gte=timezone.now()
@@ -0,0 +1,24 @@
+"""
+Cache invalidation for subscriptions.
+
+Any write to a user's subscription data bumps the "user:<id>:subscriptions" tag
+so cached lists and dashboard responses are refreshed immediately.
+"""
+
+from app1.cache_utils import register_tag_invalidation
+
+from .models import (
+    Subscription,
+    SubscriptionCharge,
+    SubscriptionUsageSignal,
+    SubscriptionAlert,
+    SubscriptionAlertEvent,
+    SubscriptionInsightSnapshot,
+)
+
+register_tag_invalidation(Subscription, "subscriptions", "user_id")
+register_tag_invalidation(SubscriptionCharge, "subscriptions", "subscription.user_id")
+register_tag_invalidation(SubscriptionUsageSignal, "subscriptions", "subscription.user_id")
+register_tag_invalidation(SubscriptionAlert, "subscriptions", "user_id")
+register_tag_invalidation(SubscriptionAlertEvent, "subscriptions", "alert.user_id")
+register_tag_invalidation(SubscriptionInsightSnapshot, "subscriptions", "user_id")
@@ -11,7 +11,13 @@ from django.utils import timezone
 from django.db.models import Sum
 from django.conf import settings
 
-from app1.cache_utils import CacheableMixin, cached_api_view
+from app1.cache_utils import (
+    CacheableMixin,
+    cached_api_view,
+    cached_fragments,
+    conditional_get,
+    user_tag,
+)
 
 from .models import (
     Subscription,
@@ -47,6 +53,8 @@ class SubscriptionViewSet(CacheableMixin, viewsets.ModelViewSet):
     cache_ttl = settings.CACHE_TTL.get("subscriptions_list", 300)
     cache_prefix = "subscriptions"
     cache_per_user = True
+    cache_scope = "subscriptions"
+    cache_conditional = True
     
     def get_queryset(self):
         return Subscription.objects.filter(user=self.request.user)
@@ -258,38 +266,64 @@ class SubscriptionDashboardView(APIView):
     """Full subscription dashboard data."""
     permission_classes = [IsAuthenticated]
     
+    @conditional_get(
+        tags=["user:{user_id}:subscriptions"],
+        max_age=settings.CACHE_TTL.get("subscriptions_summary", 600),
+    )
     @cached_api_view(
         ttl=settings.CACHE_TTL.get("subscriptions_summary", 600),
         key_prefix="subscriptions_dashboard",
-        include_user=True
+        include_user=True,
+        tags=["user:{user_id}:subscriptions"],
+        stale_ttl=settings.CACHE_STALE_TTL.get("subscriptions_dashboard", 0),
+        rendered=True,
     )
     def get(self, request):
         analytics = SubscriptionAnalyticsService(request.user)
         alerting = SubscriptionAlertingService(request.user)
         
-        # Get all subscriptions for the list
-        subscriptions = Subscription.objects.filter(
-            user=request.user
-        ).order_by('next_billing_date')
+        def subscription_list():
+            subscriptions = Subscription.objects.filter(
+                user=request.user
+            ).order_by('next_billing_date')
+            return SubscriptionListSerializer(subscriptions, many=True).data
         
-        return Response({
-            'summary': analytics.get_dashboard_summary(),
-            'subscriptions': SubscriptionListSerializer(subscriptions, many=True).data,
-            'upcoming_charges': analytics.get_upcoming_charges(30),
-            'unused_subscriptions': analytics.get_unused_subscriptions(),
-            'spending_history': analytics.get_spending_history(12),
-            'active_alerts': alerting.get_active_alerts(),
-        })
+        # Sections are cached independently and fetched in one round-trip
+        sections = cached_fragments(
+            {
+                'summary': analytics.get_dashboard_summary,
+                'subscriptions': (
+                    subscription_list,
+                    settings.CACHE_TTL.get("subscriptions_list", 300),
+                ),
+                'upcoming_charges': lambda: analytics.get_upcoming_charges(30),
+                'unused_subscriptions': analytics.get_unused_subscriptions,
+                'spending_history': lambda: analytics.get_spending_history(12),
+                'active_alerts': alerting.get_active_alerts,
+            },
+            prefix="subscriptions_dashboard",
+            key_parts=[request.user.id],
+            tags=[user_tag(request.user, "subscriptions")],
+            ttl=settings.CACHE_TTL.get("subscriptions_summary", 600),
+        )
+        
+        return Response(sections)
 
 
 class SubscriptionSummaryView(APIView):
     """Dashboard summary endpoint."""
     permission_classes = [IsAuthenticated]
     
+    @conditional_get(
+        tags=["user:{user_id}:subscriptions"],
+        max_age=settings.CACHE_TTL.get("subscriptions_summary", 600),
+    )
     @cached_api_view(
         ttl=settings.CACHE_TTL.get("subscriptions_summary", 600),
         key_prefix="subscriptions_summary",
-        include_user=True
+        include_user=True,
+        tags=["user:{user_id}:subscriptions"],
+        rendered=True,
     )
     def get(self, request):
         analytics = SubscriptionAnalyticsService(request.user)
@@ -6,3 +6,7 @@ class TravelAppConfig(AppConfig):
     name = 'travel_app'
     verbose_name = 'Travel Management'
 
+    def ready(self):
+        # Register cache invalidation signals
+        from . import signals  # noqa: F401
+
@@ -11,6 +11,8 @@ from django.db import transaction
 from django.db.models import Sum, Count, Avg, Q, F
 from django.utils import timezone
 
+from app1.cache_utils import invalidate_tags, user_tag
+
 from .models import (
     Trip,
     TripExpense,
@@ -602,6 +604,8 @@ class ItineraryService:
                 id=item['id'],
                 itinerary=itinerary
             ).update(order=item['order'])
+        # QuerySet.update() skips post_save, so bump the tag ourselves.
+        invalidate_tags(user_tag(itinerary.trip.owner_id, "travel"))
     
     def copy_day(
         self, 
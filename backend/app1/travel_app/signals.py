@@ -0,0 +1,28 @@
+"""
+Cache invalidation for travel data.
+
+Any write to a user's trips, expenses, itineraries or goals bumps the
+"user:<id>:travel" tag so cached trip lists are refreshed immediately.
+"""
+
+from app1.cache_utils import register_tag_invalidation
+
+from .models import (
+    Trip,
+    TripExpense,
+    TripDocument,
+    PackingList,
+    PackingItem,
+    Itinerary,
+    ItineraryActivity,
+    TravelGoal,
+)
+
+register_tag_invalidation(Trip, "travel", "owner_id")
+register_tag_invalidation(TripExpense, "travel", "trip.owner_id")
+register_tag_invalidation(TripDocument, "travel", "trip.owner_id")
+register_tag_invalidation(PackingList, "travel", "owner_id")
+register_tag_invalidation(PackingItem, "travel", "packing_list.owner_id")
+register_tag_invalidation(Itinerary, "travel", "trip.owner_id")
+register_tag_invalidation(ItineraryActivity, "travel", "itinerary.trip.owner_id")
+register_tag_invalidation(TravelGoal, "travel", "owner_id")
@@ -4,7 +4,64 @@ Travel App Tests
 Test cases for travel management functionality.
 """
 
+from datetime import date, timedelta
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
 
-# Create your tests here.
+from .models import Trip, PackingList, PackingItem
 
+User = get_user_model()
+
+
+class TripCacheInvalidationTests(TestCase):
+    """Tests that bulk writes invalidate cached trip responses."""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='traveller',
+            email='traveller@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.trip = Trip.objects.create(
+            owner=self.user,
+            name='Lisbon',
+            city='Lisbon',
+            country='Portugal',
+            country_code='PT',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=14),
+        )
+        self.packing_list = PackingList.objects.create(
+            trip=self.trip,
+            owner=self.user,
+        )
+        self.item = PackingItem.objects.create(
+            packing_list=self.packing_list,
+            name='Passport',
+        )
+    
+    def test_bulk_toggle_refreshes_cached_trip(self):
+        """Test a cached trip detail reflects a bulk packing toggle."""
+        url = f'/api/travel/trips/{self.trip.id}/'
+        self.client.get(url)
+        
+        # An untagged write stays invisible while the entry is cached
+        PackingItem.objects.filter(id=self.item.id).update(notes='In the safe')
+        cached = self.client.get(url).json()['packing_list']
+        self.assertEqual(cached['items'][0]['notes'], '')
+        self.assertEqual(cached['packing_progress'], 0)
+        
+        response = self.client.post(
+            '/api/travel/packing-items/bulk_toggle/',
+            {'item_ids': [str(self.item.id)], 'is_packed': True},
+            format='json',
+        )
+        self.assertEqual(response.json()['updated'], 1)
+        
+        fresh = self.client.get(url)
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+        self.assertEqual(fresh.json()['packing_list']['packing_progress'], 100)
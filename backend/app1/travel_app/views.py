@@ -15,7 +15,7 @@ from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.conf import settings
 
-from app1.cache_utils import CacheableMixin, cached_api_view
+from app1.cache_utils import CacheableMixin, cached_api_view, invalidate_tags, user_tag
 
 from .models import (
     Trip,
@@ -61,6 +61,9 @@ class TripViewSet(CacheableMixin, viewsets.ModelViewSet):
     cache_ttl = settings.CACHE_TTL.get("travel_trips", 600)
     cache_prefix = "travel_trips"
     cache_per_user = True
+    cache_scope = "travel"
+    cache_rendered = True
+    cache_conditional = True
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -454,6 +457,8 @@ class PackingItemViewSet(viewsets.ModelViewSet):
             id__in=item_ids,
             packing_list__owner=request.user
         ).update(is_packed=is_packed)
+        # QuerySet.update() skips post_save, so bump the tag ourselves.
+        invalidate_tags(user_tag(request.user, "travel"))
         
         return Response({'updated': updated})
 
@@ -584,6 +589,7 @@ class TravelGoalViewSet(viewsets.ModelViewSet):
                 id=item['id'],
                 owner=request.user
             ).update(priority=item['priority'])
+        invalidate_tags(user_tag(request.user, "travel"))
         
         return Response({'status': 'updated'})
 
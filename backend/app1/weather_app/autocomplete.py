@@ -0,0 +1,272 @@
+"""
+Autocomplete Prefix Cache
+
+Place autocomplete endpoints are called on every keystroke. Suggestion lists
+are kept in a per-process prefix trie, one trie per (endpoint, location-bias
+bucket); the bias is snapped to a coarse grid cell (settings.AUTOCOMPLETE_CACHE
+"BIAS_KM") whose centre is what gets sent upstream, so nearby users share entries.
+
+A lookup walks the trie along the normalized query:
+    - an entry for the query itself is returned as-is
+    - otherwise the nearest shorter prefix whose result was complete (upstream
+      returned fewer suggestions than the limit) is filtered down locally, since
+      a longer query can only narrow a complete list
+    - otherwise the query goes upstream through single_flight_get_or_set, so
+      identical in-flight queries from different users (and workers) share one
+      call and its result lands in the shared cache too
+
+Usage:
+    items = autocomplete_cache.get_or_fetch(
+        "geoapify:5:city", query, fetch, limit=5, match=lambda s: s["fullName"],
+        bucket=autocomplete_cache.bias_bucket(lat, lng),
+    )
+
+    # Upstream JSON passed through, only its list served from the trie
+    body = autocomplete_cache.get_or_fetch_envelope(
+        "mapbox:5", query, fetch_json, items_key="features", limit=5,
+        match=lambda f: f["place_name"], bucket=bucket,
+    )
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+from app1.cache_utils import generate_cache_key, single_flight_get_or_set
+
+from .geocoding import normalize_query
+from .grid import GridCell, snap_to
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUTOCOMPLETE_SETTINGS = {
+    "TTL": 3600,
+    "MAX_ENTRIES": 20000,
+    "BIAS_KM": 25.0,
+}
+
+GLOBAL_BUCKET = "global"
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class UpstreamError(Exception):
+    """A non-200 autocomplete response; never cached."""
+
+    def __init__(self, status_code, body=""):
+        super().__init__(f"upstream returned {status_code}")
+        self.status_code = status_code
+        self.body = body
+
+
+class BiasBucket(NamedTuple):
+    key: str
+    cell: Optional[GridCell] = None   # None when the request has no location bias
+
+
+def matches_query(text: str, query: str) -> bool:
+    """True if every query word starts some word of text (both normalized)."""
+    words = _WORD.findall(normalize_query(text))
+    return all(any(word.startswith(term) for word in words) for term in query.split())
+
+
+class _Node:
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children = {}
+        self.entry = None   # (items, complete, expires_at, envelope)
+
+
+class AutocompleteCache:
+    """Prefix trie of suggestion lists per endpoint and bias bucket, with LRU eviction."""
+
+    def __init__(self, ttl=None, max_entries=None, bias_km=None):
+        config = {**DEFAULT_AUTOCOMPLETE_SETTINGS, **getattr(settings, "AUTOCOMPLETE_CACHE", {})}
+        self.ttl = ttl or config["TTL"]
+        self.max_entries = max_entries or config["MAX_ENTRIES"]
+        self.bias_km = bias_km or config["BIAS_KM"]
+        self._roots = {}
+        self._lru = OrderedDict()   # (namespace, bucket, query), least recently used first
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "filtered": 0, "misses": 0}
+
+    def bias_bucket(self, lat, lng) -> BiasBucket:
+        """Coarse bucket for a location bias (the global bucket if absent or invalid)."""
+        try:
+            lat, lng = float(lat), float(lng)
+        except (TypeError, ValueError):
+            return BiasBucket(GLOBAL_BUCKET)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return BiasBucket(GLOBAL_BUCKET)
+        cell = snap_to(lat, lng, self.bias_km)
+        return BiasBucket(cell.key, cell)
+
+    # ---------- Trie ----------
+
+    def _evict(self, namespace, bucket, query):
+        root = self._roots.get((namespace, bucket))
+        if root is None:
+            return
+        path = [root]
+        for char in query:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].entry = None
+        # Prune branches left without entries
+        for depth in range(len(query), 0, -1):
+            node = path[depth]
+            if node.entry is not None or node.children:
+                break
+            del path[depth - 1].children[query[depth - 1]]
+        if not root.children and root.entry is None:
+            del self._roots[(namespace, bucket)]
+
+    def store(self, namespace, bucket, query, items, complete, envelope=None) -> None:
+        """
+        Remember the suggestions for a normalized query.
+
+        Args:
+            envelope: The rest of the upstream response the items came in, if any
+        """
+        with self._lock:
+            node = self._roots.setdefault((namespace, bucket), _Node())
+            for char in query:
+                node = node.children.setdefault(char, _Node())
+            node.entry = (items, complete, time.monotonic() + self.ttl, envelope)
+            lru_key = (namespace, bucket, query)
+            self._lru[lru_key] = True
+            self._lru.move_to_end(lru_key)
+            while len(self._lru) > self.max_entries:
+                self._evict(*self._lru.popitem(last=False)[0])
+
+    def lookup(self, namespace, bucket, query, match: Callable[[dict], str]) -> Optional[List[dict]]:
+        """
+        Suggestions for a normalized query from the trie, or None on a miss.
+
+        Args:
+            match: Text of a suggestion that a longer query is matched against
+        """
+        found = self._lookup(namespace, bucket, query, match)
+        return found[0] if found is not None else None
+
+    def _lookup(self, namespace, bucket, query, match) -> Optional[Tuple[List[dict], Optional[dict]]]:
+        """(items, envelope) for a normalized query from the trie, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            node = self._roots.get((namespace, bucket))
+            complete_prefix = None
+            for depth in range(len(query) + 1):
+                if node is None:
+                    break
+                entry = node.entry
+                if entry is not None and entry[2] > now:
+                    if depth == len(query):
+                        self._lru.move_to_end((namespace, bucket, query))
+                        self.stats["hits"] += 1
+                        return entry[0], entry[3]
+                    if entry[1]:
+                        complete_prefix = entry
+                if depth < len(query):
+                    node = node.children.get(query[depth])
+
+        if complete_prefix is None:
+            return None
+        items = [item for item in complete_prefix[0] if matches_query(match(item), query)]
+        self.stats["filtered"] += 1
+        self.store(namespace, bucket, query, items, True, complete_prefix[3])
+        return items, complete_prefix[3]
+
+    # ---------- Public ----------
+
+    def get_or_fetch(
+        self,
+        namespace: str,
+        query: str,
+        fetch: Callable[[], List[dict]],
+        limit: int,
+        match: Callable[[dict], str],
+        bucket: BiasBucket = BiasBucket(GLOBAL_BUCKET),
+    ) -> List[dict]:
+        """
+        Suggestions for a query, from the trie or (coalesced) upstream.
+
+        Args:
+            namespace: Endpoint and any parameters other than the query and bias
+                that change upstream results (e.g. "geoapify:5:city")
+            fetch: Calls upstream for this query; raises UpstreamError on a non-200
+            limit: Most suggestions upstream returns; shorter lists are complete
+            match: Text of a suggestion used to filter it for longer queries
+            bucket: Location-bias bucket from bias_bucket()
+
+        Returns:
+            List of suggestions
+        """
+        items, _ = self._get(namespace, query, lambda: (fetch(), None), limit, match, bucket)
+        return items
+
+    def get_or_fetch_envelope(
+        self,
+        namespace: str,
+        query: str,
+        fetch: Callable[[], dict],
+        items_key: str,
+        limit: int,
+        match: Callable[[dict], str],
+        bucket: BiasBucket = BiasBucket(GLOBAL_BUCKET),
+    ) -> dict:
+        """
+        Like get_or_fetch, for endpoints that pass the upstream JSON through.
+
+        fetch returns the whole upstream response; its items_key list is cached
+        in the trie like get_or_fetch's suggestions, and its other fields are
+        kept with them and returned unchanged (for a prefix-filtered answer,
+        those of the upstream response the items were filtered from).
+
+        Returns:
+            The upstream response with items_key holding the suggestions
+        """
+        def fetch_pair():
+            body = fetch()
+            return body.get(items_key, []), {key: value for key, value in body.items() if key != items_key}
+
+        items, envelope = self._get(namespace, query, fetch_pair, limit, match, bucket)
+        return {**(envelope or {}), items_key: items}
+
+    def _get(self, namespace, query, fetch_pair, limit, match, bucket) -> Tuple[List[dict], Optional[dict]]:
+        normalized = normalize_query(query)
+        if not normalized:
+            return fetch_pair()
+
+        found = self._lookup(namespace, bucket.key, normalized, match)
+        if found is not None:
+            return found
+
+        self.stats["misses"] += 1
+        cache_key = generate_cache_key(namespace, bucket.key, normalized, prefix="autocomplete")
+
+        def compute():
+            results, envelope = fetch_pair()
+            return {"items": results, "complete": len(results) < limit, "envelope": envelope}
+
+        value, _ = single_flight_get_or_set(cache_key, compute, self.ttl)
+        envelope = value.get("envelope")
+        self.store(namespace, bucket.key, normalized, value["items"], value["complete"], envelope)
+        return value["items"], envelope
+
+    def clear(self) -> None:
+        with self._lock:
+            self._roots.clear()
+            self._lru.clear()
+
+    def status(self) -> dict:
+        return {"entries": len(self._lru), "max_entries": self.max_entries, **self.stats}
+
+
+autocomplete_cache = AutocompleteCache()
@@ -0,0 +1,158 @@
+"""
+Persistent Geocode Store
+
+Free-text locations are geocoded once and kept in the GeocodeEntry table, keyed
+by a normalized query (case, whitespace and punctuation folded), so "New York, NY"
+and "new york ny" are the same entry. A per-process LRU sits in front of the
+table, so repeat searches never leave the process.
+
+Lookups try the LRU, then the table (promoting the row into the LRU), and only
+ever match the exact normalized query. Prefixes are not answered: whether "paris"
+means one place can't be told from the entries stored so far (only "paris tx"
+may have been searched), so anything else goes to the upstream geocoder.
+
+Usage:
+    from weather_app.geocoding import geocode_store
+
+    coords = geocode_store.get(location)   # {"lat": ..., "lng": ...} or None
+    geocode_store.put(location, lat, lng, place_id, formatted_address)
+"""
+
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import GeocodeEntry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GEOCODE_SETTINGS = {
+    "LRU_SIZE": 4096,
+}
+
+MAX_QUERY_LENGTH = 255   # GeocodeEntry.query
+_PUNCTUATION = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_query(text: str) -> str:
+    """Fold case, width, punctuation and runs of whitespace: "  New-York,NY " -> "new york ny"."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return " ".join(_PUNCTUATION.sub(" ", text).replace("_", " ").split())[:MAX_QUERY_LENGTH]
+
+
+class Geocode(NamedTuple):
+    lat: float
+    lng: float
+    place_id: str = ""
+    formatted_address: str = ""
+
+    def as_coords(self) -> dict:
+        """The {"lat", "lng"} shape returned by the Google Geocoding API."""
+        return {"lat": self.lat, "lng": self.lng}
+
+
+
+class GeocodeStore:
+    """DB-backed geocode table fronted by a per-process LRU."""
+
+    def __init__(self, max_entries=None):
+        config = {**DEFAULT_GEOCODE_SETTINGS, **getattr(settings, "WEATHER_GEOCODE", {})}
+        self.max_entries = max_entries or config["LRU_SIZE"]
+        self._entries = OrderedDict()   # query -> Geocode, least recently used first
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+    # ---------- LRU ----------
+
+    def _remember(self, query, geocode):
+        with self._lock:
+            if query in self._entries:
+                self._entries.move_to_end(query)
+            elif len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+            self._entries[query] = geocode
+
+    def _memory_get(self, query) -> Optional[Geocode]:
+        with self._lock:
+            geocode = self._entries.get(query)
+            if geocode is not None:
+                self._entries.move_to_end(query)
+            return geocode
+
+    # ---------- Table ----------
+
+    @staticmethod
+    def _from_row(row) -> Geocode:
+        return Geocode(row.latitude, row.longitude, row.place_id, row.formatted_address)
+
+    def _db_get(self, query) -> Optional[Geocode]:
+        try:
+            row = GeocodeEntry.objects.filter(query=query).first()
+        except DatabaseError as e:
+            logger.error(f"Geocode table lookup failed for {query!r}: {e}")
+            return None
+        return self._from_row(row) if row else None
+
+    # ---------- Public ----------
+
+    def lookup(self, location) -> Optional[Geocode]:
+        """Stored geocode for a free-text location (None if it must be geocoded upstream)."""
+        query = normalize_query(location)
+        if not query:
+            return None
+
+        geocode = self._memory_get(query)
+        if geocode is not None:
+            self.stats["memory_hits"] += 1
+            return geocode
+
+        geocode = self._db_get(query)
+        if geocode is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["db_hits"] += 1
+        self._remember(query, geocode)
+        return geocode
+
+    def get(self, location) -> Optional[dict]:
+        """Stored {"lat", "lng"} for a free-text location, or None."""
+        geocode = self.lookup(location)
+        return geocode.as_coords() if geocode else None
+
+    def put(self, location, lat, lng, place_id="", formatted_address="") -> Geocode:
+        """Persist an upstream geocoding result and keep it in the LRU."""
+        query = normalize_query(location)
+        geocode = Geocode(float(lat), float(lng), place_id or "", (formatted_address or "")[:512])
+        if not query:
+            return geocode
+        try:
+            GeocodeEntry.objects.update_or_create(
+                query=query,
+                defaults={
+                    "latitude": geocode.lat,
+                    "longitude": geocode.lng,
+                    "place_id": geocode.place_id,
+                    "formatted_address": geocode.formatted_address,
+                },
+            )
+        except DatabaseError as e:
+            logger.error(f"Could not store geocode for {query!r}: {e}")
+        self._remember(query, geocode)
+        return geocode
+
+    def clear(self) -> None:
+        """Empty the in-process LRU (the table is kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, **self.stats}
+
+
+geocode_store = GeocodeStore()
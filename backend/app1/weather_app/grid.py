@@ -0,0 +1,175 @@
+"""
+Geospatial Grid Snapping
+
+Snaps coordinates to a fixed grid so nearby requests share one cache entry
+and one upstream call. Each data type has its own cell size, matched to how
+coarse the upstream data really is (settings.WEATHER_GRID_KM):
+
+    forecast      ~2 km   (model grids are 1-11 km)
+    air_quality   ~10 km  (station / CAMS grid)
+    timezone      ~25 km
+
+Rows are bands of equal latitude height; each band is split into a whole number
+of columns of roughly the same width in km, so cells stay close to square away
+from the equator and never straddle the antimeridian.
+
+With settings.WEATHER_GRID_INTERPOLATE, a request whose own cell is not cached
+can be answered by inverse-distance blending the numeric series of the
+surrounding cached cells.
+
+Usage:
+    cell = snap(lat, lng, "forecast")
+    cache_key = f"weather:{cell.key}"
+    fetch(cell.lat, cell.lng)
+"""
+
+import math
+from typing import List, NamedTuple, Sequence, Tuple
+
+from django.conf import settings
+
+KM_PER_DEGREE = 111.32
+
+DEFAULT_GRID_KM = {
+    "forecast": 2.0,
+    "air_quality": 10.0,
+    "timezone": 25.0,
+}
+
+# Numeric fields that must not be averaged across cells
+NON_INTERPOLATED_FIELDS = frozenset({"is_day", "wind_direction", "weather_code"})
+
+
+class GridCell(NamedTuple):
+    row: int
+    col: int
+    lat: float   # cell centre
+    lng: float
+    size_km: float
+
+    @property
+    def key(self) -> str:
+        """Stable identifier for cache keys."""
+        return f"g{self.size_km:g}:{self.row}:{self.col}"
+
+
+def grid_km(data_type: str) -> float:
+    """Cell size in km for a data type."""
+    sizes = {**DEFAULT_GRID_KM, **getattr(settings, "WEATHER_GRID_KM", {})}
+    return float(sizes[data_type])
+
+
+def interpolation_enabled() -> bool:
+    return bool(getattr(settings, "WEATHER_GRID_INTERPOLATE", False))
+
+
+def snap(lat: float, lng: float, data_type: str) -> GridCell:
+    """The grid cell containing (lat, lng) for a data type."""
+    return snap_to(lat, lng, grid_km(data_type))
+
+
+def _lng_step(center_lat: float, size_km: float) -> float:
+    # A whole number of columns per band, so the band wraps cleanly at ±180
+    band_km = 360 * KM_PER_DEGREE * max(math.cos(math.radians(center_lat)), 1e-6)
+    return 360 / max(1, int(band_km // size_km))
+
+
+def snap_to(lat: float, lng: float, size_km: float) -> GridCell:
+    """The grid cell of size_km containing (lat, lng)."""
+    lat_step = size_km / KM_PER_DEGREE
+    rows = max(1, math.ceil(180 / lat_step))
+    row = min(int((lat + 90) // lat_step), rows - 1)
+    center_lat = min(90.0, -90 + (row + 0.5) * lat_step)
+
+    lng_step = _lng_step(center_lat, size_km)
+    col = int(((lng + 180) % 360) // lng_step) % round(360 / lng_step)
+    center_lng = -180 + (col + 0.5) * lng_step
+
+    return GridCell(row, col, round(center_lat, 5), round(center_lng, 5), size_km)
+
+
+def distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Equirectangular distance, accurate enough at grid-cell scale."""
+    x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return math.hypot(x, y) * 6371.0
+
+
+def surrounding_cells(lat: float, lng: float, data_type: str) -> List[GridCell]:
+    """
+    The (up to) four cells whose centres surround (lat, lng): its own cell and
+    the neighbours on the side of the cell the point lies in.
+    """
+    size_km = grid_km(data_type)
+    own = snap_to(lat, lng, size_km)
+    lat_step = size_km / KM_PER_DEGREE
+    lng_step = _lng_step(own.lat, size_km)
+    dlat = lat_step if lat >= own.lat else -lat_step
+    dlng = lng_step if lng >= own.lng else -lng_step
+
+    cells = []
+    for offset_lat, offset_lng in ((0, 0), (dlat, 0), (0, dlng), (dlat, dlng)):
+        cell = snap_to(max(-90.0, min(90.0, own.lat + offset_lat)), own.lng + offset_lng, size_km)
+        if cell not in cells:
+            cells.append(cell)
+    return cells
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _row_time(row: dict):
+    return row.get("time", row.get("date"))
+
+
+def _blend_series(series_list: Sequence[list], weights: Sequence[float]):
+    base = series_list[0]
+    if any(not isinstance(s, list) or len(s) != len(base) for s in series_list):
+        return None
+    total = sum(weights)
+    blended = []
+    for rows in zip(*series_list):
+        first = rows[0]
+        if any(not isinstance(r, dict) or _row_time(r) != _row_time(first) for r in rows):
+            return None
+        row = dict(first)
+        for field, value in first.items():
+            if field in NON_INTERPOLATED_FIELDS or not _is_number(value):
+                continue
+            values = [r.get(field) for r in rows]
+            if not all(_is_number(v) for v in values):
+                continue
+            mixed = sum(v * w for v, w in zip(values, weights)) / total
+            row[field] = round(mixed) if isinstance(value, int) else round(mixed, 2)
+        blended.append(row)
+    return blended
+
+
+def blend(samples: Sequence[Tuple[GridCell, dict]], lat: float, lng: float, series_keys: Sequence[str]):
+    """
+    Inverse-distance-weighted blend of cached neighbour payloads at (lat, lng).
+
+    Numeric fields of the listed series are blended row by row when all samples
+    share the same timestamps; everything else comes from the nearest sample.
+
+    Returns:
+        Blended payload marked "interpolated": True, or None if nothing lines up
+    """
+    if not samples:
+        return None
+    ranked = sorted(samples, key=lambda s: distance_km(lat, lng, s[0].lat, s[0].lng))
+    weights = [1 / max(distance_km(lat, lng, cell.lat, cell.lng), 0.05) ** 2 for cell, _ in ranked]
+    payloads = [payload for _, payload in ranked]
+
+    result = dict(payloads[0])
+    blended_any = False
+    for key in series_keys:
+        series = _blend_series([p.get(key) for p in payloads], weights)
+        if series is not None:
+            result[key] = series
+            blended_any = True
+    if not blended_any:
+        return None
+    result["interpolated"] = True
+    return result
@@ -0,0 +1,104 @@
+"""
+Build the offline timezone index from timezone-boundary-builder boundaries.
+
+Reads a GeoJSON FeatureCollection with a "tzid" property per feature (the
+combined.json / combined-with-oceans.json release, optionally still zipped,
+from a local path or an http(s) URL) and packs it for weather_app.timezones.
+Features are streamed with ijson one at a time; the parsed release would not
+fit in a small build instance's memory.
+
+Usage:
+    python manage.py build_timezone_index --source timezones-with-oceans.geojson.zip
+    python manage.py build_timezone_index --source https://.../timezones.geojson.zip
+    python manage.py build_timezone_index --source combined.json --cell 0.5 --output /srv/tz.idx
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app1.http_client import http_get
+from weather_app.timezones import DEFAULT_CELL_DEGREES, build_index, reset_index
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+
+class Command(BaseCommand):
+    help = 'Build the packed timezone polygon index used for offline timezone lookups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', type=str, required=True,
+                            help='GeoJSON (or .zip) file path or http(s) URL')
+        parser.add_argument('--output', type=str, default='',
+                            help='Index path (default: settings.TIMEZONE_INDEX_PATH)')
+        parser.add_argument('--cell', type=float, default=DEFAULT_CELL_DEGREES,
+                            help='Grid cell size in degrees')
+
+    def handle(self, *args, **options):
+        output = options['output'] or str(getattr(settings, 'TIMEZONE_INDEX_PATH', ''))
+        if not output:
+            raise CommandError('No --output given and TIMEZONE_INDEX_PATH is not set')
+        if not 0 < options['cell'] <= 10 or (360 / options['cell']) % 1:
+            raise CommandError('--cell must divide 360 and be at most 10 degrees')
+        if ijson is None:
+            raise CommandError('ijson is required to stream the boundary file (pip install ijson)')
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+        started = time.monotonic()
+        with tempfile.TemporaryDirectory() as workdir:
+            source = self._download(options['source'], workdir)
+            self.stdout.write(f'  Packing features from {source}...')
+            try:
+                counts = build_index(self._features(source), output, options['cell'])
+            except (OSError, ValueError, ijson.JSONError) as e:
+                raise CommandError(f'Could not read {source}: {e}')
+        reset_index()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"  Wrote {output} ({os.path.getsize(output) / 1e6:.1f} MB): {counts['zones']} zones, "
+            f"{counts['polygons']} polygons, {counts['points']} points "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
+
+    def _download(self, source, workdir):
+        """Local path of the boundary file, downloading it first for an http(s) source."""
+        if not source.startswith(('http://', 'https://')):
+            return source
+        self.stdout.write(f'  Downloading {source}...')
+        path = os.path.join(workdir, os.path.basename(source.split('?')[0]) or 'boundaries')
+        try:
+            response = http_get(source, timeout=(10, 300), stream=True)
+            response.raise_for_status()
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f)
+        except Exception as e:
+            raise CommandError(f'Download failed: {e}')
+        return path
+
+    def _features(self, source):
+        """Stream the boundary features out of the (possibly zipped) GeoJSON file."""
+        if zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as archive:
+                names = [n for n in archive.namelist() if n.endswith(('.json', '.geojson'))]
+                if not names:
+                    raise CommandError(f'No GeoJSON file inside {source}')
+                with archive.open(names[0]) as f:
+                    yield from self._checked(ijson.items(f, 'features.item', use_float=True))
+        else:
+            with open(source, 'rb') as f:
+                yield from self._checked(ijson.items(f, 'features.item', use_float=True))
+
+    def _checked(self, features):
+        first = next(features, None)
+        if first is None:
+            raise CommandError('Source is not a GeoJSON FeatureCollection')
+        return itertools.chain([first], features)
@@ -0,0 +1,170 @@
+"""
+Micro-benchmark the Open-Meteo normalization layer on recorded provider fixtures.
+
+Compares the column-wise normalizers in weather_app.normalization with the
+previous row-wise implementation (kept below as a reference), checks both
+produce identical output, and reports the median time per call.
+
+Usage:
+    python manage.py normalize_benchmark                  - Bundled fixtures
+    python manage.py normalize_benchmark -n 2000          - More iterations
+    python manage.py normalize_benchmark --forecast f.json --air-quality a.json
+"""
+
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weather_app import normalization
+from weather_app.normalization import normalize_open_meteo, normalize_open_meteo_aqi
+from weather_app.weather_codes import weather_code_descriptions
+
+FIXTURES_DIR = Path(__file__).resolve().parents[2] / "benchmark_fixtures"
+
+
+def rowwise_open_meteo(data):
+    """The previous per-row, per-field normalization of a forecast response."""
+    hourly_data = data.get("hourly", {})
+    times = hourly_data.get("time", [])[:48]
+    hourly = [
+        {
+            "time": times[i],
+            "temperature": hourly_data.get("temperature_2m", [None] * 48)[i],
+            "humidity": hourly_data.get("relative_humidity_2m", [None] * 48)[i],
+            "dew_point": hourly_data.get("dew_point_2m", [None] * 48)[i],
+            "weather_code": weather_code_descriptions.get(
+                hourly_data.get("weather_code", [0] * 48)[i], "Unknown"
+            ),
+            "wind_speed": hourly_data.get("wind_speed_10m", [None] * 48)[i],
+            "wind_direction": hourly_data.get("wind_direction_10m", [None] * 48)[i],
+            "visibility": hourly_data.get("visibility", [None] * 48)[i],
+            "pressure": hourly_data.get("surface_pressure", [None] * 48)[i],
+            "cloud_cover": hourly_data.get("cloud_cover", [None] * 48)[i],
+            "is_day": hourly_data.get("is_day", [1] * 48)[i],
+        }
+        for i in range(min(48, len(times)))
+    ]
+
+    daily_data = data.get("daily", {})
+    daily_times = daily_data.get("time", [])
+    daily = [
+        {
+            "date": daily_times[i],
+            "weather_code": weather_code_descriptions.get(
+                daily_data.get("weather_code", [0] * 10)[i], "Unknown"
+            ),
+            "max_temperature": daily_data.get("temperature_2m_max", [None] * 10)[i],
+            "min_temperature": daily_data.get("temperature_2m_min", [None] * 10)[i],
+            "sunrise": daily_data.get("sunrise", [None] * 10)[i],
+            "sunset": daily_data.get("sunset", [None] * 10)[i],
+            "precipitation": daily_data.get("precipitation_sum", [0] * 10)[i],
+            "precipitation_probability": daily_data.get(
+                "precipitation_probability_max", [0] * 10
+            )[i],
+            "wind_speed_max": daily_data.get("wind_speed_10m_max", [None] * 10)[i],
+        }
+        for i in range(len(daily_times))
+    ]
+
+    minutely_15_data = data.get("minutely_15", {})
+    minutely_times = minutely_15_data.get("time", [])[:96]
+    minutely = [
+        {
+            "time": minutely_times[i],
+            "temperature": minutely_15_data.get("temperature_2m", [None] * 96)[i],
+            "precipitation": minutely_15_data.get("precipitation", [0] * 96)[i],
+            "weather_code": weather_code_descriptions.get(
+                minutely_15_data.get("weather_code", [0] * 96)[i], "Unknown"
+            ),
+            "is_day": minutely_15_data.get("is_day", [1] * 96)[i],
+            "apparent_temperature": minutely_15_data.get(
+                "apparent_temperature", [None] * 96
+            )[i],
+            "visibility": minutely_15_data.get("visibility", [None] * 96)[i],
+            "pressure": minutely_15_data.get("surface_pressure", [None] * 96)[i],
+            "cloud_cover": minutely_15_data.get("cloud_cover", [None] * 96)[i],
+        }
+        for i in range(min(96, len(minutely_times)))
+    ]
+
+    return {"hourly": hourly, "daily": daily, "minutely_15": minutely}
+
+
+def rowwise_open_meteo_aqi(data):
+    """The previous per-row, per-field normalization of an air-quality response."""
+    hourly = data.get("hourly", {})
+    times = hourly.get("time", [])
+    aqi_data = [
+        {
+            "time": times[i],
+            "us_aqi": hourly.get("us_aqi", [None] * len(times))[i],
+            "pm25": hourly.get("pm2_5", [None] * len(times))[i],
+            "pm10": hourly.get("pm10", [None] * len(times))[i],
+            "o3": hourly.get("ozone", [None] * len(times))[i],
+            "no2": hourly.get("nitrogen_dioxide", [None] * len(times))[i],
+            "so2": hourly.get("sulphur_dioxide", [None] * len(times))[i],
+            "co": hourly.get("carbon_monoxide", [None] * len(times))[i],
+        }
+        for i in range(len(times))
+    ]
+    uv_data = [
+        {"time": times[i], "uv_index": hourly.get("uv_index", [None] * len(times))[i]}
+        for i in range(len(times))
+    ]
+    return {"aqi_data": aqi_data, "uv_data": uv_data}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark row-wise vs column-wise Open-Meteo normalization on recorded fixtures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forecast', type=str, default=str(FIXTURES_DIR / 'open_meteo_forecast.json'),
+                            help='Recorded Open-Meteo forecast response')
+        parser.add_argument('--air-quality', type=str, default=str(FIXTURES_DIR / 'open_meteo_air_quality.json'),
+                            help='Recorded Open-Meteo air-quality response')
+        parser.add_argument('-n', '--iterations', type=int, default=500, help='Iterations per implementation')
+
+    def handle(self, *args, **options):
+        iterations = max(options['iterations'], 1)
+        cases = [
+            ('forecast', self._load(options['forecast']), rowwise_open_meteo, normalize_open_meteo),
+            ('air_quality', self._load(options['air_quality']), rowwise_open_meteo_aqi, normalize_open_meteo_aqi),
+        ]
+
+        numpy_state = 'available' if normalization.np is not None else 'not installed'
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'\n=== Normalization Benchmark ({iterations} iterations, NumPy {numpy_state}) ===\n'
+        ))
+        self.stdout.write(f"  {'fixture':<14}{'row-wise µs':>13}{'columnar µs':>13}{'speedup':>10}")
+
+        for name, payload, rowwise, columnar in cases:
+            if rowwise(payload) != columnar(payload):
+                raise CommandError(f'{name}: column-wise output differs from the row-wise reference')
+            rowwise_us = self._time(lambda: rowwise(payload), iterations)
+            columnar_us = self._time(lambda: columnar(payload), iterations)
+            self.stdout.write(
+                f"  {name:<14}{rowwise_us:>13.1f}{columnar_us:>13.1f}{rowwise_us / columnar_us:>9.2f}x"
+            )
+
+        self.stdout.write('')
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read fixture {path}: {e}')
+
+    @staticmethod
+    def _time(func, iterations):
+        """Median wall time of one call, in microseconds."""
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples) * 1_000_000
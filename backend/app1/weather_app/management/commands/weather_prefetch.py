@@ -0,0 +1,56 @@
+"""
+Keep saved-location weather fresh ahead of cache expiry.
+
+Runs until interrupted (SIGINT/SIGTERM), refreshing each saved location's
+forecast, AQI/UV and combined payload shortly before it expires. Only one
+prefetcher runs at a time across hosts (a lease in the shared cache).
+
+Usage:
+    python manage.py weather_prefetch                 - Run continuously
+    python manage.py weather_prefetch --workers 8     - More concurrent refreshes
+    python manage.py weather_prefetch --once          - Refresh what is due now and exit
+"""
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from weather_app.prefetch import WeatherPrefetcher
+
+
+class Command(BaseCommand):
+    help = 'Continuously prefetch weather for saved locations before their cache entries expire'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Maximum concurrent refreshes (default: WEATHER_PREFETCH["WORKERS"])')
+        parser.add_argument('--once', action='store_true',
+                            help='Refresh every location that is due now, then exit')
+
+    def handle(self, *args, **options):
+        prefetcher = WeatherPrefetcher(workers=options['workers'])
+
+        if options['once']:
+            if not prefetcher.acquire_lease():
+                raise CommandError('Another weather prefetcher is running')
+            try:
+                stats = prefetcher.run_once()
+            finally:
+                prefetcher.release_lease()
+            self.stdout.write(self.style.SUCCESS(self._format(stats)))
+            return
+
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Weather prefetcher started ({prefetcher.workers} workers)'
+        ))
+        prefetcher.run(stop, on_reload=lambda stats: self.stdout.write(f'  {self._format(stats)}'))
+        self.stdout.write(self.style.SUCCESS(f'Stopped. {self._format(prefetcher.stats)}'))
+
+    @staticmethod
+    def _format(stats):
+        return ', '.join(f'{key}: {value}' for key, value in stats.items())
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-17 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather_app', '0002_savedlocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(help_text='Normalized query (see weather_app.geocoding)', max_length=255, unique=True)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('place_id', models.CharField(blank=True, default='', max_length=255)),
+                ('formatted_address', models.CharField(blank=True, default='', max_length=512)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Geocode Entry',
+                'verbose_name_plural': 'Geocode Entries',
+                'ordering': ['query'],
+                'indexes': [models.Index(fields=['query'], name='weather_geocode_query_like', opclasses=['varchar_pattern_ops'])],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-17 08:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather_app', '0003_geocodeentry'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='geocodeentry',
+            name='weather_geocode_query_like',
+        ),
+    ]
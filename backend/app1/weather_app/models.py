@@ -44,3 +44,25 @@ class SavedLocation(models.Model):
                 pk=self.pk
             ).update(is_primary=False)
         super().save(*args, **kwargs)
+
+
+class GeocodeEntry(models.Model):
+    """Persistent geocoding result for a normalized free-text location query"""
+
+    query = models.CharField(
+        max_length=255, unique=True, help_text="Normalized query (see weather_app.geocoding)"
+    )
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    place_id = models.CharField(max_length=255, blank=True, default="")
+    formatted_address = models.CharField(max_length=512, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["query"]
+        verbose_name = "Geocode Entry"
+        verbose_name_plural = "Geocode Entries"
+
+    def __str__(self):
+        return f"{self.query} ({self.latitude}, {self.longitude})"
@@ -0,0 +1,308 @@
+"""
+Columnar Normalization
+
+Open-Meteo returns time series as parallel arrays ({"time": [...],
+"temperature_2m": [...], ...}). These helpers turn such a block into rows by
+resolving each column once and zipping, instead of looking every field up per
+row. Weather codes are mapped once per distinct code and then broadcast.
+
+NumPy is optional: when installed, weather-code columns of at least
+NUMPY_MIN_ROWS values are mapped with np.unique; shorter columns (the usual
+48-96 rows) stay on the plain path, where array conversion costs more than it saves.
+
+The combined weather payload is cached with its hourly/daily/minutely_15
+series in a compact columnar layout ({"time": [...], "temperature": [...]});
+to_row_layout / to_columnar_layout convert between that and lists of row dicts.
+
+Alongside it the payload keeps a time index (build_time_index): each series'
+times as sorted epoch seconds plus today's sunrise/sunset, so the current row
+is found with a bisect (closest_row) instead of parsing every time string.
+
+Usage:
+    HOURLY = (("temperature", "temperature_2m", None), ("is_day", "is_day", 1))
+    rows = columns_to_rows(data["hourly"], HOURLY, limit=48)
+"""
+
+import bisect
+from datetime import datetime, timezone
+from itertools import chain, repeat, islice
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .weather_codes import weather_code_descriptions
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+NUMPY_MIN_ROWS = 512
+UNKNOWN_CODE = "Unknown"
+
+COLUMNAR = "columnar"
+SERIES_KEYS = ("hourly", "daily", "minutely_15")
+
+# (output field, upstream key, default when the column is missing or short)
+ColumnSpec = Tuple[str, str, object]
+
+
+def column(block: dict, key: str, length: int, default=None) -> Iterable:
+    """Column `key` of an upstream block, truncated or padded with default to length."""
+    values = block.get(key)
+    if not values:
+        return repeat(default, length)
+    if len(values) >= length:
+        return islice(values, length)
+    return chain(values, repeat(default, length - len(values)))
+
+
+def map_weather_codes(codes: Sequence, descriptions: Optional[dict] = None) -> List[str]:
+    """Map a column of numeric weather codes to descriptions."""
+    descriptions = weather_code_descriptions if descriptions is None else descriptions
+    codes = list(codes)
+    if np is not None and len(codes) >= NUMPY_MIN_ROWS and None not in codes:
+        unique, inverse = np.unique(np.asarray(codes), return_inverse=True)
+        labels = np.array(
+            [descriptions.get(code, UNKNOWN_CODE) for code in unique.tolist()], dtype=object
+        )
+        return labels[inverse].tolist()
+    lookup = {code: descriptions.get(code, UNKNOWN_CODE) for code in set(codes)}
+    return list(map(lookup.__getitem__, codes))
+
+
+def columns_to_rows(
+    block: dict,
+    specs: Sequence[ColumnSpec],
+    limit: Optional[int] = None,
+    time_field: str = "time",
+    code_fields: Sequence[str] = ("weather_code",),
+) -> List[dict]:
+    """
+    Zip an upstream column block into row dicts.
+
+    Args:
+        block: Upstream block of parallel arrays with a "time" array
+        specs: (output field, upstream key, default) per column
+        limit: Maximum number of rows (all timestamps if None)
+        time_field: Output field for the timestamp
+        code_fields: Output fields whose values are weather codes to describe
+
+    Returns:
+        List of {time_field: ..., field: value, ...} in spec order
+    """
+    times = block.get("time") or []
+    if limit is not None:
+        times = times[:limit]
+    length = len(times)
+    if not length:
+        return []
+
+    fields = (time_field,) + tuple(field for field, _, _ in specs)
+    columns = [times]
+    for field, key, default in specs:
+        values = column(block, key, length, default)
+        columns.append(map_weather_codes(values) if field in code_fields else values)
+    return [dict(zip(fields, row)) for row in zip(*columns)]
+
+
+# ==================== OPEN-METEO LAYOUTS ====================
+
+OPEN_METEO_HOURLY = (
+    ("temperature", "temperature_2m", None),
+    ("humidity", "relative_humidity_2m", None),
+    ("dew_point", "dew_point_2m", None),
+    ("weather_code", "weather_code", 0),
+    ("wind_speed", "wind_speed_10m", None),
+    ("wind_direction", "wind_direction_10m", None),
+    ("visibility", "visibility", None),
+    ("pressure", "surface_pressure", None),
+    ("cloud_cover", "cloud_cover", None),
+    ("is_day", "is_day", 1),
+)
+
+OPEN_METEO_DAILY = (
+    ("weather_code", "weather_code", 0),
+    ("max_temperature", "temperature_2m_max", None),
+    ("min_temperature", "temperature_2m_min", None),
+    ("sunrise", "sunrise", None),
+    ("sunset", "sunset", None),
+    ("precipitation", "precipitation_sum", 0),
+    ("precipitation_probability", "precipitation_probability_max", 0),
+    ("wind_speed_max", "wind_speed_10m_max", None),
+)
+
+OPEN_METEO_MINUTELY_15 = (
+    ("temperature", "temperature_2m", None),
+    ("precipitation", "precipitation", 0),
+    ("weather_code", "weather_code", 0),
+    ("is_day", "is_day", 1),
+    ("apparent_temperature", "apparent_temperature", None),
+    ("visibility", "visibility", None),
+    ("pressure", "surface_pressure", None),
+    ("cloud_cover", "cloud_cover", None),
+)
+
+OPEN_METEO_AQI = (
+    ("us_aqi", "us_aqi", None),
+    ("pm25", "pm2_5", None),
+    ("pm10", "pm10", None),
+    ("o3", "ozone", None),
+    ("no2", "nitrogen_dioxide", None),
+    ("so2", "sulphur_dioxide", None),
+    ("co", "carbon_monoxide", None),
+)
+
+OPEN_METEO_UV = (("uv_index", "uv_index", None),)
+
+
+def normalize_open_meteo(data: dict) -> dict:
+    """Normalize an Open-Meteo forecast response to the standard weather format."""
+    return {
+        "hourly": columns_to_rows(data.get("hourly", {}), OPEN_METEO_HOURLY, limit=48),
+        "daily": columns_to_rows(data.get("daily", {}), OPEN_METEO_DAILY, time_field="date"),
+        "minutely_15": columns_to_rows(data.get("minutely_15", {}), OPEN_METEO_MINUTELY_15, limit=96),
+    }
+
+
+def normalize_open_meteo_aqi(data: dict) -> dict:
+    """Normalize an Open-Meteo air-quality response to aqi_data/uv_data rows."""
+    hourly = data.get("hourly", {})
+    return {
+        "aqi_data": columns_to_rows(hourly, OPEN_METEO_AQI, code_fields=()),
+        "uv_data": columns_to_rows(hourly, OPEN_METEO_UV, code_fields=()),
+    }
+
+
+# ==================== COLUMNAR LAYOUT ====================
+
+def rows_to_columns(rows: Sequence[dict]) -> dict:
+    """
+    Turn a list of row dicts into parallel arrays keyed by field.
+
+    Fields are taken in first-seen order; rows missing a field get None.
+    """
+    fields = {}
+    for row in rows:
+        for field in row:
+            fields.setdefault(field, None)
+    return {field: [row.get(field) for row in rows] for field in fields}
+
+
+def columns_to_records(columns: dict) -> List[dict]:
+    """Turn parallel arrays back into a list of row dicts."""
+    if not columns:
+        return []
+    fields = tuple(columns)
+    return [dict(zip(fields, row)) for row in zip(*columns.values())]
+
+
+def series_length(series) -> int:
+    """Number of rows in a series in either layout."""
+    if isinstance(series, dict):
+        return len(next(iter(series.values()), ()))
+    return len(series or ())
+
+
+def series_column(series, field: str) -> list:
+    """One field of a series in either layout."""
+    if isinstance(series, dict):
+        return series.get(field) or [None] * series_length(series)
+    return [row.get(field) for row in series or ()]
+
+
+def series_row(series, index: int) -> Optional[dict]:
+    """Row `index` of a series in either layout (None if out of range)."""
+    if not 0 <= index < series_length(series):
+        return None
+    if isinstance(series, dict):
+        return {field: values[index] for field, values in series.items()}
+    return series[index]
+
+
+def _convert_series(weather_data: Optional[dict], convert, layout_type) -> Optional[dict]:
+    if not weather_data:
+        return weather_data
+    converted = dict(weather_data)
+    for key in SERIES_KEYS:
+        series = weather_data.get(key)
+        if series is not None and not isinstance(series, layout_type):
+            converted[key] = convert(series)
+    return converted
+
+
+def to_columnar_layout(weather_data: Optional[dict]) -> Optional[dict]:
+    """Copy of normalized weather data with its series as parallel arrays."""
+    return _convert_series(weather_data, rows_to_columns, dict)
+
+
+def to_row_layout(weather_data: Optional[dict]) -> Optional[dict]:
+    """Copy of normalized weather data with its series as lists of row dicts."""
+    return _convert_series(weather_data, columns_to_records, list)
+
+
+# ==================== TIME INDEX ====================
+
+TIME_FIELDS = ("time", "timestamp", "dt")
+INDEXED_SERIES = ("hourly", "minutely_15")
+
+
+def parse_epoch(value) -> Optional[float]:
+    """Epoch seconds of an ISO-8601 or "YYYY-MM-DD HH:MM" time (naive means UTC), or None."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value, "%Y-%m-%d %H:%M")
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def series_times(series) -> list:
+    """Time of each row of a series in either layout, from the first time field present."""
+    if isinstance(series, dict):
+        for field in TIME_FIELDS:
+            if field in series:
+                return series_column(series, field)
+        return [None] * series_length(series)
+    return [next((row.get(f) for f in TIME_FIELDS if row.get(f)), None) for row in series or ()]
+
+
+def index_series(series) -> dict:
+    """
+    Sorted epoch seconds of a series and the row each belongs to.
+
+    Rows whose time can't be parsed are left out.
+    """
+    pairs = sorted(
+        (epoch, row)
+        for row, epoch in enumerate(map(parse_epoch, series_times(series)))
+        if epoch is not None
+    )
+    return {"epochs": [epoch for epoch, _ in pairs], "rows": [row for _, row in pairs]}
+
+
+def build_time_index(weather_data: Optional[dict]) -> dict:
+    """Time index of normalized weather data: indexed series plus today's sunrise/sunset."""
+    weather_data = weather_data or {}
+    index = {key: index_series(weather_data.get(key)) for key in INDEXED_SERIES}
+    today = series_row(weather_data.get("daily") or [], 0) or {}
+    index["sunrise"] = parse_epoch(today.get("sunrise"))
+    index["sunset"] = parse_epoch(today.get("sunset"))
+    return index
+
+
+def closest_row(indexed: Optional[dict], now: float) -> Optional[int]:
+    """Row of an indexed series whose time is closest to now (earlier wins ties), or None."""
+    epochs = (indexed or {}).get("epochs")
+    if not epochs:
+        return None
+    position = bisect.bisect_left(epochs, now)
+    if position == len(epochs) or (position and now - epochs[position - 1] <= epochs[position] - now):
+        position -= 1
+    return indexed["rows"][position]
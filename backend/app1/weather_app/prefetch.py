@@ -0,0 +1,324 @@
+"""
+Weather Prefetching
+
+Keeps the combined weather payload (forecast, AQI/UV, timezone) of every saved
+location fresh ahead of its TTL, so /api/weather/ for saved locations is served
+from a warm cache. Run continuously with `manage.py weather_prefetch`.
+
+Each distinct forecast grid cell with a saved location is a target. Targets sit
+in a priority queue ordered by when they are due (the cached payload's expiry
+minus a lead time) and then by how recently the cell was requested; cells
+requested within ACCESS_WINDOW get the full lead, others half of it. Due targets
+are refreshed on a bounded worker pool, with upstream calls paced per provider.
+
+Open-Meteo (the primary weather provider) is unmetered, but while its circuit
+is open refreshes fall through to quota-limited fallbacks: then only recently
+requested cells are refreshed, and only while every limited provider keeps
+QUOTA_RESERVE of its daily quota for live requests.
+
+Usage:
+    python manage.py weather_prefetch
+    python manage.py weather_prefetch --workers 8 --once
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from app1.cache_utils import get_many, refresh_cached
+from app1.cache_warming import PROVIDER_RATE_LIMITS, CacheWarmer, RateLimiter
+
+from .grid import snap
+
+logger = logging.getLogger(__name__)
+
+ACCESS_PREFIX = "weather_access"
+LEASE_KEY = "weather_prefetch:lease"
+
+DEFAULT_PREFETCH_SETTINGS = {
+    "WORKERS": 4,
+    "LEAD_FRACTION": 0.2,      # refresh this share of the TTL before expiry
+    "ACCESS_WINDOW": 86400,    # seconds a request keeps a cell "recently accessed"
+    "RELOAD_INTERVAL": 300,    # seconds between re-reading saved locations
+    "RETRY_DELAY": 60,         # seconds before retrying a failed or deferred refresh
+    "QUOTA_RESERVE": 0.5,      # share of each limited quota kept for live requests
+    "LEASE_TTL": 60,
+}
+
+
+def prefetch_settings() -> dict:
+    return {**DEFAULT_PREFETCH_SETTINGS, **getattr(settings, "WEATHER_PREFETCH", {})}
+
+
+def access_key(lat, lng) -> str:
+    return f"{ACCESS_PREFIX}:{snap(lat, lng, 'forecast').key}"
+
+
+def record_access(lat, lng) -> None:
+    """Note that a forecast cell was just requested (drives prefetch priority)."""
+    try:
+        cache.set(access_key(lat, lng), time.time(), prefetch_settings()["ACCESS_WINDOW"])
+    except Exception as e:
+        logger.debug(f"Weather access not recorded: {e}")
+
+
+class Target(NamedTuple):
+    lat: float
+    lng: float
+    cell: str            # forecast grid cell key
+    cache_key: str       # combined payload key
+
+
+class WeatherPrefetcher:
+    """
+    Priority-queue scheduler that refreshes saved-location weather before it expires.
+
+    Args:
+        workers: Maximum concurrent refreshes
+        rate_limits: Requests/second per provider (defaults to PROVIDER_RATE_LIMITS)
+    """
+
+    def __init__(self, workers=None, rate_limits=None):
+        from .views import WeatherView
+
+        self.config = prefetch_settings()
+        self.workers = max(1, workers or self.config["WORKERS"])
+        limits = {**PROVIDER_RATE_LIMITS, **(rate_limits or {})}
+        self.limiters = {provider: RateLimiter(rate) for provider, rate in limits.items()}
+        self.view = WeatherView()
+        self.ttl = self.view.COMBINED_CACHE_TTL
+        self.aqi_ttl = settings.WEATHER_CACHE_TTL.get("air_quality", 1800)
+
+        self.targets = {}       # cell -> Target
+        self.aqi_fresh_until = {}
+        self._queue = []        # (due, -last_access, seq, cell)
+        self._scheduled = {}    # cell -> seq of its live queue entry
+        self._seq = itertools.count()
+        self._lease_token = uuid.uuid4().hex
+        self.stats = {"refreshed": 0, "failed": 0, "deferred": 0}
+
+    # ---------- Targets ----------
+
+    def load_targets(self) -> int:
+        """Sync targets with saved locations; new ones are queued by their cache state."""
+        targets = {}
+        for lat, lng in CacheWarmer.saved_coordinates():
+            cell = snap(lat, lng, "forecast").key
+            targets[cell] = Target(lat, lng, cell, self.view.combined_cache_key(lat, lng))
+
+        new = [target for cell, target in targets.items() if cell not in self.targets]
+        self.targets = targets
+        for cell in list(self._scheduled):
+            if cell not in targets:
+                del self._scheduled[cell]   # its queue entry is skipped when popped
+
+        if new:
+            entries = get_many([t.cache_key for t in new])
+            accesses = get_many([f"{ACCESS_PREFIX}:{t.cell}" for t in new])
+            for target in new:
+                envelope = entries.get(target.cache_key)
+                expires_at = envelope.get("expires_at") if isinstance(envelope, dict) else None
+                self.schedule(target, expires_at, accesses.get(f"{ACCESS_PREFIX}:{target.cell}"))
+        return len(targets)
+
+    def last_access(self, target) -> float:
+        try:
+            return float(cache.get(f"{ACCESS_PREFIX}:{target.cell}") or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def recently_accessed(self, last_access, now=None) -> bool:
+        now = time.time() if now is None else now
+        return bool(last_access) and now - last_access < self.config["ACCESS_WINDOW"]
+
+    def due_at(self, expires_at, last_access, now=None) -> float:
+        """When a payload expiring at expires_at should be refreshed (now if uncached)."""
+        now = time.time() if now is None else now
+        if not expires_at:
+            return now
+        lead = self.ttl * self.config["LEAD_FRACTION"]
+        if not self.recently_accessed(last_access, now):
+            lead /= 2
+        return expires_at - lead
+
+    def schedule(self, target, expires_at=None, last_access=None, due=None) -> None:
+        """Queue a target, replacing any earlier entry for it."""
+        last_access = float(last_access or 0)
+        if due is None:
+            due = self.due_at(expires_at, last_access)
+        seq = next(self._seq)
+        self._scheduled[target.cell] = seq
+        heapq.heappush(self._queue, (due, -last_access, seq, target.cell))
+
+    def pop_due(self, now=None, limit=None) -> list:
+        """Targets whose refresh is due, most urgent first."""
+        now = time.time() if now is None else now
+        due = []
+        while self._queue and self._queue[0][0] <= now and (limit is None or len(due) < limit):
+            _, _, seq, cell = heapq.heappop(self._queue)
+            if self._scheduled.get(cell) != seq:
+                continue   # superseded or removed
+            del self._scheduled[cell]
+            due.append(self.targets[cell])
+        return due
+
+    def next_due(self):
+        while self._queue and self._scheduled.get(self._queue[0][3]) != self._queue[0][2]:
+            heapq.heappop(self._queue)
+        return self._queue[0][0] if self._queue else None
+
+    # ---------- Refreshing ----------
+
+    def quota_allows(self, target, last_access) -> bool:
+        """Whether refreshing target now is worth the provider quota it may spend."""
+        from .services import weather_service
+
+        if weather_service.breakers["open_meteo"].state == "closed":
+            return True
+        if not self.recently_accessed(last_access):
+            return False
+        reserve = self.config["QUOTA_RESERVE"]
+        return all(
+            quota.remaining() > quota.daily_limit * reserve
+            for quota in weather_service.quotas.values()
+        )
+
+    def refresh(self, target) -> bool:
+        """
+        Refetch a target's forecast (and AQI/UV once that is near expiry) and store
+        a new combined payload.
+
+        Returns:
+            True if a complete payload was stored
+        """
+        from .services import weather_service
+
+        lat, lng = target.lat, target.lng
+        now = time.time()
+        if self.aqi_fresh_until.get(target.cell, 0) <= now + self.ttl * self.config["LEAD_FRACTION"]:
+            self.limiters["air_quality"].wait()
+            if weather_service.get_air_quality_data(lat, lng, refresh=True):
+                self.aqi_fresh_until[target.cell] = now + self.aqi_ttl
+        self.limiters["weather"].wait()
+        if not weather_service.get_weather_data(lat, lng, refresh=True):
+            return False
+
+        errors = {}
+        payload = refresh_cached(
+            target.cache_key,
+            lambda: self.view._build_combined_data(lat, lng, {"lat": lat, "lng": lng}, errors),
+            self.ttl,
+            self.view.COMBINED_STALE_TTL,
+        )
+        return bool(payload) and not payload.get("errors")
+
+    def _refresh_task(self, target):
+        close_old_connections()
+        try:
+            return self.refresh(target)
+        except Exception as e:
+            logger.warning(f"Weather prefetch failed for {target.cell}: {e}")
+            return False
+        finally:
+            close_old_connections()
+
+    def _submit(self, pool, target):
+        last_access = self.last_access(target)
+        if not self.quota_allows(target, last_access):
+            self.stats["deferred"] += 1
+            self.schedule(target, last_access=last_access, due=time.time() + self.config["RETRY_DELAY"])
+            return None
+        return pool.submit(self._refresh_task, target)
+
+    def _finish(self, target, ok):
+        if target.cell not in self.targets:
+            return
+        last_access = self.last_access(target)
+        if ok:
+            self.stats["refreshed"] += 1
+            self.schedule(target, time.time() + self.ttl, last_access)
+        else:
+            self.stats["failed"] += 1
+            self.schedule(target, last_access=last_access, due=time.time() + self.config["RETRY_DELAY"])
+
+    # ---------- Running ----------
+
+    def acquire_lease(self) -> bool:
+        """Claim (or renew) the single-prefetcher lease shared by all hosts."""
+        ttl = self.config["LEASE_TTL"]
+        if cache.add(LEASE_KEY, self._lease_token, ttl):
+            return True
+        if cache.get(LEASE_KEY) == self._lease_token:
+            cache.touch(LEASE_KEY, ttl)
+            return True
+        return False
+
+    def release_lease(self) -> None:
+        if cache.get(LEASE_KEY) == self._lease_token:
+            cache.delete(LEASE_KEY)
+
+    def run_once(self) -> dict:
+        """Load targets and refresh everything currently due, then return stats."""
+        self.load_targets()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="weather-prefetch") as pool:
+            futures = {}
+            for target in self.pop_due():
+                future = self._submit(pool, target)
+                if future is not None:
+                    futures[future] = target
+            for future in futures:
+                self._finish(futures[future], future.result())
+        return dict(self.stats, targets=len(self.targets))
+
+    def run(self, stop_event: threading.Event, on_reload=None) -> None:
+        """
+        Refresh targets as they come due until stop_event is set.
+
+        Args:
+            on_reload: Called with the stats after every target reload
+        """
+        in_flight = {}
+        next_lease = next_reload = 0.0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="weather-prefetch") as pool:
+            while not stop_event.is_set():
+                now = time.time()
+                if now >= next_lease:
+                    if not self.acquire_lease():
+                        logger.info("Another weather prefetcher holds the lease; waiting")
+                        stop_event.wait(self.config["LEASE_TTL"] / 2)
+                        continue
+                    next_lease = now + self.config["LEASE_TTL"] / 3
+                if now >= next_reload:
+                    count = self.load_targets()
+                    next_reload = now + self.config["RELOAD_INTERVAL"]
+                    if on_reload:
+                        on_reload(dict(self.stats, targets=count, queued=len(self._scheduled)))
+
+                for target in self.pop_due(now, limit=self.workers - len(in_flight)):
+                    future = self._submit(pool, target)
+                    if future is not None:
+                        in_flight[future] = target
+
+                # Sleep until the next due target, reload or lease renewal (a finished refresh wakes us)
+                next_due = self.next_due()
+                wake_at = min(next_lease, next_reload, next_due if next_due is not None else next_reload)
+                timeout = min(max(wake_at - time.time(), 0.05), 5.0)
+                if in_flight:
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(in_flight.pop(future), future.result())
+                else:
+                    stop_event.wait(timeout)
+
+            for future in list(in_flight):
+                self._finish(in_flight.pop(future), future.result())
+        self.release_lease()
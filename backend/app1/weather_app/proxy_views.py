@@ -18,8 +18,17 @@ External APIs proxied:
 
 import requests
 import logging
+import time
 from django.conf import settings
-from django.core.cache import cache
+from django.http import FileResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from app1.cache_metrics import metered_get, metered_set
+from app1.http_client import http_get, http_post
+from .autocomplete import UpstreamError, autocomplete_cache
+from .grid import snap
+from .tiles import TileFetchError, tile_store
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -40,8 +49,11 @@ class PlacesAutocompleteProxyView(APIView):
         "longitude": -95.37,
         "radius": 50000
     }
+    
+    Suggestions are served from the autocomplete prefix cache where possible.
     """
     permission_classes = [AllowAny]
+    UPSTREAM_LIMIT = 5  # Places Autocomplete returns at most 5 predictions
 
     def post(self, request):
         user_input = request.data.get("input", "").strip()
@@ -64,63 +76,43 @@ class PlacesAutocompleteProxyView(APIView):
             )
 
         try:
-            # Build request body
+            # Build request body; the bias is snapped to its autocomplete bucket's centre
             request_body = {"input": user_input}
+            bucket = autocomplete_cache.bias_bucket(latitude, longitude)
             
-            if latitude is not None and longitude is not None:
+            if bucket.cell is not None:
                 request_body["locationBias"] = {
                     "circle": {
                         "center": {
-                            "latitude": float(latitude),
-                            "longitude": float(longitude),
+                            "latitude": bucket.cell.lat,
+                            "longitude": bucket.cell.lng,
                         },
                         "radius": float(radius),
                     }
                 }
 
-            response = requests.post(
-                f"https://places.googleapis.com/v1/places:autocomplete?key={api_key}",
-                json=request_body,
-                headers={
-                    "Content-Type": "application/json",
-                    "X-Goog-FieldMask": "suggestions.placePrediction.placeId,suggestions.placePrediction.text,suggestions.placePrediction.structuredFormat",
-                },
-                timeout=10,
+            suggestions = autocomplete_cache.get_or_fetch(
+                f"places:{float(radius):g}",
+                user_input,
+                lambda: self._fetch(api_key, request_body),
+                limit=self.UPSTREAM_LIMIT,
+                match=lambda suggestion: suggestion["fullName"] or suggestion["name"],
+                bucket=bucket,
             )
-
-            if response.status_code != 200:
-                logger.warning(f"Google Places API error: {response.status_code} - {response.text}")
-                # Include upstream response details in DEBUG mode to aid debugging (do not expose in production)
-                upstream_body = response.text if getattr(settings, "DEBUG", False) else "hidden"
-                return Response(
-                    {
-                        "error": "Places API error",
-                        "upstream_status": response.status_code,
-                        "upstream_body": upstream_body,
-                        "suggestions": [],
-                    },
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
-
-            data = response.json()
-            
-            # Transform to frontend format
-            suggestions = []
-            for suggestion in data.get("suggestions", []):
-                pred = suggestion.get("placePrediction", {})
-                if pred:
-                    suggestions.append({
-                        "id": pred.get("placeId"),
-                        "name": pred.get("structuredFormat", {}).get("mainText", {}).get("text", "")
-                               or pred.get("text", {}).get("text", "").split(",")[0],
-                        "fullName": pred.get("text", {}).get("text", ""),
-                        "secondaryText": pred.get("structuredFormat", {}).get("secondaryText", {}).get("text", ""),
-                        "placeId": pred.get("placeId"),
-                        "coordinates": None,
-                    })
-
             return Response({"suggestions": suggestions}, status=status.HTTP_200_OK)
 
+        except UpstreamError as e:
+            # Include upstream response details in DEBUG mode to aid debugging (do not expose in production)
+            upstream_body = e.body if getattr(settings, "DEBUG", False) else "hidden"
+            return Response(
+                {
+                    "error": "Places API error",
+                    "upstream_status": e.status_code,
+                    "upstream_body": upstream_body,
+                    "suggestions": [],
+                },
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         except requests.exceptions.Timeout:
             return Response(
                 {"error": "Request timed out", "suggestions": []},
@@ -133,6 +125,40 @@ class PlacesAutocompleteProxyView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    def _fetch(self, api_key, request_body):
+        """Suggestions from Google for one query (raises UpstreamError on a non-200)."""
+        response = http_post(
+            f"https://places.googleapis.com/v1/places:autocomplete?key={api_key}",
+            json=request_body,
+            headers={
+                "Content-Type": "application/json",
+                "X-Goog-FieldMask": "suggestions.placePrediction.placeId,suggestions.placePrediction.text,suggestions.placePrediction.structuredFormat",
+            },
+            timeout=10,
+        )
+
+        if response.status_code != 200:
+            logger.warning(f"Google Places API error: {response.status_code} - {response.text}")
+            raise UpstreamError(response.status_code, response.text)
+
+        data = response.json()
+        
+        # Transform to frontend format
+        suggestions = []
+        for suggestion in data.get("suggestions", []):
+            pred = suggestion.get("placePrediction", {})
+            if pred:
+                suggestions.append({
+                    "id": pred.get("placeId"),
+                    "name": pred.get("structuredFormat", {}).get("mainText", {}).get("text", "")
+                           or pred.get("text", {}).get("text", "").split(",")[0],
+                    "fullName": pred.get("text", {}).get("text", ""),
+                    "secondaryText": pred.get("structuredFormat", {}).get("secondaryText", {}).get("text", ""),
+                    "placeId": pred.get("placeId"),
+                    "coordinates": None,
+                })
+        return suggestions
+
 
 class GeoapifyAutocompleteProxyView(APIView):
     """
@@ -148,6 +174,7 @@ class GeoapifyAutocompleteProxyView(APIView):
     
     Returns place suggestions with names, addresses, and coordinates.
     Geoapify provides richer POI data including place names like "University of Houston".
+    Suggestions are served from the autocomplete prefix cache where possible.
     """
     permission_classes = [AllowAny]
 
@@ -172,77 +199,28 @@ class GeoapifyAutocompleteProxyView(APIView):
             )
 
         try:
-            from urllib.parse import quote
-            encoded_text = quote(text)
-            
-            # Build Geoapify Geocoding Autocomplete URL
-            # Docs: https://apidocs.geoapify.com/docs/geocoding/address-autocomplete/
-            url = f"https://api.geoapify.com/v1/geocode/autocomplete?text={encoded_text}&limit={limit}&apiKey={api_key}"
-            
-            # Add location bias if provided
-            if lat and lon:
-                url += f"&bias=proximity:{lon},{lat}"
-            
-            # Add type filter if provided
-            if place_type:
-                url += f"&type={place_type}"
-            
-            # Request additional details for better place names
-            url += "&format=json"
-
-            response = requests.get(url, timeout=10)
-
-            if response.status_code != 200:
-                logger.warning(f"Geoapify Autocomplete error: {response.status_code} - {response.text}")
-                return Response(
-                    {"error": "Geoapify API error", "suggestions": []},
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
-
-            data = response.json()
-            
-            # Transform Geoapify response to our format
-            # Geoapify returns rich data including POI names, addresses, and coordinates
-            suggestions = []
-            for result in data.get("results", []):
-                # Extract the best display name
-                # Priority: name (POI name) > street with housenumber > formatted address
-                name = result.get("name", "")  # POI name like "University of Houston"
-                street = result.get("street", "")
-                housenumber = result.get("housenumber", "")
-                city = result.get("city", "")
-                state = result.get("state", "")
-                
-                # Build display name
-                if name:
-                    display_name = name
-                elif street:
-                    display_name = f"{housenumber} {street}".strip() if housenumber else street
-                else:
-                    display_name = result.get("formatted", "").split(",")[0]
-                
-                # Build secondary text (location context)
-                secondary_parts = []
-                if name and street:
-                    secondary_parts.append(f"{housenumber} {street}".strip() if housenumber else street)
-                if city:
-                    secondary_parts.append(city)
-                if state:
-                    secondary_parts.append(state)
-                secondary_text = ", ".join(secondary_parts)
-                
-                suggestions.append({
-                    "id": result.get("place_id", ""),
-                    "name": display_name,
-                    "fullName": result.get("formatted", ""),
-                    "secondaryText": secondary_text,
-                    "coordinates": [result.get("lon"), result.get("lat")] if result.get("lon") and result.get("lat") else None,
-                    "category": result.get("category", ""),
-                    "type": result.get("result_type", ""),
-                })
+            limit = max(1, min(int(limit), 20))
+        except (TypeError, ValueError):
+            limit = 5
 
+        try:
+            # Bias by the autocomplete bucket's centre so nearby users share cached results
+            bucket = autocomplete_cache.bias_bucket(lat, lon)
+            suggestions = autocomplete_cache.get_or_fetch(
+                f"geoapify:{limit}:{place_type}",
+                text,
+                lambda: self._fetch(api_key, text, limit, place_type, bucket),
+                limit=limit,
+                match=lambda suggestion: f"{suggestion['name']} {suggestion['fullName']}",
+                bucket=bucket,
+            )
             return Response({"suggestions": suggestions}, status=status.HTTP_200_OK)
 
+        except UpstreamError:
+            return Response(
+                {"error": "Geoapify API error", "suggestions": []},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         except requests.exceptions.Timeout:
             return Response(
                 {"error": "Request timed out", "suggestions": []},
@@ -255,6 +233,76 @@ class GeoapifyAutocompleteProxyView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    def _fetch(self, api_key, text, limit, place_type, bucket):
+        """Suggestions from Geoapify for one query (raises UpstreamError on a non-200)."""
+        from urllib.parse import quote
+        encoded_text = quote(text)
+        
+        # Build Geoapify Geocoding Autocomplete URL
+        # Docs: https://apidocs.geoapify.com/docs/geocoding/address-autocomplete/
+        url = f"https://api.geoapify.com/v1/geocode/autocomplete?text={encoded_text}&limit={limit}&apiKey={api_key}"
+        
+        # Add location bias if provided
+        if bucket.cell is not None:
+            url += f"&bias=proximity:{bucket.cell.lng},{bucket.cell.lat}"
+        
+        # Add type filter if provided
+        if place_type:
+            url += f"&type={quote(place_type)}"
+        
+        # Request additional details for better place names
+        url += "&format=json"
+
+        response = http_get(url, timeout=10)
+
+        if response.status_code != 200:
+            logger.warning(f"Geoapify Autocomplete error: {response.status_code} - {response.text}")
+            raise UpstreamError(response.status_code, response.text)
+
+        data = response.json()
+        
+        # Transform Geoapify response to our format
+        # Geoapify returns rich data including POI names, addresses, and coordinates
+        suggestions = []
+        for result in data.get("results", []):
+            # Extract the best display name
+            # Priority: name (POI name) > street with housenumber > formatted address
+            name = result.get("name", "")  # POI name like "University of Houston"
+            street = result.get("street", "")
+            housenumber = result.get("housenumber", "")
+            city = result.get("city", "")
+            state = result.get("state", "")
+            
+            # Build display name
+            if name:
+                display_name = name
+            elif street:
+                display_name = f"{housenumber} {street}".strip() if housenumber else street
+            else:
+                display_name = result.get("formatted", "").split(",")[0]
+            
+            # Build secondary text (location context)
+            secondary_parts = []
+            if name and street:
+                secondary_parts.append(f"{housenumber} {street}".strip() if housenumber else street)
+            if city:
+                secondary_parts.append(city)
+            if state:
+                secondary_parts.append(state)
+            secondary_text = ", ".join(secondary_parts)
+            
+            suggestions.append({
+                "id": result.get("place_id", ""),
+                "name": display_name,
+                "fullName": result.get("formatted", ""),
+                "secondaryText": secondary_text,
+                "coordinates": [result.get("lon"), result.get("lat")] if result.get("lon") and result.get("lat") else None,
+                "category": result.get("category", ""),
+                "type": result.get("result_type", ""),
+            })
+
+        return suggestions
+
 
 class GeoapifyRoutingProxyView(APIView):
     """
@@ -293,7 +341,7 @@ class GeoapifyRoutingProxyView(APIView):
             if avoid:
                 url += f"&avoid={avoid}"
 
-            response = requests.get(url, timeout=15)
+            response = http_get(url, timeout=15)
 
             if response.status_code != 200:
                 logger.warning(f"Geoapify Routing error: {response.status_code} - {response.text}")
@@ -361,7 +409,7 @@ class GeoapifyPlacesProxyView(APIView):
                 f"&apiKey={api_key}"
             )
 
-            response = requests.get(url, timeout=10)
+            response = http_get(url, timeout=10)
 
             if response.status_code != 200:
                 logger.warning(f"Geoapify Places error: {response.status_code} - {response.text}")
@@ -422,12 +470,11 @@ class OpenWeatherProxyView(APIView):
                         {"error": "lat and lon are required"},
                         status=status.HTTP_400_BAD_REQUEST,
                     )
-                # Round coordinates to 2 decimal places for cache key (~1km accuracy)
-                lat_rounded = round(float(lat), 2)
-                lon_rounded = round(float(lon), 2)
-                cache_key = f"owm_weather_{lat_rounded}_{lon_rounded}_{units}"
+                # Snap to the forecast grid (~2km) so nearby users share one upstream call
+                cell = snap(float(lat), float(lon), "forecast")
+                cache_key = f"owm_weather_{cell.key}_{units}"
                 cache_timeout = 600  # 10 minutes
-                url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units={units}"
+                url = f"https://api.openweathermap.org/data/2.5/weather?lat={cell.lat}&lon={cell.lng}&appid={api_key}&units={units}"
             
             elif endpoint == "air_pollution":
                 if not lat or not lon:
@@ -435,12 +482,11 @@ class OpenWeatherProxyView(APIView):
                         {"error": "lat and lon are required"},
                         status=status.HTTP_400_BAD_REQUEST,
                     )
-                # Round coordinates to 1 decimal place for cache key (~10km accuracy, good for AQI grid)
-                lat_rounded = round(float(lat), 1)
-                lon_rounded = round(float(lon), 1)
-                cache_key = f"owm_aqi_{lat_rounded}_{lon_rounded}"
+                # Snap to the air-quality grid (~10km)
+                cell = snap(float(lat), float(lon), "air_quality")
+                cache_key = f"owm_aqi_{cell.key}"
                 cache_timeout = 300  # 5 minutes (AQI changes slowly)
-                url = f"https://api.openweathermap.org/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={api_key}"
+                url = f"https://api.openweathermap.org/data/2.5/air_pollution?lat={cell.lat}&lon={cell.lng}&appid={api_key}"
             
             else:
                 return Response(
@@ -449,12 +495,12 @@ class OpenWeatherProxyView(APIView):
                 )
 
             # Check cache first
-            cached_data = cache.get(cache_key)
+            cached_data = metered_get(cache_key, prefix=f"owm_{endpoint}")
             if cached_data is not None:
                 return Response(cached_data, status=status.HTTP_200_OK)
 
             # Make upstream request
-            response = requests.get(url, timeout=10)
+            response = http_get(url, timeout=10)
 
             if response.status_code == 429:
                 # Rate limited - log and return informative error
@@ -473,7 +519,7 @@ class OpenWeatherProxyView(APIView):
 
             data = response.json()
             # Cache successful response
-            cache.set(cache_key, data, cache_timeout)
+            metered_set(cache_key, data, cache_timeout, prefix=f"owm_{endpoint}")
             
             return Response(data, status=status.HTTP_200_OK)
 
@@ -490,10 +536,15 @@ class OpenWeatherProxyView(APIView):
             )
 
 
+def tile_url_template(request, layer):
+    """Absolute {z}/{x}/{y} URL template of a layer on the tile proxy."""
+    sample = reverse("proxy_tile", kwargs={"layer": layer, "z": 0, "x": 0, "y": 0})
+    return request.build_absolute_uri(sample).replace("/0/0/0.png", "/{z}/{x}/{y}.png")
+
+
 class OpenWeatherTileProxyView(APIView):
     """
-    Proxy for OpenWeatherMap tile URLs.
-    Returns the tile URL with API key embedded (for Mapbox source).
+    URL template of an OpenWeatherMap tile layer on our tile proxy (for Mapbox source).
     GET /api/weather/proxy/tile-url/
     
     Query params:
@@ -503,7 +554,34 @@ class OpenWeatherTileProxyView(APIView):
 
     def get(self, request):
         layer = request.query_params.get("layer", "precipitation_new")
-        
+        if layer not in tile_store.layer_ttl:
+            return Response(
+                {"error": f"Unknown layer: {layer}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Tiles go through WeatherTileProxyView, so the API key never reaches the browser
+        return Response({"tileUrl": tile_url_template(request, layer)}, status=status.HTTP_200_OK)
+
+
+class WeatherTileProxyView(APIView):
+    """
+    Caching proxy for OpenWeatherMap map tiles.
+    GET /api/proxy/tiles/<layer>/<z>/<x>/<y>.png
+    
+    Tiles come from the on-disk tile store (weather_app.tiles), fetched upstream
+    once per layer TTL however many users request them, and are streamed with
+    FileResponse. ETags are content hashes, so revalidation answers 304.
+    
+    Response headers:
+    - X-Cache: HIT, MISS or STALE (upstream failed, expired tile served)
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, layer, z, x, y):
+        if not tile_store.valid(layer, z, x, y):
+            return Response({"error": "Unknown tile"}, status=status.HTTP_404_NOT_FOUND)
+
         api_key = getattr(settings, "OPENWEATHER_API_KEY", "")
         if not api_key:
             return Response(
@@ -511,10 +589,35 @@ class OpenWeatherTileProxyView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        # Return the tile URL template with embedded API key
-        tile_url = f"https://tile.openweathermap.org/map/{layer}/{{z}}/{{x}}/{{y}}.png?appid={api_key}"
-        
-        return Response({"tileUrl": tile_url}, status=status.HTTP_200_OK)
+        try:
+            tile, cache_state = tile_store.get(layer, z, x, y, api_key)
+        except TileFetchError as e:
+            if e.status_code == 429:
+                logger.warning("OpenWeather rate limit hit for tiles")
+            return Response({"error": str(e)}, status=e.status_code)
+        except Exception as e:
+            logger.error(f"Tile proxy error for {layer}/{z}/{x}/{y}: {e}")
+            return Response(
+                {"error": "Internal server error"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        headers = {
+            "ETag": tile.etag,
+            "Last-Modified": http_date(tile.fetched_at),
+            "Cache-Control": f"public, max-age={max(0, int(tile.expires_at - time.time()))}",
+            "X-Cache": cache_state,
+        }
+        # 304 (or 412) when the client's copy matches; no file is opened then
+        response = get_conditional_response(request, etag=tile.etag, last_modified=int(tile.fetched_at))
+        if response is None:
+            try:
+                response = FileResponse(tile_store.open(tile, api_key), content_type="image/png")
+            except TileFetchError as e:
+                return Response({"error": str(e)}, status=e.status_code)
+        for header, value in headers.items():
+            response[header] = value
+        return response
 
 
 class WAQIProxyView(APIView):
@@ -547,7 +650,7 @@ class WAQIProxyView(APIView):
 
         try:
             url = f"https://api.waqi.info/feed/geo:{lat};{lon}/?token={api_key}"
-            response = requests.get(url, timeout=10)
+            response = http_get(url, timeout=10)
 
             if response.status_code != 200:
                 logger.warning(f"WAQI API error: {response.status_code}")
@@ -580,6 +683,9 @@ class MapboxGeocodingProxyView(APIView):
     - query: search text
     - proximity_lon, proximity_lat: bias coordinates (optional)
     - limit: max results (default 5)
+    
+    Mapbox's response is passed through; its features are served from the
+    autocomplete prefix cache where possible.
     """
     permission_classes = [AllowAny]
 
@@ -603,25 +709,29 @@ class MapboxGeocodingProxyView(APIView):
             )
 
         try:
-            from urllib.parse import quote
-            encoded_query = quote(query)
-            
-            url = f"https://api.mapbox.com/geocoding/v5/mapbox.places/{encoded_query}.json?access_token={api_key}&limit={limit}&types=place,locality,neighborhood,address,poi"
-            
-            if proximity_lon and proximity_lat:
-                url += f"&proximity={proximity_lon},{proximity_lat}"
-
-            response = requests.get(url, timeout=10)
-
-            if response.status_code != 200:
-                logger.warning(f"Mapbox Geocoding error: {response.status_code}")
-                return Response(
-                    {"error": "Mapbox API error", "features": []},
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
+            limit = max(1, min(int(limit), 10))
+        except (TypeError, ValueError):
+            limit = 5
 
-            return Response(response.json(), status=status.HTTP_200_OK)
+        try:
+            # Bias by the autocomplete bucket's centre so nearby users share cached results
+            bucket = autocomplete_cache.bias_bucket(proximity_lat, proximity_lon)
+            body = autocomplete_cache.get_or_fetch_envelope(
+                f"mapbox:{limit}",
+                query,
+                lambda: self._fetch(api_key, query, limit, bucket),
+                items_key="features",
+                limit=limit,
+                match=lambda feature: f"{feature.get('text', '')} {feature.get('place_name', '')}",
+                bucket=bucket,
+            )
+            return Response(body, status=status.HTTP_200_OK)
 
+        except UpstreamError:
+            return Response(
+                {"error": "Mapbox API error", "features": []},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         except requests.exceptions.Timeout:
             return Response(
                 {"error": "Request timed out", "features": []},
@@ -634,21 +744,39 @@ class MapboxGeocodingProxyView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    def _fetch(self, api_key, query, limit, bucket):
+        """Mapbox's response for one query (raises UpstreamError on a non-200)."""
+        from urllib.parse import quote
+        encoded_query = quote(query)
+        
+        url = f"https://api.mapbox.com/geocoding/v5/mapbox.places/{encoded_query}.json?access_token={api_key}&limit={limit}&types=place,locality,neighborhood,address,poi"
+        
+        if bucket.cell is not None:
+            url += f"&proximity={bucket.cell.lng},{bucket.cell.lat}"
+
+        response = http_get(url, timeout=10)
+
+        if response.status_code != 200:
+            logger.warning(f"Mapbox Geocoding error: {response.status_code}")
+            raise UpstreamError(response.status_code)
+
+        return response.json()
+
 
 class MapTileConfigView(APIView):
     """
-    Returns map tile configurations with API keys embedded.
+    Returns map tile configurations pointing at our tile proxy.
     GET /api/weather/proxy/tile-config/
     
     Returns URLs for weather layers that can be used by Mapbox.
-    Cached for 1 hour since tile URLs don't change frequently.
+    Cached for 1 hour (per host, since the URLs are absolute).
     """
     permission_classes = [AllowAny]
 
     def get(self, request):
         # Check cache first
-        cache_key = "map_tile_config"
-        cached_config = cache.get(cache_key)
+        cache_key = f"map_tile_config:{request.get_host()}"
+        cached_config = metered_get(cache_key)
         if cached_config is not None:
             return Response(cached_config, status=status.HTTP_200_OK)
         
@@ -662,24 +790,24 @@ class MapTileConfigView(APIView):
 
         configs = {
             "precipitation": {
-                "url": f"https://tile.openweathermap.org/map/precipitation_new/{{z}}/{{x}}/{{y}}.png?appid={owm_key}",
+                "url": tile_url_template(request, "precipitation_new"),
                 "opacity": 0.75,
             },
             "temperature": {
-                "url": f"https://tile.openweathermap.org/map/temp_new/{{z}}/{{x}}/{{y}}.png?appid={owm_key}",
+                "url": tile_url_template(request, "temp_new"),
                 "opacity": 0.65,
             },
             "clouds": {
-                "url": f"https://tile.openweathermap.org/map/clouds_new/{{z}}/{{x}}/{{y}}.png?appid={owm_key}",
+                "url": tile_url_template(request, "clouds_new"),
                 "opacity": 0.55,
             },
             "pressure": {
-                "url": f"https://tile.openweathermap.org/map/pressure_new/{{z}}/{{x}}/{{y}}.png?appid={owm_key}",
+                "url": tile_url_template(request, "pressure_new"),
                 "opacity": 0.65,
             },
         }
         
         # Cache for 1 hour (tile URLs are static)
-        cache.set(cache_key, configs, 3600)
+        metered_set(cache_key, configs, 3600)
 
         return Response(configs, status=status.HTTP_200_OK)
@@ -155,3 +155,37 @@ class SavedLocationReorderSerializer(serializers.Serializer):
             seen_ids.add(item["id"])
 
         return value
+
+
+class BatchCoordinateSerializer(serializers.Serializer):
+    """One coordinate pair in a batch weather request."""
+
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+
+
+class BatchWeatherRequestSerializer(serializers.Serializer):
+    """Serializer for batch weather requests: coordinates and/or saved location IDs."""
+
+    MAX_LOCATIONS = 25
+
+    coordinates = BatchCoordinateSerializer(many=True, required=False, default=list)
+    location_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+    )
+    format = serializers.ChoiceField(choices=["rows", "columnar"], required=False, default="rows")
+
+    def validate(self, data):
+        """Require at least one location and cap the batch size."""
+        total = len(data["coordinates"]) + len(data["location_ids"])
+        if total == 0:
+            raise serializers.ValidationError(
+                {"non_field_errors": "Provide coordinates or location_ids."}
+            )
+        if total > self.MAX_LOCATIONS:
+            raise serializers.ValidationError(
+                {"non_field_errors": f"At most {self.MAX_LOCATIONS} locations per batch."}
+            )
+        return data
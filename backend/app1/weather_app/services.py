@@ -18,12 +18,55 @@ Location Services:
 import requests
 import hashlib
 import logging
+import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
 from django.conf import settings
+
+from app1.cache_metrics import metered_get, metered_set
+from app1.cache_utils import get_many, run_in_background, set_many
+from app1.circuit_breaker import CircuitBreaker
+from app1.quota import QuotaLedger
+from .grid import blend, interpolation_enabled, snap, surrounding_cells
+from .normalization import SERIES_KEYS, normalize_open_meteo, normalize_open_meteo_aqi
 from django.core.cache import cache
+from app1.fanout import fan_out, first_result
+from app1.http_client import http_get
 
 logger = logging.getLogger(__name__)
 
+# How long a failed (coordinate, provider) lookup is remembered
+NEGATIVE_CACHE_TTL = 60
+
+AQI_SERIES_KEYS = ("aqi_data", "uv_data")
+
+OPEN_METEO_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+OPEN_METEO_FORECAST_PARAMS = (
+    "&hourly=temperature_2m,relative_humidity_2m,dew_point_2m,weather_code,"
+    "wind_speed_10m,wind_direction_10m,visibility,surface_pressure,cloud_cover,is_day"
+    "&daily=weather_code,temperature_2m_max,temperature_2m_min,sunrise,sunset,"
+    "precipitation_sum,precipitation_probability_max,wind_speed_10m_max"
+    "&minutely_15=temperature_2m,precipitation,weather_code,apparent_temperature,"
+    "is_day,visibility,surface_pressure,cloud_cover"
+    "&temperature_unit=fahrenheit&precipitation_unit=inch&timezone=auto&forecast_days=10"
+)
+OPEN_METEO_BATCH_SIZE = 50  # coordinates per multi-location request
+
+LATENCY_SAMPLES = 200  # recent successful call latencies kept per provider
+
+DEFAULT_HEDGE_SETTINGS = {
+    "ENABLED": True,
+    "PERCENTILE": 95,
+    "MIN_DELAY": 0.5,
+    "MAX_DELAY": 4.0,
+    "DEFAULT_DELAY": 2.0,
+    "MIN_SAMPLES": 20,
+    "BUDGET_FRACTION": 0.2,
+    "QUOTA_RESERVE": 0.1,
+    "TIMEOUT": 20,
+}
+
 
 class WeatherAPIService:
     """Centralized weather service with caching and multi-API fallbacks"""
@@ -99,32 +142,206 @@ class WeatherAPIService:
             },
         )
 
+        self.hedge = {**DEFAULT_HEDGE_SETTINGS, **getattr(settings, "WEATHER_HEDGE", {})}
+        self.latencies = {name: deque(maxlen=LATENCY_SAMPLES) for name in self.apis}
+        self._latency_lock = threading.Lock()
+
+        # Shared (cross-worker) breakers so an outage is skipped instead of timed out
+        self.breakers = {
+            name: CircuitBreaker(f"weather:{name}")
+            for name in ("open_meteo", "tomorrow_io", "visual_crossing", "openweather",
+                         "waqi", "open_meteo_aqi")
+        }
+        # Shared daily call counters for quota-limited providers
+        self.quotas = {
+            name: QuotaLedger(f"weather:{name}", api["daily_limit"])
+            for name, api in self.apis.items()
+            if api["daily_limit"] != float("inf")
+        }
+
     def _get_cache_key(self, prefix, *args):
         """Generate a cache key from prefix and arguments"""
         key_string = f"{prefix}:{':'.join(str(a) for a in args)}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        return f"{prefix}:{hashlib.md5(key_string.encode()).hexdigest()}"
 
     def _get_cached(self, cache_key):
         """Get cached data if available"""
-        return cache.get(cache_key)
+        return metered_get(cache_key)
 
     def _set_cache(self, cache_key, data, ttl_type="forecast"):
         """Set cache with appropriate TTL"""
         ttl = self.cache_ttls.get(ttl_type, 900)
-        cache.set(cache_key, data, ttl)
+        metered_set(cache_key, data, ttl)
+
+    def _provider_configured(self, provider):
+        if provider == "waqi":
+            return bool(self.waqi_api_key)
+        return bool(self.apis.get(provider, {}).get("api_key", True))
+
+    def _call_provider(self, provider, fetcher, lat, lng):
+        """
+        Call one provider behind its negative cache, circuit breaker and quota.
+
+        Returns None without a request when the provider recently failed for this
+        coordinate, its circuit is open or today's quota is used up; failures are
+        recorded for the first two, and a 429 marks the quota exhausted.
+        """
+        if not self._provider_configured(provider):
+            return None
+
+        negative_key = self._get_cache_key("negative", provider, round(lat, 3), round(lng, 3))
+        if metered_get(negative_key):
+            logger.debug(f"Skipping {provider} for {lat}, {lng}: recent failure cached")
+            return None
+
+        breaker = self.breakers[provider]
+        if not breaker.allow_request():
+            logger.info(f"Skipping {provider}: circuit {breaker.state}")
+            return None
+
+        quota = self.quotas.get(provider)
+        if quota is not None and not quota.acquire():
+            logger.warning(f"Skipping {provider}: daily quota of {quota.daily_limit} used up")
+            return None
+
+        started = time.monotonic()
+        try:
+            data = fetcher(lat, lng)
+        except Exception as e:
+            logger.warning(f"Failed to fetch from {provider}: {e}")
+            if quota is not None and getattr(getattr(e, "response", None), "status_code", None) == 429:
+                quota.exhaust()
+            breaker.record_failure()
+            metered_set(negative_key, True, NEGATIVE_CACHE_TTL)
+            return None
+
+        if data:
+            breaker.record_success()
+            self._record_latency(provider, time.monotonic() - started)
+            return data
+        # The provider answered but had nothing for this location
+        breaker.record_success()
+        metered_set(negative_key, True, NEGATIVE_CACHE_TTL)
+        return None
+
+    # ==================== HEDGING ====================
+
+    def _record_latency(self, provider, elapsed):
+        if provider in self.latencies:
+            with self._latency_lock:
+                self.latencies[provider].append(elapsed)
+
+    def latency_percentile(self, provider, percentile=None):
+        """Recent successful-call latency percentile in seconds (None if too few samples)."""
+        with self._latency_lock:
+            samples = sorted(self.latencies.get(provider, ()))
+        if len(samples) < self.hedge["MIN_SAMPLES"]:
+            return None
+        percentile = percentile or self.hedge["PERCENTILE"]
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+    def _hedge_budget_key(self, provider):
+        return f"weather_hedge:{provider}:{time.strftime('%Y%m%d', time.gmtime())}"
+
+    def hedges_today(self, provider):
+        """Hedged calls made to a provider today (UTC), across workers."""
+        return cache.get(self._hedge_budget_key(provider), 0)
+
+    def _can_hedge_to(self, provider, lat, lng):
+        """Whether a speculative call to provider is worth its cost right now."""
+        if not self._provider_configured(provider):
+            return False
+        if self.breakers[provider].state != "closed":
+            return False
+        if metered_get(self._get_cache_key("negative", provider, round(lat, 3), round(lng, 3))):
+            return False
+        quota = self.quotas.get(provider)
+        if quota is None:
+            return True
+        # Keep the tail of the quota for real fallbacks
+        if quota.remaining() <= int(quota.daily_limit * self.hedge["QUOTA_RESERVE"]):
+            return False
+        return self.hedges_today(provider) < int(quota.daily_limit * self.hedge["BUDGET_FRACTION"])
+
+    def hedge_delay(self, provider, backup, lat, lng):
+        """
+        Seconds to wait for provider before also trying backup, or None to only
+        fall back after provider fails (hedging disabled or backup over budget).
+        """
+        if not self.hedge["ENABLED"] or not self._can_hedge_to(backup, lat, lng):
+            return None
+        p95 = self.latency_percentile(provider)
+        if p95 is None:
+            return self.hedge["DEFAULT_DELAY"]
+        return min(max(p95, self.hedge["MIN_DELAY"]), self.hedge["MAX_DELAY"])
+
+    def _spend_hedge(self, provider):
+        if provider not in self.quotas:
+            return
+        key = self._hedge_budget_key(provider)
+        try:
+            if not cache.add(key, 1, 86400):
+                cache.incr(key)
+        except Exception as e:
+            logger.debug(f"Hedge budget for {provider} not recorded: {e}")
+
+    # ==================== GRID ====================
+
+    def grid_cache_key(self, prefix, lat, lng, data_type):
+        """Cache key shared by every coordinate in the same grid cell."""
+        return self._get_cache_key(prefix, snap(lat, lng, data_type).key)
+
+    def _interpolated(self, prefix, data_type, lat, lng, series_keys, fetch):
+        """
+        Blend the cached cells surrounding (lat, lng), if interpolation is enabled
+        and at least two of them are cached. The result is not cached itself;
+        instead fetch(lat, lng, refresh=True) fills the cold cell in the
+        background, so the next request for it is a real cache hit.
+        """
+        if not interpolation_enabled():
+            return None
+        cells = {
+            self._get_cache_key(prefix, cell.key): cell
+            for cell in surrounding_cells(lat, lng, data_type)
+        }
+        samples = [(cells[key], value) for key, value in get_many(list(cells)).items() if value]
+        if len(samples) < 2:
+            return None
+        cell = snap(lat, lng, data_type)
+        run_in_background(
+            self._get_cache_key(prefix, cell.key),
+            lambda: fetch(cell.lat, cell.lng, refresh=True),
+        )
+        return blend(samples, lat, lng, series_keys)
 
     # ==================== WEATHER DATA METHODS ====================
 
-    def get_weather_data(self, lat, lng):
+    def get_weather_data(self, lat, lng, refresh=False):
         """
         Get weather data with intelligent fallback chain.
         Returns normalized weather data from the first successful API.
+
+        A provider slower than its recent p95 latency is hedged: the next one is
+        started in parallel and the first valid result wins.
+
+        Coordinates are snapped to the forecast grid: the cell centre is fetched
+        and cached for every request inside the cell. With refresh=True the
+        cached entry is ignored and replaced (background prefetching).
         """
-        cache_key = self._get_cache_key("weather", round(lat, 3), round(lng, 3))
-        cached = self._get_cached(cache_key)
-        if cached:
-            logger.info(f"Weather cache hit for {lat}, {lng}")
-            return cached
+        cache_key = self.grid_cache_key("weather", lat, lng, "forecast")
+        if not refresh:
+            cached = self._get_cached(cache_key)
+            if cached:
+                logger.info(f"Weather cache hit for {lat}, {lng}")
+                return cached
+
+            interpolated = self._interpolated("weather", "forecast", lat, lng, SERIES_KEYS, self.get_weather_data)
+            if interpolated:
+                logger.info(f"Weather interpolated from neighbouring cells for {lat}, {lng}")
+                return interpolated
+
+        cell = snap(lat, lng, "forecast")
+        lat, lng = cell.lat, cell.lng
 
         # Try APIs in priority order
         fetchers = [
@@ -134,117 +351,61 @@ class WeatherAPIService:
             ("openweather", self.fetch_openweather),
         ]
 
-        for api_name, fetcher in fetchers:
-            try:
-                data = fetcher(lat, lng)
-                if data:
-                    data["source"] = self.apis[api_name]["name"]
-                    self._set_cache(cache_key, data, "forecast")
-                    logger.info(f"Weather data fetched from {api_name}")
-                    return data
-            except Exception as e:
-                logger.warning(f"Failed to fetch from {api_name}: {e}")
-                continue
+        api_name, data = first_result(
+            [
+                (name, lambda name=name, fetcher=fetcher: self._call_provider(name, fetcher, lat, lng))
+                for name, fetcher in fetchers
+            ],
+            hedge_delay=lambda provider, backup: self.hedge_delay(provider, backup, lat, lng),
+            on_hedge=self._spend_hedge,
+            timeout=self.hedge["TIMEOUT"],
+        )
+        if data:
+            data["source"] = self.apis[api_name]["name"]
+            self._set_cache(cache_key, data, "forecast")
+            logger.info(f"Weather data fetched from {api_name}")
+            return data
 
         logger.error("All weather APIs failed")
         return None
 
     def fetch_open_meteo(self, lat, lng):
         """Fetch from Open-Meteo API (Primary - unlimited free)"""
-        url = (
-            f"https://api.open-meteo.com/v1/forecast?"
-            f"latitude={lat}&longitude={lng}"
-            f"&hourly=temperature_2m,relative_humidity_2m,dew_point_2m,weather_code,"
-            f"wind_speed_10m,wind_direction_10m,visibility,surface_pressure,cloud_cover,is_day"
-            f"&daily=weather_code,temperature_2m_max,temperature_2m_min,sunrise,sunset,"
-            f"precipitation_sum,precipitation_probability_max,wind_speed_10m_max"
-            f"&minutely_15=temperature_2m,precipitation,weather_code,apparent_temperature,"
-            f"is_day,visibility,surface_pressure,cloud_cover"
-            f"&temperature_unit=fahrenheit&precipitation_unit=inch&timezone=auto&forecast_days=10"
-        )
+        url = f"{OPEN_METEO_FORECAST_URL}?latitude={lat}&longitude={lng}{OPEN_METEO_FORECAST_PARAMS}"
 
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
         return self._normalize_open_meteo(data)
 
-    def _normalize_open_meteo(self, data):
-        """Normalize Open-Meteo data to standard format"""
-        from .weather_codes import weather_code_descriptions
-
-        hourly_data = data.get("hourly", {})
-        times = hourly_data.get("time", [])[:48]
-
-        hourly_weather_data = [
-            {
-                "time": times[i],
-                "temperature": hourly_data.get("temperature_2m", [None] * 48)[i],
-                "humidity": hourly_data.get("relative_humidity_2m", [None] * 48)[i],
-                "dew_point": hourly_data.get("dew_point_2m", [None] * 48)[i],
-                "weather_code": weather_code_descriptions.get(
-                    hourly_data.get("weather_code", [0] * 48)[i], "Unknown"
-                ),
-                "wind_speed": hourly_data.get("wind_speed_10m", [None] * 48)[i],
-                "wind_direction": hourly_data.get("wind_direction_10m", [None] * 48)[i],
-                "visibility": hourly_data.get("visibility", [None] * 48)[i],
-                "pressure": hourly_data.get("surface_pressure", [None] * 48)[i],
-                "cloud_cover": hourly_data.get("cloud_cover", [None] * 48)[i],
-                "is_day": hourly_data.get("is_day", [1] * 48)[i],
-            }
-            for i in range(min(48, len(times)))
-        ]
+    def fetch_open_meteo_many(self, points):
+        """
+        Fetch several locations from Open-Meteo in one request.
 
-        daily_data = data.get("daily", {})
-        daily_times = daily_data.get("time", [])
+        Args:
+            points: List of (lat, lng)
 
-        daily_weather_data = [
-            {
-                "date": daily_times[i],
-                "weather_code": weather_code_descriptions.get(
-                    daily_data.get("weather_code", [0] * 10)[i], "Unknown"
-                ),
-                "max_temperature": daily_data.get("temperature_2m_max", [None] * 10)[i],
-                "min_temperature": daily_data.get("temperature_2m_min", [None] * 10)[i],
-                "sunrise": daily_data.get("sunrise", [None] * 10)[i],
-                "sunset": daily_data.get("sunset", [None] * 10)[i],
-                "precipitation": daily_data.get("precipitation_sum", [0] * 10)[i],
-                "precipitation_probability": daily_data.get(
-                    "precipitation_probability_max", [0] * 10
-                )[i],
-                "wind_speed_max": daily_data.get("wind_speed_10m_max", [None] * 10)[i],
-            }
-            for i in range(len(daily_times))
-        ]
+        Returns:
+            Normalized weather data per point, in order
+        """
+        latitudes = ",".join(str(lat) for lat, _ in points)
+        longitudes = ",".join(str(lng) for _, lng in points)
+        url = f"{OPEN_METEO_FORECAST_URL}?latitude={latitudes}&longitude={longitudes}{OPEN_METEO_FORECAST_PARAMS}"
 
-        # 15-minute data
-        minutely_15_data = data.get("minutely_15", {})
-        minutely_times = minutely_15_data.get("time", [])[:96]
+        response = http_get(url, timeout=15)
+        response.raise_for_status()
+        data = response.json()
 
-        minutely_weather_data = [
-            {
-                "time": minutely_times[i],
-                "temperature": minutely_15_data.get("temperature_2m", [None] * 96)[i],
-                "precipitation": minutely_15_data.get("precipitation", [0] * 96)[i],
-                "weather_code": weather_code_descriptions.get(
-                    minutely_15_data.get("weather_code", [0] * 96)[i], "Unknown"
-                ),
-                "is_day": minutely_15_data.get("is_day", [1] * 96)[i],
-                "apparent_temperature": minutely_15_data.get(
-                    "apparent_temperature", [None] * 96
-                )[i],
-                "visibility": minutely_15_data.get("visibility", [None] * 96)[i],
-                "pressure": minutely_15_data.get("surface_pressure", [None] * 96)[i],
-                "cloud_cover": minutely_15_data.get("cloud_cover", [None] * 96)[i],
-            }
-            for i in range(min(96, len(minutely_times)))
-        ]
+        # A single location comes back as an object, several as a list in request order
+        results = data if isinstance(data, list) else [data]
+        if len(results) != len(points):
+            raise ValueError(f"Open-Meteo returned {len(results)} locations for {len(points)}")
+        return [self._normalize_open_meteo(result) for result in results]
 
-        return {
-            "hourly": hourly_weather_data,
-            "daily": daily_weather_data,
-            "minutely_15": minutely_weather_data,
-        }
+    def _normalize_open_meteo(self, data):
+        """Normalize Open-Meteo data to standard format"""
+        return normalize_open_meteo(data)
 
     def fetch_tomorrow_io(self, lat, lng):
         """Fetch from Tomorrow.io API (1st Fallback - hyperlocal accuracy)"""
@@ -264,7 +425,7 @@ class WeatherAPIService:
             f"&apikey={api_key}"
         )
 
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -347,7 +508,7 @@ class WeatherAPIService:
             f"&key={api_key}&contentType=json"
         )
 
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -421,7 +582,7 @@ class WeatherAPIService:
             f"&appid={api_key}"
         )
 
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -488,40 +649,107 @@ class WeatherAPIService:
             "minutely_15": [],
         }
 
+    def get_weather_data_many(self, points):
+        """
+        Weather data for many coordinates with as few upstream calls as possible.
+
+        Cached forecast cells are read with one get_many; missing cells are fetched
+        from Open-Meteo in multi-location requests of OPEN_METEO_BATCH_SIZE and
+        cached with one set_many. Cells Open-Meteo couldn't answer go through the
+        regular per-location fallback chain.
+
+        Args:
+            points: List of (lat, lng)
+
+        Returns:
+            Dict of (lat, lng) -> weather data (None if every provider failed)
+        """
+        cells = {}
+        for lat, lng in points:
+            cells.setdefault(self.grid_cache_key("weather", lat, lng, "forecast"), snap(lat, lng, "forecast"))
+        found = {key: value for key, value in get_many(list(cells)).items() if value}
+
+        missing = [key for key in cells if key not in found]
+        breaker = self.breakers["open_meteo"]
+        for start in range(0, len(missing), OPEN_METEO_BATCH_SIZE):
+            chunk = missing[start:start + OPEN_METEO_BATCH_SIZE]
+            if not breaker.allow_request():
+                logger.info(f"Skipping batched Open-Meteo: circuit {breaker.state}")
+                break
+            started = time.monotonic()
+            try:
+                results = self.fetch_open_meteo_many([(cells[key].lat, cells[key].lng) for key in chunk])
+            except Exception as e:
+                logger.warning(f"Batched Open-Meteo request for {len(chunk)} locations failed: {e}")
+                breaker.record_failure()
+                continue
+            breaker.record_success()
+            self._record_latency("open_meteo", time.monotonic() - started)
+
+            fetched = {}
+            for key, data in zip(chunk, results):
+                if data and data.get("hourly"):
+                    data["source"] = self.apis["open_meteo"]["name"]
+                    fetched[key] = data
+            set_many(fetched, self.cache_ttls.get("forecast", 900))
+            found.update(fetched)
+            logger.info(f"Weather data for {len(fetched)}/{len(chunk)} locations fetched in one Open-Meteo request")
+
+        remainder = {key: cells[key] for key in cells if key not in found}
+        if remainder:
+            results, _ = fan_out(
+                {
+                    key: lambda cell=cell: self.get_weather_data(cell.lat, cell.lng)
+                    for key, cell in remainder.items()
+                },
+                timeout=self.hedge["TIMEOUT"],
+            )
+            found.update(results)
+
+        return {
+            (lat, lng): found.get(self.grid_cache_key("weather", lat, lng, "forecast"))
+            for lat, lng in points
+        }
+
     # ==================== AIR QUALITY METHODS ====================
 
-    def get_air_quality_data(self, lat, lng):
+    def get_air_quality_data(self, lat, lng, refresh=False):
         """
         Get air quality data with WAQI as primary, Open-Meteo as fallback.
         WAQI provides detailed station-based AQI with forecasts.
+        Coordinates are snapped to the (coarser) air-quality grid.
+        With refresh=True the cached entry is ignored and replaced.
         """
-        cache_key = self._get_cache_key("aqi", round(lat, 3), round(lng, 3))
-        cached = self._get_cached(cache_key)
-        if cached:
-            logger.info(f"AQI cache hit for {lat}, {lng}")
-            return cached
+        cache_key = self.grid_cache_key("aqi", lat, lng, "air_quality")
+        if not refresh:
+            cached = self._get_cached(cache_key)
+            if cached:
+                logger.info(f"AQI cache hit for {lat}, {lng}")
+                return cached
+
+            interpolated = self._interpolated("aqi", "air_quality", lat, lng, AQI_SERIES_KEYS, self.get_air_quality_data)
+            if interpolated:
+                logger.info(f"AQI interpolated from neighbouring cells for {lat}, {lng}")
+                return interpolated
+
+        cell = snap(lat, lng, "air_quality")
+        lat, lng = cell.lat, cell.lng
 
         # Try WAQI first (more detailed station data)
-        try:
-            data = self.fetch_waqi(lat, lng)
-            if data:
-                data["source"] = "WAQI"
-                self._set_cache(cache_key, data, "air_quality")
-                logger.info("AQI data fetched from WAQI")
-                return data
-        except Exception as e:
-            logger.warning(f"WAQI failed: {e}")
+        data = self._call_provider("waqi", self.fetch_waqi, lat, lng)
+        if data:
+            data["source"] = "WAQI"
+            self._set_cache(cache_key, data, "air_quality")
+            logger.info("AQI data fetched from WAQI")
+            return data
 
         # Fallback to Open-Meteo Air Quality
-        try:
-            data = self.fetch_open_meteo_aqi(lat, lng)
-            if data:
-                data["source"] = "Open-Meteo"
-                self._set_cache(cache_key, data, "air_quality")
-                logger.info("AQI data fetched from Open-Meteo")
-                return data
-        except Exception as e:
-            logger.warning(f"Open-Meteo AQI failed: {e}")
+        data = self._call_provider("open_meteo_aqi", self.fetch_open_meteo_aqi, lat, lng)
+        if data:
+            data["source"] = "Open-Meteo"
+            self._set_cache(cache_key, data, "air_quality")
+            logger.info("AQI data fetched from Open-Meteo")
+            return data
 
         logger.error("All AQI APIs failed")
         return None
@@ -533,9 +761,23 @@ class WeatherAPIService:
 
         url = f"https://api.waqi.info/feed/geo:{lat};{lng}/?token={self.waqi_api_key}"
 
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        def fetch_feed():
+            response = http_get(url, timeout=10)
+            response.raise_for_status()
+            return response.json()
+
+        # The station feed, Open-Meteo hourly AQI and UV are independent requests
+        results, errors = fan_out(
+            {
+                "feed": fetch_feed,
+                "open_meteo": lambda: self.fetch_open_meteo_aqi(lat, lng),
+                "uv": lambda: self._get_uv_from_open_meteo(lat, lng),
+            },
+            timeout=12,
+        )
+        if "feed" in errors:
+            raise requests.exceptions.RequestException(f"WAQI feed failed: {errors['feed']}")
+        data = results["feed"]
 
         if data.get("status") != "ok":
             return None
@@ -586,19 +828,18 @@ class WeatherAPIService:
 
                 aqi_data.append(forecast_entry)
 
-        # Get UV data from Open-Meteo since WAQI doesn't provide it
-        uv_data = self._get_uv_from_open_meteo(lat, lng)
+        # UV comes from Open-Meteo since WAQI doesn't provide it
+        uv_data = results.get("uv") or []
 
         # Supplement WAQI with Open-Meteo hourly AQI so the frontend has 24 points
-        try:
-            open_meteo = self.fetch_open_meteo_aqi(lat, lng)
-            if open_meteo and open_meteo.get("aqi_data"):
-                # Prefer higher-resolution hourly series (keep WAQI station metadata)
-                aqi_data = open_meteo["aqi_data"][:24] or aqi_data
-                # Prefer Open-Meteo UV series if available; otherwise fall back to the ad-hoc fetch
-                uv_data = open_meteo.get("uv_data") or uv_data
-        except Exception as e:  # pragma: no cover - defensive
-            logger.warning(f"Open-Meteo AQI supplement failed: {e}")
+        open_meteo = results.get("open_meteo")
+        if open_meteo and open_meteo.get("aqi_data"):
+            # Prefer higher-resolution hourly series (keep WAQI station metadata)
+            aqi_data = open_meteo["aqi_data"][:24] or aqi_data
+            # Prefer Open-Meteo UV series if available; otherwise fall back to the ad-hoc fetch
+            uv_data = open_meteo.get("uv_data") or uv_data
+        elif "open_meteo" in errors:
+            logger.warning(f"Open-Meteo AQI supplement failed: {errors['open_meteo']}")
 
         return {
             "aqi_data": aqi_data,
@@ -614,7 +855,7 @@ class WeatherAPIService:
         """Get UV data from Open-Meteo (WAQI doesn't provide UV)"""
         try:
             url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lng}&hourly=uv_index&timezone=auto&forecast_days=1"
-            response = requests.get(url, timeout=5)
+            response = http_get(url, timeout=5)
             response.raise_for_status()
             data = response.json()
 
@@ -637,39 +878,11 @@ class WeatherAPIService:
             f"&timezone=auto&forecast_days=3"
         )
 
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
-        hourly = data.get("hourly", {})
-        times = hourly.get("time", [])
-
-        aqi_data = [
-            {
-                "time": times[i],
-                "us_aqi": hourly.get("us_aqi", [None] * len(times))[i],
-                "pm25": hourly.get("pm2_5", [None] * len(times))[i],
-                "pm10": hourly.get("pm10", [None] * len(times))[i],
-                "o3": hourly.get("ozone", [None] * len(times))[i],
-                "no2": hourly.get("nitrogen_dioxide", [None] * len(times))[i],
-                "so2": hourly.get("sulphur_dioxide", [None] * len(times))[i],
-                "co": hourly.get("carbon_monoxide", [None] * len(times))[i],
-            }
-            for i in range(len(times))
-        ]
-
-        uv_data = [
-            {
-                "time": times[i],
-                "uv_index": hourly.get("uv_index", [None] * len(times))[i],
-            }
-            for i in range(len(times))
-        ]
-
-        return {
-            "aqi_data": aqi_data,
-            "uv_data": uv_data,
-        }
+        return normalize_open_meteo_aqi(data)
 
     # ==================== UTILITY METHODS ====================
 
@@ -684,16 +897,32 @@ class WeatherAPIService:
                 ),  # Open-Meteo doesn't need key
                 "daily_limit": api_info["daily_limit"],
                 "priority": api_info["priority"],
+                "circuit": self.breakers[api_name].status(),
+                "latency_p95_ms": self._p95_ms(api_name),
+                "hedges_today": self.hedges_today(api_name),
             }
+            if api_name in self.quotas:
+                status[api_name]["quota"] = self.quotas[api_name].status()
 
         status["waqi"] = {
             "name": "World Air Quality Index",
             "has_key": bool(self.waqi_api_key),
             "purpose": "Air Quality",
+            "circuit": self.breakers["waqi"].status(),
+        }
+        status["open_meteo_aqi"] = {
+            "name": "Open-Meteo Air Quality",
+            "has_key": True,
+            "purpose": "Air Quality (fallback)",
+            "circuit": self.breakers["open_meteo_aqi"].status(),
         }
 
         return status
 
+    def _p95_ms(self, provider):
+        p95 = self.latency_percentile(provider, 95)
+        return round(p95 * 1000) if p95 is not None else None
+
 
 # Singleton instance
 weather_service = WeatherAPIService()
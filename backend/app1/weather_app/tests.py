@@ -1,3 +1,804 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime, timezone
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from app1.cache_utils import refresh_cached
+
+from .management.commands.normalize_benchmark import (
+    FIXTURES_DIR,
+    rowwise_open_meteo,
+    rowwise_open_meteo_aqi,
+)
+from .normalization import (
+    build_time_index,
+    closest_row,
+    columns_to_rows,
+    index_series,
+    normalize_open_meteo,
+    normalize_open_meteo_aqi,
+    to_columnar_layout,
+    to_row_layout,
+)
+from .autocomplete import AutocompleteCache
+from .geocoding import GeocodeStore, normalize_query
+from .grid import distance_km, snap, surrounding_cells
+from .models import GeocodeEntry
+from .prefetch import Target, WeatherPrefetcher, record_access
+from .services import WeatherAPIService, weather_service
+from .tiles import TileFetchError, TileStore, tile_store
+from .timezones import build_index, get_index, reset_index, resolve_timezone
+from .proxy_views import WeatherTileProxyView
+from .views import BatchWeatherView, WeatherView
+
+
+class ProviderResilienceTests(SimpleTestCase):
+    """Tests for negative caching, circuit breakers and quotas around providers."""
+    
+    def setUp(self):
+        cache.clear()
+        self.service = WeatherAPIService()
+        self.calls = 0
+    
+    def _failing_fetch(self, lat, lng):
+        self.calls += 1
+        raise ConnectionError("upstream down")
+    
+    def test_failed_lookup_is_negatively_cached(self):
+        """Test a failed (coordinate, provider) lookup is not retried immediately."""
+        self.assertIsNone(self.service._call_provider("open_meteo", self._failing_fetch, 40.7128, -74.006))
+        self.assertIsNone(self.service._call_provider("open_meteo", self._failing_fetch, 40.7128, -74.006))
+        
+        self.assertEqual(self.calls, 1)
+    
+    def test_exhausted_quota_skips_provider(self):
+        """Test a provider is not called once its daily quota is used."""
+        self.service.apis["tomorrow_io"]["api_key"] = "test"
+        self.service.quotas["tomorrow_io"].exhaust()
+        
+        self.assertIsNone(self.service._call_provider("tomorrow_io", self._failing_fetch, 40.7128, -74.006))
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(self.service.get_api_status()["tomorrow_io"]["quota"]["remaining"], 0)
+    
+    def test_open_circuit_skips_other_coordinates(self):
+        """Test repeated failures open the provider's circuit for all locations."""
+        for lat in (10.0, 20.0, 30.0):
+            self.service._call_provider("open_meteo", self._failing_fetch, lat, 0.0)
+        
+        self.service._call_provider("open_meteo", self._failing_fetch, 50.0, 0.0)
+        
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(self.service.get_api_status()["open_meteo"]["circuit"]["state"], "open")
+
+
+class HedgedRequestTests(SimpleTestCase):
+    """Tests for hedging slow weather providers."""
+    
+    def setUp(self):
+        cache.clear()
+        self.service = WeatherAPIService()
+        self.service.apis["tomorrow_io"]["api_key"] = "test"
+        self.service.hedge.update({"ENABLED": True, "DEFAULT_DELAY": 0.05})
+        self.service.fetch_open_meteo = lambda lat, lng: time.sleep(0.5) or {"current": {"temp": 1}}
+        self.service.fetch_tomorrow_io = lambda lat, lng: {"current": {"temp": 2}}
+    
+    def test_slow_primary_is_hedged(self):
+        """Test a slow primary is raced against the next provider."""
+        data = self.service.get_weather_data(1.234, 5.678)
+        
+        self.assertEqual(data["source"], "Tomorrow.io")
+        self.assertEqual(self.service.hedges_today("tomorrow_io"), 1)
+    
+    def test_exhausted_budget_is_not_hedged(self):
+        """Test quota-limited providers are not hedged once their budget is spent."""
+        self.service.hedge["BUDGET_FRACTION"] = 0
+        
+        data = self.service.get_weather_data(2.345, 6.789)
+        
+        self.assertEqual(data["source"], "Open-Meteo")
+        self.assertEqual(self.service.hedges_today("tomorrow_io"), 0)
+    
+    def test_delay_follows_recent_p95(self):
+        """Test the hedge delay tracks the provider's p95 latency within bounds."""
+        for ms in range(1, 101):
+            self.service._record_latency("open_meteo", ms / 100)
+        
+        self.assertEqual(self.service.hedge_delay("open_meteo", "tomorrow_io", 0, 0), 0.96)
+        self.service.hedge["MAX_DELAY"] = 0.5
+        self.assertEqual(self.service.hedge_delay("open_meteo", "tomorrow_io", 0, 0), 0.5)
+
+
+class NormalizationTests(SimpleTestCase):
+    """Tests for column-wise normalization of Open-Meteo responses."""
+    
+    def _fixture(self, name):
+        with open(FIXTURES_DIR / name) as f:
+            return json.load(f)
+    
+    def test_matches_rowwise_reference(self):
+        """Test recorded responses normalize exactly as the row-wise implementation did."""
+        forecast = self._fixture("open_meteo_forecast.json")
+        air_quality = self._fixture("open_meteo_air_quality.json")
+        
+        self.assertEqual(normalize_open_meteo(forecast), rowwise_open_meteo(forecast))
+        self.assertEqual(normalize_open_meteo_aqi(air_quality), rowwise_open_meteo_aqi(air_quality))
+    
+    def test_missing_and_short_columns_use_defaults(self):
+        """Test absent or truncated upstream columns are filled with the spec default."""
+        block = {"time": ["t0", "t1", "t2"], "weather_code": [0, 99], "temp": [1.5]}
+        specs = (("temperature", "temp", None), ("weather_code", "weather_code", 0), ("is_day", "is_day", 1))
+        
+        rows = columns_to_rows(block, specs, limit=2)
+        
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]["temperature"], None)
+        self.assertEqual(rows[1]["is_day"], 1)
+        self.assertEqual(rows[1]["weather_code"], "Thunderstorm with heavy hail")
+    
+    def test_layouts_round_trip(self):
+        """Test the columnar layout expands back to the original rows."""
+        weather = normalize_open_meteo(self._fixture("open_meteo_forecast.json"))
+        
+        columnar = to_columnar_layout(weather)
+        
+        self.assertEqual(columnar["hourly"]["time"], [row["time"] for row in weather["hourly"]])
+        self.assertEqual(to_row_layout(columnar), weather)
+
+
+class ColumnarFormatTests(SimpleTestCase):
+    """Tests for ?format=columnar on the weather endpoint."""
+    
+    def setUp(self):
+        cache.clear()
+        with open(FIXTURES_DIR / "open_meteo_forecast.json") as f:
+            self.weather = normalize_open_meteo(json.load(f))
+        self.lat, self.lng = 40.7128, -74.006
+        payload = {
+            "time_zone_data": {"time_zone": "America/New_York", "utc_offset": -18000},
+            "coordinates": {"lat": self.lat, "lng": self.lng},
+            "air_uv_data": None,
+            "weather_data": to_columnar_layout(self.weather),
+            "ui_meta": None,
+            "data_sources": {},
+        }
+        refresh_cached(WeatherView.combined_cache_key(self.lat, self.lng), lambda: payload, 60)
+    
+    def _get(self, **params):
+        request = APIRequestFactory().get("/api/weather/", {"lat": self.lat, "lon": self.lng, **params})
+        return WeatherView.as_view()(request)
+    
+    def test_columnar_format_returns_parallel_arrays(self):
+        """Test ?format=columnar returns series as arrays and is smaller."""
+        columnar = self._get(format="columnar")
+        rows = self._get()
+        
+        self.assertEqual(columnar.status_code, 200)
+        self.assertEqual(columnar.data["layout"], "columnar")
+        self.assertEqual(columnar.data["weather_data"]["daily"]["date"], [d["date"] for d in self.weather["daily"]])
+        self.assertLess(len(columnar.rendered_content), len(rows.rendered_content) / 2)
+    
+    def test_default_format_returns_rows(self):
+        """Test the default response keeps per-row dicts with UI meta computed."""
+        response = self._get()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["weather_data"]["hourly"], self.weather["hourly"])
+        self.assertNotIn("layout", response.data)
+        self.assertIsNotNone(response.data["ui_meta"]["heatbar"]["max"])
+
+
+class TimeIndexTests(SimpleTestCase):
+    """Tests for the precomputed time index used to recompute UI meta on cache hits."""
+    
+    def setUp(self):
+        with open(FIXTURES_DIR / "open_meteo_forecast.json") as f:
+            self.weather = to_columnar_layout(normalize_open_meteo(json.load(f)))
+    
+    def test_closest_row_matches_linear_scan(self):
+        """Test the bisect lookup picks the same row as a scan over parsed times."""
+        times = self.weather["hourly"]["time"]
+        epochs = [datetime.fromisoformat(t).replace(tzinfo=timezone.utc).timestamp() for t in times]
+        indexed = build_time_index(self.weather)["hourly"]
+        
+        for now in (epochs[0] - 7200, epochs[0], epochs[5] + 1799, epochs[5] + 1800, epochs[-1] + 60):
+            expected = min(range(len(epochs)), key=lambda i: abs(epochs[i] - now))
+            self.assertEqual(closest_row(indexed, now), expected)
+    
+    def test_unparseable_times_are_skipped(self):
+        """Test rows without a usable time are left out of the index."""
+        indexed = index_series([{"time": "garbage"}, {"timestamp": "2024-06-01 12:00"}, {"dt": 1717243200}])
+        
+        self.assertEqual(indexed["rows"], [1, 2])
+        self.assertEqual(closest_row(indexed, 1717243200), 1)
+        self.assertIsNone(closest_row(index_series([]), 0))
+    
+    def test_cached_index_drives_ui_meta_and_is_not_returned(self):
+        """Test a cache hit uses the stored index (sunrise/sunset included) and strips it."""
+        cache.clear()
+        lat, lng = 51.5, -0.12
+        hourly = {**self.weather["hourly"], "is_day": [None] * len(self.weather["hourly"]["time"])}
+        weather = {**self.weather, "hourly": hourly}
+        now = time.time()
+        time_index = {
+            "hourly": {"epochs": [now], "rows": [3]},
+            "minutely_15": {"epochs": [], "rows": []},
+            "sunrise": now - 3600,
+            "sunset": now - 60,
+        }
+        payload = {
+            "weather_data": weather,
+            "time_zone_data": None,
+            "ui_meta": None,
+            "time_index": time_index,
+            "data_sources": {},
+        }
+        refresh_cached(WeatherView.combined_cache_key(lat, lng), lambda: payload, 60)
+        
+        request = APIRequestFactory().get("/api/weather/", {"lat": lat, "lon": lng})
+        response = WeatherView.as_view()(request)
+        
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertNotIn("time_index", response.data)
+        self.assertEqual(response.data["ui_meta"]["current_condition"], hourly["weather_code"][3])
+        self.assertEqual(response.data["ui_meta"]["is_day"], 0)
+
+
+class GridSnappingTests(SimpleTestCase):
+    """Tests for sharing weather cache entries across a coordinate grid."""
+    
+    def setUp(self):
+        cache.clear()
+        self.service = WeatherAPIService()
+        self.calls = []
+        self.service.fetch_open_meteo = lambda lat, lng: self.calls.append((lat, lng)) or {
+            "hourly": [{"time": "2025-01-15T00:00", "temperature": 30.0}],
+        }
+    
+    def test_cells_match_configured_size(self):
+        """Test nearby points share a cell and adjacent cell centres are ~2km apart."""
+        cell = snap(40.7128, -74.0060, "forecast")
+        
+        self.assertEqual(snap(40.7131, -74.0057, "forecast"), snap(cell.lat, cell.lng, "forecast"))
+        neighbours = surrounding_cells(40.7128, -74.0060, "forecast")
+        self.assertEqual(len(neighbours), 4)
+        self.assertAlmostEqual(distance_km(cell.lat, cell.lng, neighbours[1].lat, neighbours[1].lng), 2.0, delta=0.05)
+        self.assertAlmostEqual(distance_km(cell.lat, cell.lng, neighbours[2].lat, neighbours[2].lng), 2.0, delta=0.1)
+    
+    def test_same_cell_shares_upstream_call(self):
+        """Test requests within one cell are fetched once, at the cell centre."""
+        cell = snap(40.7128, -74.0060, "forecast")
+        self.service.get_weather_data(cell.lat + 0.002, cell.lng - 0.002)
+        self.service.get_weather_data(cell.lat - 0.002, cell.lng + 0.002)
+        
+        self.assertEqual(self.calls, [(cell.lat, cell.lng)])
+    
+    @override_settings(WEATHER_GRID_INTERPOLATE=True)
+    def test_cold_cell_interpolated_from_neighbours(self):
+        """Test a cold cell is blended from cached neighbours and then fetched in the background."""
+        lat, lng = 34.0522, -118.2437
+        for cell, temperature in zip(surrounding_cells(lat, lng, "forecast")[1:3], (10.0, 20.0)):
+            cache.set(
+                self.service.grid_cache_key("weather", cell.lat, cell.lng, "forecast"),
+                {"hourly": [{"time": "2025-01-15T00:00", "temperature": temperature}]},
+                60,
+            )
+        
+        data = self.service.get_weather_data(lat, lng)
+        
+        self.assertTrue(data["interpolated"])
+        self.assertTrue(10.0 < data["hourly"][0]["temperature"] < 20.0)
+        cell = snap(lat, lng, "forecast")
+        key = self.service.grid_cache_key("weather", lat, lng, "forecast")
+        deadline = time.time() + 2
+        while time.time() < deadline and cache.get(key) is None:
+            time.sleep(0.01)
+        self.assertEqual(self.calls, [(cell.lat, cell.lng)])
+        self.assertNotIn("interpolated", self.service.get_weather_data(lat, lng))
+
+
+def _square(min_lng, min_lat, max_lng, max_lat):
+    return [[min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat]]
+
+
+class OfflineTimezoneTests(SimpleTestCase):
+    """Tests for resolving timezones from the packed boundary index."""
+    
+    def setUp(self):
+        cache.clear()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "timezones.idx")
+        build_index([
+            {
+                "properties": {"tzid": "America/New_York"},
+                "geometry": {
+                    "type": "Polygon",
+                    # A lake-sized hole around (40.5, -75.5)
+                    "coordinates": [_square(-80, 38, -72, 44), _square(-76, 40, -75, 41)],
+                },
+            },
+            {
+                "properties": {"tzid": "America/Chicago"},
+                "geometry": {"type": "MultiPolygon", "coordinates": [[_square(-90, 38, -80, 44)]]},
+            },
+        ], self.path)
+        settings_override = override_settings(TIMEZONE_INDEX_PATH=self.path)
+        settings_override.enable()
+        reset_index()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(reset_index)
+        self.addCleanup(settings_override.disable)
+    
+    def test_lookup_resolves_zone_and_offset(self):
+        """Test points resolve to their polygon's zone with the offset at a given time."""
+        winter = datetime(2025, 1, 15, 12, tzinfo=timezone.utc)
+        summer = datetime(2025, 7, 15, 12, tzinfo=timezone.utc)
+        
+        self.assertEqual(resolve_timezone(40.7128, -74.0060, winter)["time_zone"], "America/New_York")
+        self.assertEqual(resolve_timezone(40.7128, -74.0060, winter)["utc_offset"], -5 * 3600)
+        self.assertEqual(resolve_timezone(40.7128, -74.0060, summer)["utc_offset"], -4 * 3600)
+        self.assertEqual(resolve_timezone(41.8781, -87.6298, winter)["time_zone"], "America/Chicago")
+        # Fully covered cells are answered without point-in-polygon tests
+        self.assertEqual(get_index().lookup(42.5, -78.5), "America/New_York")
+    
+    def test_holes_and_open_sea_fall_back_to_nautical_zones(self):
+        """Test points in a hole or outside every polygon get the Etc/GMT zone."""
+        index = get_index()
+        
+        self.assertEqual(index.lookup(40.5, -75.5), "Etc/GMT+5")
+        self.assertEqual(index.lookup(0.0, 0.0), "Etc/GMT")
+        self.assertEqual(index.lookup(-33.9, 151.2), "Etc/GMT-10")
+    
+    def test_weather_view_skips_google_when_indexed(self):
+        """Test the view resolves the timezone without the Google API when an index exists."""
+        data = WeatherView().get_time_zone(40.7128, -74.0060)
+        
+        self.assertEqual(data["time_zone"], "America/New_York")
+        self.assertEqual(data["source"], "offline")
+        
+        with override_settings(TIMEZONE_INDEX_PATH=os.path.join(self.tmpdir.name, "missing.idx")):
+            reset_index()
+            self.assertIsNone(resolve_timezone(40.7128, -74.0060))
+    
+    def test_command_builds_index_from_zipped_release(self):
+        """Test build_timezone_index streams the features out of a zipped GeoJSON release."""
+        source = os.path.join(self.tmpdir.name, "timezones.geojson.zip")
+        with zipfile.ZipFile(source, "w") as archive:
+            archive.writestr("combined.json", json.dumps({"type": "FeatureCollection", "features": [{
+                "type": "Feature",
+                "properties": {"tzid": "Europe/Paris"},
+                "geometry": {"type": "Polygon", "coordinates": [_square(-5, 42, 8, 51)]},
+            }]}))
+        
+        call_command("build_timezone_index", source=source, stdout=StringIO())
+        
+        self.assertEqual(get_index().lookup(48.8566, 2.3522), "Europe/Paris")
+
+
+class GeocodeStoreTests(TestCase):
+    """Tests for the persistent geocode table and its in-process LRU."""
+    
+    def setUp(self):
+        self.store = GeocodeStore(max_entries=2)
+    
+    def test_normalize_query_folds_case_and_punctuation(self):
+        """Test near-duplicate spellings normalize to one key."""
+        self.assertEqual(normalize_query("  New-York,NY "), "new york ny")
+        self.assertEqual(normalize_query("NEW YORK   ny."), "new york ny")
+        self.assertEqual(normalize_query("Zürich"), "zürich")
+    
+    def test_put_persists_and_survives_lru_eviction(self):
+        """Test stored geocodes are served from memory, and from the table once evicted."""
+        self.store.put("New York, NY", 40.7128, -74.006, "place-ny", "New York, NY, USA")
+        self.store.put("Boston", 42.3601, -71.0589, "place-bos")
+        self.store.put("Chicago", 41.8781, -87.6298, "place-chi")
+        
+        self.assertEqual(GeocodeEntry.objects.get(query="new york ny").place_id, "place-ny")
+        self.assertEqual(self.store.get("new york ny"), {"lat": 40.7128, "lng": -74.006})
+        self.assertEqual(self.store.stats["db_hits"], 1)
+        self.assertEqual(self.store.get("NEW YORK, NY"), {"lat": 40.7128, "lng": -74.006})
+        self.assertEqual(self.store.stats["memory_hits"], 1)
+    
+    def test_ambiguous_prefix_is_not_answered(self):
+        """Test a prefix of stored queries is a miss, from memory and from the table."""
+        for street in range(8):
+            GeocodeEntry.objects.create(
+                query=f"springfield il {street} main st", latitude=39.7817, longitude=-89.6501, place_id="place-il"
+            )
+        GeocodeEntry.objects.create(query="springfield ma", latitude=42.1015, longitude=-72.5898, place_id="place-ma")
+        self.store.put("Paris, TX", 33.6609, -95.5555, "place-paris-tx")
+        self.store.put("Springfield, IL 0 Main St", 39.7817, -89.6501, "place-il")
+        
+        self.assertIsNone(self.store.get("spri"))
+        self.assertIsNone(GeocodeStore().get("spri"))
+        self.assertIsNone(self.store.get("paris"))
+        self.assertEqual(self.store.get("springfield ma"), {"lat": 42.1015, "lng": -72.5898})
+    
+    def test_weather_view_geocodes_once(self):
+        """Test the view only calls Google for locations the store doesn't know."""
+        GeocodeEntry.objects.create(query="paris", latitude=48.8566, longitude=2.3522)
+        
+        self.assertEqual(WeatherView().get_coordinates("Paris!"), {"lat": 48.8566, "lng": 2.3522})
+
+
+class AutocompleteCacheTests(SimpleTestCase):
+    """Tests for the place autocomplete prefix trie."""
+    
+    def setUp(self):
+        cache.clear()
+        self.cache = AutocompleteCache(ttl=60, max_entries=100, bias_km=25)
+        self.calls = []
+    
+    def fetcher(self, results):
+        def fetch():
+            self.calls.append(results)
+            return results
+        return fetch
+    
+    def get(self, query, results, bucket=None, limit=5):
+        return self.cache.get_or_fetch(
+            "test", query, self.fetcher(results), limit=limit,
+            match=lambda item: item["name"], bucket=bucket or self.cache.bias_bucket(None, None),
+        )
+    
+    def test_complete_prefix_answers_longer_queries(self):
+        """Test a complete short-prefix result is filtered locally for longer prefixes."""
+        places = [{"name": "Houston, TX"}, {"name": "Houghton, MI"}, {"name": "Hounslow, London"}]
+        self.get("hou", places)
+        
+        self.assertEqual(self.get("Hous", []), [{"name": "Houston, TX"}])
+        self.assertEqual(self.get("houn ", []), [{"name": "Hounslow, London"}])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.cache.stats["filtered"], 2)
+    
+    def test_truncated_prefix_goes_upstream(self):
+        """Test a result that filled the limit is not used for longer prefixes."""
+        self.get("spr", [{"name": "Springfield"}, {"name": "Spring"}], limit=2)
+        self.get("spri", [{"name": "Springfield"}], limit=2)
+        
+        self.assertEqual(len(self.calls), 2)
+    
+    def test_envelope_fields_pass_through(self):
+        """Test upstream fields around the cached list are returned unchanged, also for filtered answers."""
+        body = {
+            "type": "FeatureCollection",
+            "query": ["hou"],
+            "features": [{"place_name": "Houston, Texas"}, {"place_name": "Hounslow, London"}],
+            "attribution": "NOTICE: © 2025 Mapbox and its suppliers.",
+        }
+        
+        def get(query):
+            return self.cache.get_or_fetch_envelope(
+                "mapbox:5", query, self.fetcher(body), items_key="features", limit=5,
+                match=lambda feature: feature["place_name"],
+            )
+        
+        self.assertEqual(get("hou"), body)
+        self.assertEqual(get("hous"), {**body, "features": [{"place_name": "Houston, Texas"}]})
+        self.assertEqual(len(self.calls), 1)
+    
+    def test_bias_buckets_are_coarse(self):
+        """Test nearby biases share entries and distant biases don't."""
+        houston = self.cache.bias_bucket(29.7604, -95.3698)
+        
+        self.assertEqual(self.cache.bias_bucket("29.7610", "-95.3690"), houston)
+        self.assertNotEqual(self.cache.bias_bucket(32.7767, -96.7970), houston)
+        self.get("main st", [{"name": "Main St, Houston"}], bucket=houston)
+        self.get("main st", [{"name": "Main St, Dallas"}], bucket=self.cache.bias_bucket(32.7767, -96.7970))
+        self.assertEqual(len(self.calls), 2)
+    
+    def test_identical_inflight_queries_coalesce(self):
+        """Test concurrent identical queries share one upstream call."""
+        barrier = threading.Barrier(4)
+        
+        def fetch():
+            self.calls.append("fetch")
+            time.sleep(0.2)
+            return [{"name": "Paris"}]
+        
+        def search():
+            barrier.wait()
+            results.append(self.cache.get_or_fetch("test", "par", fetch, limit=5, match=lambda i: i["name"]))
+        
+        results = []
+        threads = [threading.Thread(target=search) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(self.calls, ["fetch"])
+        self.assertEqual(results, [[{"name": "Paris"}]] * 4)
+
+
+class WeatherPrefetchTests(SimpleTestCase):
+    """Tests for the saved-location weather prefetch scheduler."""
+    
+    def setUp(self):
+        cache.clear()
+        self.prefetcher = WeatherPrefetcher(workers=2)
+        self.targets = {
+            name: Target(lat, lng, snap(lat, lng, "forecast").key, WeatherView.combined_cache_key(lat, lng))
+            for name, (lat, lng) in {
+                "houston": (29.7604, -95.3698),
+                "austin": (30.2672, -97.7431),
+                "dallas": (32.7767, -96.7970),
+            }.items()
+        }
+        self.prefetcher.targets = {t.cell: t for t in self.targets.values()}
+        self.prefetcher.load_targets = lambda: len(self.prefetcher.targets)
+    
+    def test_queue_orders_by_expiry_then_recent_access(self):
+        """Test due targets pop soonest-expiring first, recently requested first on ties."""
+        now = time.time()
+        self.prefetcher.schedule(self.targets["houston"], due=now - 10, last_access=now - 60)
+        self.prefetcher.schedule(self.targets["austin"], due=now - 10, last_access=now - 5)
+        self.prefetcher.schedule(self.targets["dallas"], due=now - 30)
+        self.prefetcher.schedule(self.targets["houston"], due=now - 5, last_access=now - 60)
+        
+        self.assertEqual(
+            [t.cell for t in self.prefetcher.pop_due(now)],
+            [self.targets[name].cell for name in ("dallas", "austin", "houston")],
+        )
+        self.assertIsNone(self.prefetcher.next_due())
+    
+    def test_recently_requested_cells_refresh_earlier(self):
+        """Test cells requested within the access window get the full refresh lead."""
+        now = time.time()
+        expires_at = now + 600
+        lead = self.prefetcher.ttl * self.prefetcher.config["LEAD_FRACTION"]
+        record_access(29.7604, -95.3698)
+        
+        self.assertEqual(self.prefetcher.due_at(None, 0, now), now)
+        self.assertEqual(
+            self.prefetcher.due_at(expires_at, self.prefetcher.last_access(self.targets["houston"]), now),
+            expires_at - lead,
+        )
+        self.assertEqual(self.prefetcher.due_at(expires_at, 0, now), expires_at - lead / 2)
+    
+    def test_run_once_refreshes_due_targets_and_reschedules(self):
+        """Test a pass refreshes every due target on the pool and requeues it by its new expiry."""
+        refreshed = []
+        self.prefetcher.refresh = lambda target: refreshed.append(target.cell) or target.cell != self.targets["dallas"].cell
+        for target in self.targets.values():
+            self.prefetcher.schedule(target)
+        
+        stats = self.prefetcher.run_once()
+        
+        self.assertEqual(sorted(refreshed), sorted(t.cell for t in self.targets.values()))
+        self.assertEqual((stats["refreshed"], stats["failed"]), (2, 1))
+        self.assertEqual(self.prefetcher.pop_due(), [])
+        retry_at = self.prefetcher.next_due()
+        self.assertLess(retry_at, time.time() + self.prefetcher.ttl / 2)
+    
+    def test_cold_targets_deferred_while_fallbacks_spend_quota(self):
+        """Test only recently requested cells are refreshed while the primary provider is down."""
+        breaker = weather_service.breakers["open_meteo"]
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        self.addCleanup(cache.clear)
+        record_access(29.7604, -95.3698)
+        
+        self.assertTrue(self.prefetcher.quota_allows(self.targets["houston"], self.prefetcher.last_access(self.targets["houston"])))
+        self.assertFalse(self.prefetcher.quota_allows(self.targets["austin"], 0))
+        
+        weather_service.quotas["tomorrow_io"].exhaust()
+        self.assertFalse(self.prefetcher.quota_allows(self.targets["houston"], time.time()))
+
+
+class BatchWeatherTests(SimpleTestCase):
+    """Tests for fetching weather for many locations at once."""
+    
+    def setUp(self):
+        cache.clear()
+        self.service = WeatherAPIService()
+        self.batches, self.singles = [], []
+        self.service.fetch_open_meteo_many = lambda points: self.batches.append(points) or [
+            {"hourly": [{"time": "2025-01-15T00:00", "temperature": lat}]} for lat, _ in points
+        ]
+        self.service.fetch_open_meteo = lambda lat, lng: self.singles.append((lat, lng)) or {
+            "hourly": [{"time": "2025-01-15T00:00", "temperature": 0.0}],
+        }
+    
+    def test_missing_cells_fetched_in_one_request(self):
+        """Test cached cells are skipped and the rest share one multi-location request."""
+        houston = snap(29.7604, -95.3698, "forecast")
+        self.service.get_weather_data(houston.lat, houston.lng)
+        points = [(29.7604, -95.3698), (30.2672, -97.7431), (32.7767, -96.7970), (32.7768, -96.7971)]
+        
+        data = self.service.get_weather_data_many(points)
+        
+        self.assertEqual(len(self.singles), 1)
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0]), 2)
+        self.assertEqual(data[points[2]], data[points[3]])
+        self.assertEqual(data[points[1]]["source"], "Open-Meteo")
+        self.assertEqual(self.service.get_weather_data(*points[1]), data[points[1]])
+    
+    def test_unanswered_cells_fall_back_per_location(self):
+        """Test cells the batch request couldn't answer go through the regular chain."""
+        self.service.fetch_open_meteo_many = lambda points: self.batches.append(points) or [{}] * len(points)
+        
+        data = self.service.get_weather_data_many([(29.7604, -95.3698), (30.2672, -97.7431)])
+        
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.singles), 2)
+        self.assertTrue(all(value["hourly"] for value in data.values()))
+    
+    def test_cached_locations_answered_in_request_order(self):
+        """Test fresh payloads come from the cache in request order, with the caller's coordinates."""
+        points = [(40.7128, -74.006), (34.0522, -118.2437)]
+        for lat, lng in points:
+            refresh_cached(WeatherView.combined_cache_key(lat, lng), lambda lat=lat: {
+                "time_zone_data": None,
+                "weather_data": {"hourly": [{"time": "2025-01-15T00:00", "temperature": lat}]},
+                "ui_meta": None,
+            }, 60)
+        request = APIRequestFactory().post(
+            "/api/weather/batch/",
+            {"coordinates": [{"lat": lat, "lng": lng} for lat, lng in points]},
+            format="json",
+        )
+        
+        response = BatchWeatherView.as_view()(request)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["cache"] for r in response.data["results"]], ["HIT", "HIT"])
+        self.assertEqual(
+            [r["weather_data"]["hourly"][0]["temperature"] for r in response.data["results"]],
+            [40.7128, 34.0522],
+        )
+        self.assertEqual(response.data["results"][1]["coordinates"], {"lat": 34.0522, "lng": -118.2437})
+    
+    def test_expired_locations_served_stale_and_refreshed(self):
+        """Test an expired payload is served stale from the batch read and rebuilt in the background."""
+        lat, lng = 47.6062, -122.3321
+        key = WeatherView.combined_cache_key(lat, lng)
+        now = time.time()
+        cache.set(key, {"value": {"build": "old"}, "stored_at": now - 120, "expires_at": now - 60, "delta": 0}, 600)
+        builds = []
+        view = WeatherView()
+        view.COMBINED_STALE_TTL = 300
+        view._build_combined_data = lambda lat, lng, coordinates, errors: builds.append((lat, lng)) or {"build": "new"}
+        
+        payloads = BatchWeatherView()._combined_payloads(view, [(lat, lng)])
+        
+        self.assertEqual(payloads, {key: ({"build": "old"}, "STALE")})
+        deadline = time.time() + 2
+        while time.time() < deadline and cache.get(key)["value"] != {"build": "new"}:
+            time.sleep(0.01)
+        self.assertEqual(builds, [(lat, lng)])
+        self.assertEqual(cache.get(key)["value"], {"build": "new"})
+    
+    def test_rejects_empty_and_anonymous_saved_location_batches(self):
+        """Test a batch needs locations, and saved location IDs need a signed-in user."""
+        factory = APIRequestFactory()
+        
+        empty = BatchWeatherView.as_view()(factory.post("/api/weather/batch/", {}, format="json"))
+        anonymous = BatchWeatherView.as_view()(
+            factory.post("/api/weather/batch/", {"location_ids": [1]}, format="json")
+        )
+        
+        self.assertEqual(empty.status_code, 400)
+        self.assertEqual(anonymous.status_code, 401)
+
+
+class TileStoreTests(SimpleTestCase):
+    """Tests for the on-disk map tile store and the tile proxy endpoint."""
+    
+    def setUp(self):
+        cache.clear()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.fetched = []
+    
+    def _fetch(self, key, api_key):
+        self.fetched.append(key)
+        time.sleep(0.05)
+        return b"png:" + "/".join(map(str, key)).encode()
+    
+    def _store(self, **kwargs):
+        store = TileStore(directory=self.tmpdir.name, **kwargs)
+        store.fetch_upstream = self._fetch
+        return store
+    
+    def test_concurrent_requests_share_one_fetch(self):
+        """Test simultaneous misses for a tile make one upstream call, then hit."""
+        store = self._store()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(store.get("clouds_new", 3, 2, 5, "key")))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(self.fetched, [("clouds_new", 3, 2, 5)])
+        self.assertEqual(len({tile.etag for tile, _ in results}), 1)
+        self.assertEqual(store.get("clouds_new", 3, 2, 5, "key")[1], "HIT")
+        with open(results[0][0].path, "rb") as f:
+            self.assertEqual(f.read(), b"png:clouds_new/3/2/5")
+    
+    def test_least_recently_used_tiles_are_evicted(self):
+        """Test the disk store stays within max_bytes by dropping the oldest tiles."""
+        store = self._store(max_bytes=45)   # two 20-byte tiles fit
+        first, _ = store.get("temp_new", 1, 0, 0, "key")
+        store.get("temp_new", 1, 0, 1, "key")
+        store.get("temp_new", 1, 0, 0, "key")   # first is now the most recent
+        store.get("temp_new", 1, 1, 1, "key")
+        
+        self.assertTrue(os.path.exists(first.path))
+        self.assertFalse(os.path.exists(store.path(("temp_new", 1, 0, 1))))
+        self.assertLessEqual(store.status()["disk_bytes"], 45)
+    
+    def test_rescan_orders_by_touched_access_time_and_drops_temp_files(self):
+        """Test a rescan keeps hit tiles (by explicit access time) and removes orphaned .tmp files."""
+        store = self._store(max_bytes=45)
+        old, _ = store.get("temp_new", 1, 0, 0, "key")
+        store.get("temp_new", 1, 0, 1, "key")
+        os.utime(old.path, (time.time() - 3600, old.fetched_at))
+        orphan = os.path.join(os.path.dirname(old.path), "tmpabc.tmp")
+        with open(orphan, "wb") as f:
+            f.write(b"partial")
+        os.utime(orphan, (time.time() - 3600, time.time() - 3600))
+        
+        fresh = self._store(max_bytes=45)   # a new worker indexes the directory
+        fresh.get("temp_new", 1, 0, 1, "key")
+        fresh._scan()
+        fresh.get("temp_new", 1, 1, 1, "key")
+        
+        self.assertFalse(os.path.exists(orphan))
+        self.assertFalse(os.path.exists(old.path))
+        self.assertTrue(os.path.exists(fresh.path(("temp_new", 1, 0, 1))))
+    
+    def test_expired_tile_served_stale_when_refetch_fails(self):
+        """Test an expired tile is still served if upstream is failing."""
+        store = self._store(layer_ttl={"wind_new": 1})
+        store.get("wind_new", 0, 0, 0, "key")
+        time.sleep(1.1)
+        
+        def failing(key, api_key):
+            raise TileFetchError(502)
+        store.fetch_upstream = failing
+        
+        tile, state = store.get("wind_new", 0, 0, 0, "key")
+        self.assertEqual(state, "STALE")
+        self.assertTrue(os.path.exists(tile.path))
+    
+    @override_settings(OPENWEATHER_API_KEY="test")
+    def test_proxy_streams_tiles_with_etags(self):
+        """Test the endpoint streams the tile, answers revalidation with 304 and rejects bad tiles."""
+        tile_store.clear()
+        directory = tile_store.directory
+        tile_store.directory = self.tmpdir.name
+        tile_store.fetch_upstream = self._fetch
+        self.addCleanup(tile_store.clear)
+        self.addCleanup(setattr, tile_store, "directory", directory)
+        self.addCleanup(delattr, tile_store, "fetch_upstream")
+        view = WeatherTileProxyView.as_view()
+        factory = APIRequestFactory()
+        
+        response = view(factory.get("/api/proxy/tiles/precipitation_new/2/1/3.png"), layer="precipitation_new", z=2, x=1, y=3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(b"".join(response.streaming_content), b"png:precipitation_new/2/1/3")
+        response.close()
+        
+        request = factory.get("/api/proxy/tiles/precipitation_new/2/1/3.png", HTTP_IF_NONE_MATCH=response["ETag"])
+        revalidated = view(request, layer="precipitation_new", z=2, x=1, y=3)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated["X-Cache"], "HIT")
+        
+        self.assertEqual(view(factory.get("/"), layer="precipitation_new", z=2, x=4, y=0).status_code, 404)
+        self.assertEqual(view(factory.get("/"), layer="secret_layer", z=2, x=1, y=3).status_code, 404)
+        self.assertEqual(len(self.fetched), 1)
@@ -0,0 +1,409 @@
+"""
+Weather Map Tile Store
+
+OpenWeatherMap map layers (precipitation, temperature, clouds, ...) are served
+through /api/proxy/tiles/<layer>/<z>/<x>/<y>.png, so the API key stays on the
+server and every user panning over the same area shares one upstream fetch.
+
+Tiles are kept on disk under settings.WEATHER_TILES "DIR" as <layer>/<z>/<x>/<y>.png
+and are fresh for their layer's TTL (counted from the file's mtime). The store is
+a size-bounded LRU: each worker tracks file sizes in recency order and deletes the
+least recently used tiles once MAX_BYTES is exceeded. Hits set the file's access
+time explicitly with os.utime (so recency survives noatime/relatime mounts), and
+every RESCAN_INTERVAL a background thread rebuilds the index from the directory
+in access-time order, picking up other workers' writes and removing temp files
+left by interrupted writes.
+
+In front of the disk sits a small per-process index of hot tiles (path, size,
+ETag, mtime), so a hit costs no stat or hashing; the bytes themselves are
+streamed from the file by FileResponse (sendfile where the server supports it).
+ETags are content hashes, so a refetched tile that did not change still matches.
+
+Concurrent fetches of the same tile coalesce: threads in a worker wait for one
+leader, and workers wait on a short lock in the shared cache. A tile whose
+refetch fails is served stale rather than not at all.
+
+Usage:
+    tile, state = tile_store.get("precipitation_new", 3, 2, 5, api_key)
+    response = FileResponse(tile_store.open(tile, api_key), content_type="image/png")
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from app1.http_client import http_get
+
+logger = logging.getLogger(__name__)
+
+TILE_URL = "https://tile.openweathermap.org/map/{layer}/{z}/{x}/{y}.png"
+
+DEFAULT_TILE_SETTINGS = {
+    "DIR": os.path.join(tempfile.gettempdir(), "weather_tiles"),
+    "MAX_BYTES": 512 * 1024 * 1024,
+    "HOT_ENTRIES": 2048,
+    "MAX_ZOOM": 18,
+    # Seconds a tile is fresh, per layer; only these layers are proxied
+    "LAYER_TTL": {
+        "precipitation_new": 600,
+        "clouds_new": 900,
+        "temp_new": 1800,
+        "pressure_new": 1800,
+        "wind_new": 1800,
+    },
+}
+
+RESCAN_INTERVAL = 300    # seconds between re-reading the directory (other workers write too)
+TOUCH_INTERVAL = 60      # at most one access-time update per tile per worker this often
+STALE_TMP_AGE = 300      # seconds after which a leftover .tmp file is an interrupted write
+LOCK_KEY_PREFIX = "tilelock"
+LOCK_TTL = 15            # upper bound on one upstream fetch holding the lock
+FETCH_WAIT = 10.0        # how long a follower waits for the leader's tile
+FETCH_POLL = 0.05
+
+TileKey = Tuple[str, int, int, int]
+
+
+class TileFetchError(Exception):
+    """Upstream didn't return a tile; status_code is what the proxy should answer."""
+
+    def __init__(self, status_code, message=""):
+        super().__init__(message or f"tile upstream returned {status_code}")
+        self.status_code = status_code
+
+
+class Tile(NamedTuple):
+    path: str
+    size: int
+    etag: str            # quoted content hash
+    fetched_at: float    # file mtime
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+
+class TileStore:
+    """Size-bounded on-disk LRU of map tiles with per-layer TTLs and a hot in-memory index."""
+
+    def __init__(self, directory=None, max_bytes=None, hot_entries=None, layer_ttl=None):
+        config = {**DEFAULT_TILE_SETTINGS, **getattr(settings, "WEATHER_TILES", {})}
+        self.directory = str(directory or config["DIR"])
+        self.max_bytes = max_bytes or config["MAX_BYTES"]
+        self.hot_entries = hot_entries or config["HOT_ENTRIES"]
+        self.max_zoom = config["MAX_ZOOM"]
+        self.layer_ttl = layer_ttl or config["LAYER_TTL"]
+
+        self._hot = OrderedDict()     # key -> (Tile, last access-time update), least recent first
+        self._disk = OrderedDict()    # key -> size of every tile on disk, least recent first
+        self._bytes = 0
+        self._scanned_at = None
+        self._scanning = False
+        self._recorded_during_scan = []
+        self._lock = threading.Lock()
+        self._inflight = {}           # key -> Event of the thread fetching it
+        self._inflight_lock = threading.Lock()
+        self.stats = {"hot_hits": 0, "disk_hits": 0, "fetches": 0, "coalesced": 0, "stale": 0, "evicted": 0}
+
+    # ---------- Keys ----------
+
+    def valid(self, layer, z, x, y) -> bool:
+        """Whether (layer, z, x, y) names a proxied tile."""
+        return layer in self.layer_ttl and 0 <= z <= self.max_zoom and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+    def path(self, key: TileKey) -> str:
+        layer, z, x, y = key
+        return os.path.join(self.directory, layer, str(z), str(x), f"{y}.png")
+
+    def _key_from_path(self, path) -> Optional[TileKey]:
+        parts = os.path.relpath(path, self.directory).split(os.sep)
+        if len(parts) != 4 or not parts[3].endswith(".png"):
+            return None
+        try:
+            return parts[0], int(parts[1]), int(parts[2]), int(parts[3][:-4])
+        except ValueError:
+            return None
+
+    # ---------- Disk LRU ----------
+
+    def _scan(self) -> None:
+        """Rebuild the size/recency index from the directory (oldest access first)."""
+        found = []
+        now = time.time()
+        try:
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                        if name.endswith(".tmp"):
+                            if now - st.st_mtime > STALE_TMP_AGE:
+                                os.remove(path)   # left behind by an interrupted write
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    key = self._key_from_path(path)
+                    if key is not None:
+                        found.append((st.st_atime, key, st.st_size))
+        except OSError as e:
+            logger.warning(f"Tile store scan of {self.directory} failed: {e}")
+        found.sort()
+        with self._lock:
+            disk = OrderedDict((key, size) for _, key, size in found)
+            # Tiles written or used while walking are the most recent
+            for key in self._recorded_during_scan:
+                if key in self._disk:
+                    disk[key] = self._disk[key]
+                    disk.move_to_end(key)
+            self._disk = disk
+            self._bytes = sum(disk.values())
+            self._recorded_during_scan = []
+            self._scanning = False
+            self._scanned_at = time.monotonic()
+        self._evict()   # other workers' tiles may have pushed the directory over budget
+
+    def _maybe_scan(self) -> None:
+        """Start a background rescan when one is due and none is running."""
+        if self._scanned_at is not None and time.monotonic() - self._scanned_at <= RESCAN_INTERVAL:
+            return
+        with self._lock:
+            if self._scanning:
+                return
+            self._scanning = True
+            self._recorded_during_scan = []
+        threading.Thread(target=self._scan, name="tile-store-scan", daemon=True).start()
+
+    def _record(self, key, size) -> None:
+        """Note a tile was written or used, then evict least recently used tiles over budget."""
+        with self._lock:
+            self._bytes += size - self._disk.pop(key, 0)
+            self._disk[key] = size
+            if self._scanning:
+                self._recorded_during_scan.append(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            victims = []
+            while self._bytes > self.max_bytes and len(self._disk) > 1:
+                victim, victim_size = self._disk.popitem(last=False)
+                self._bytes -= victim_size
+                self._hot.pop(victim, None)
+                victims.append(victim)
+        for victim in victims:
+            try:
+                os.remove(self.path(victim))
+            except FileNotFoundError:
+                pass
+            self.stats["evicted"] += 1
+
+    def _forget(self, key) -> None:
+        with self._lock:
+            self._bytes -= self._disk.pop(key, 0)
+            self._hot.pop(key, None)
+
+    # ---------- Lookup ----------
+
+    def _tile(self, key, path, size, mtime, content) -> Tile:
+        etag = f'"{hashlib.md5(content).hexdigest()}"'
+        return Tile(path, size, etag, mtime, mtime + self.layer_ttl[key[0]])
+
+    def _remember(self, key, tile) -> None:
+        with self._lock:
+            self._hot[key] = (tile, time.monotonic())
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.hot_entries:
+                self._hot.popitem(last=False)
+
+    def _load(self, key) -> Optional[Tile]:
+        """The tile on disk (hashed once, then kept in the hot index), or None."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+        tile = self._tile(key, path, len(content), mtime, content)
+        self._remember(key, tile)
+        self._record(key, tile.size)
+        return tile
+
+    def _touch(self, key, tile) -> bool:
+        """Set the tile's access time (it orders the LRU for other workers and after restarts)."""
+        try:
+            os.utime(tile.path, (time.time(), tile.fetched_at))
+        except FileNotFoundError:
+            self._forget(key)   # evicted by another worker
+            return False
+        return True
+
+    def _lookup(self, key) -> Optional[Tile]:
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry is not None:
+                self._hot.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+        if entry is None:
+            tile = self._load(key)
+            if tile is None or not self._touch(key, tile):
+                return None
+            self.stats["disk_hits"] += 1
+            return tile
+
+        tile, touched = entry
+        self.stats["hot_hits"] += 1
+        if time.monotonic() - touched > TOUCH_INTERVAL:
+            if not self._touch(key, tile):
+                return None
+            self._remember(key, tile)
+        return tile
+
+    # ---------- Fetching ----------
+
+    def fetch_upstream(self, key, api_key) -> bytes:
+        """PNG bytes of a tile from OpenWeatherMap."""
+        layer, z, x, y = key
+        try:
+            response = http_get(TILE_URL.format(layer=layer, z=z, x=x, y=y), params={"appid": api_key}, timeout=10)
+        except requests.exceptions.Timeout:
+            raise TileFetchError(504, "tile upstream timed out")
+        except requests.exceptions.RequestException as e:
+            raise TileFetchError(502, f"tile upstream unreachable: {e}")
+        if response.status_code == 429:
+            raise TileFetchError(429)
+        if response.status_code != 200 or not response.content:
+            raise TileFetchError(404 if response.status_code == 404 else 502)
+        return response.content
+
+    def _download(self, key, api_key) -> Tile:
+        self.stats["fetches"] += 1
+        content = self.fetch_upstream(key, api_key)
+
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)   # readers see the old tile or the new one, never half
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+        tile = self._tile(key, path, len(content), os.stat(path).st_mtime, content)
+        self._remember(key, tile)
+        self._record(key, tile.size)
+        return tile
+
+    def _wait_for_fresh(self, key, deadline) -> Optional[Tile]:
+        """Poll the disk until another worker's fetch lands a fresh tile, or deadline."""
+        while time.monotonic() < deadline:
+            time.sleep(FETCH_POLL)
+            tile = self._load(key)
+            if tile is not None and tile.fresh:
+                return tile
+        return None
+
+    def _fetch(self, key, api_key) -> Tile:
+        """Fetch a tile upstream, sharing one fetch among concurrent callers."""
+        with self._inflight_lock:
+            event = self._inflight.get(key)
+            is_leader = event is None
+            if is_leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not is_leader:
+            event.wait(FETCH_WAIT)
+            tile = self._lookup(key)
+            if tile is not None and tile.fresh:
+                self.stats["coalesced"] += 1
+                return tile
+            raise TileFetchError(504, "timed out waiting for a coalesced tile fetch")
+
+        lock_key = f"{LOCK_KEY_PREFIX}:{'/'.join(map(str, key))}"
+        locked = False
+        try:
+            locked = cache.add(lock_key, 1, LOCK_TTL)
+            if not locked:
+                tile = self._wait_for_fresh(key, time.monotonic() + FETCH_WAIT)
+                if tile is not None:
+                    self.stats["coalesced"] += 1
+                    return tile
+            return self._download(key, api_key)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    # ---------- Public ----------
+
+    def get(self, layer, z, x, y, api_key) -> Tuple[Tile, str]:
+        """
+        A fresh tile, fetching it upstream when missing or expired.
+
+        Returns:
+            Tuple of (Tile, "HIT" | "MISS" | "STALE"); STALE when the refetch of
+            an expired tile failed
+
+        Raises:
+            TileFetchError: No tile on disk and upstream didn't return one
+        """
+        self._maybe_scan()
+        key = (layer, z, x, y)
+        tile = self._lookup(key)
+        if tile is not None and not tile.fresh:
+            tile = self._load(key)   # another worker may have refreshed it already
+        if tile is not None and tile.fresh:
+            return tile, "HIT"
+        try:
+            return self._fetch(key, api_key), "MISS"
+        except TileFetchError as e:
+            if tile is None:
+                raise
+            logger.warning(f"Serving stale tile {layer}/{z}/{x}/{y}: {e}")
+            self.stats["stale"] += 1
+            return tile, "STALE"
+
+    def open(self, tile, api_key):
+        """Open a tile for streaming, refetching it if another worker just evicted it."""
+        try:
+            return open(tile.path, "rb")
+        except FileNotFoundError:
+            key = self._key_from_path(tile.path)
+            self._forget(key)
+            return open(self._fetch(key, api_key).path, "rb")
+
+    def clear(self) -> None:
+        """Forget the in-process indexes (files are kept)."""
+        with self._lock:
+            self._hot.clear()
+            self._disk.clear()
+            self._bytes = 0
+            self._recorded_during_scan = []
+            self._scanned_at = None
+
+    def status(self) -> dict:
+        return {
+            "hot_entries": len(self._hot),
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            **self.stats,
+        }
+
+
+tile_store = TileStore()
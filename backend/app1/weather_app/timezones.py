@@ -0,0 +1,329 @@
+"""
+Offline Timezone Resolution
+
+Resolves (lat, lng) to an IANA timezone from a packed polygon index built from
+the timezone-boundary-builder dataset (see the build_timezone_index command),
+and computes the current UTC offset locally with zoneinfo. The Google Timezone
+API is only needed when no index has been built.
+
+Index file layout (little-endian), memory-mapped on first use:
+
+    header    magic "TZIX", version, cell size (degrees), counts
+    zones     newline-separated tzid names (decoded once)
+    polygons  zone id, first ring, ring count, bbox (per polygon)
+    rings     first point, point count (a polygon's first ring is its
+              exterior, the rest are holes)
+    points    float32 (lng, lat) pairs
+    grid      per-cell offsets into a flat list of polygon ids whose bbox
+              overlaps the cell
+
+A lookup reads one grid cell; cells lying entirely inside one polygon are marked
+at build time and answered without any geometry, otherwise candidates are checked
+by bounding box and then ray-casting point-in-polygon. Points outside every polygon
+(open sea, if the dataset has no ocean zones) get the nautical Etc/GMT zone.
+
+Usage:
+    from weather_app.timezones import resolve_timezone
+
+    data = resolve_timezone(lat, lng)   # {"time_zone": ..., "utc_offset": ...} or None
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TZIX"
+VERSION = 1
+DEFAULT_CELL_DEGREES = 1.0
+FULL_CELL = 0xFFFFFFFF   # grid sentinel: the cell lies entirely inside the preceding polygon
+
+# magic, version, reserved, cell degrees, zones bytes, polygons, rings, points, grid entries
+HEADER = struct.Struct("<4sHHfIIIII")
+POLYGON = struct.Struct("<HHII4f")   # zone id, reserved, first ring, ring count, bbox
+RING = struct.Struct("<II")          # first point, point count
+
+_index = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+class TimezoneIndex:
+    """Read-only view over a packed timezone polygon index."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = buf = memoryview(self._mmap)
+
+        (magic, version, _, self.cell_degrees, zones_bytes, n_polygons,
+         n_rings, n_points, n_grid_entries) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} timezone index")
+
+        offset = HEADER.size
+        self.zones = bytes(buf[offset:offset + zones_bytes]).decode("utf-8").split("\n")
+        offset += zones_bytes
+
+        self._polygons = buf[offset:offset + n_polygons * POLYGON.size]
+        offset += n_polygons * POLYGON.size
+        self._rings = buf[offset:offset + n_rings * RING.size]
+        offset += n_rings * RING.size
+
+        self.cols = int(round(360 / self.cell_degrees))
+        self.rows = int(round(180 / self.cell_degrees))
+        self._points = self._array("f", buf[offset:offset + n_points * 8])
+        offset += n_points * 8
+        n_cells = self.rows * self.cols
+        self._grid_offsets = self._array("I", buf[offset:offset + (n_cells + 1) * 4])
+        offset += (n_cells + 1) * 4
+        self._grid_entries = self._array("I", buf[offset:offset + n_grid_entries * 4])
+
+    @staticmethod
+    def _array(typecode, view):
+        """Zero-copy typed view on little-endian hosts; a byte-swapped copy otherwise."""
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+        values = array(typecode, bytes(view))
+        values.byteswap()
+        return values
+
+    def _cell(self, lat, lng):
+        row = min(int((lat + 90) / self.cell_degrees), self.rows - 1)
+        col = min(int((lng + 180) / self.cell_degrees), self.cols - 1)
+        return row * self.cols + col
+
+    def _ring_contains(self, ring, lat, lng):
+        start, count = RING.unpack_from(self._rings, ring * RING.size)
+        points = self._points
+        inside = False
+        j = start + count - 1
+        for i in range(start, start + count):
+            xi, yi = points[2 * i], points[2 * i + 1]
+            xj, yj = points[2 * j], points[2 * j + 1]
+            if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+        return inside
+
+    def _polygon_contains(self, polygon, lat, lng):
+        zone, _, first_ring, ring_count, min_lng, min_lat, max_lng, max_lat = POLYGON.unpack_from(
+            self._polygons, polygon * POLYGON.size
+        )
+        if not (min_lng <= lng <= max_lng and min_lat <= lat <= max_lat):
+            return False
+        if not self._ring_contains(first_ring, lat, lng):
+            return False
+        return not any(
+            self._ring_contains(ring, lat, lng)
+            for ring in range(first_ring + 1, first_ring + ring_count)
+        )
+
+    def _zone_of(self, polygon):
+        return POLYGON.unpack_from(self._polygons, polygon * POLYGON.size)[0]
+
+    def lookup(self, lat, lng):
+        """
+        IANA zone name for a coordinate.
+
+        Returns:
+            tzid string (the nautical Etc/GMT zone outside every polygon)
+        """
+        cell = self._cell(lat, lng)
+        start, end = self._grid_offsets[cell], self._grid_offsets[cell + 1]
+        entries = self._grid_entries
+        if end - start == 2 and entries[start + 1] == FULL_CELL:
+            return self.zones[self._zone_of(entries[start])]
+        for i in range(start, end):
+            if self._polygon_contains(entries[i], lat, lng):
+                return self.zones[self._zone_of(entries[i])]
+        return nautical_zone(lng)
+
+    def close(self):
+        for view in (self._points, self._grid_offsets, self._grid_entries,
+                     self._polygons, self._rings, self._buf):
+            if isinstance(view, memoryview):
+                view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A lookup on another thread still holds a view; the map is freed with it
+            pass
+
+
+def nautical_zone(lng):
+    """Etc/GMT zone for open sea (note the POSIX sign inversion)."""
+    hours = int(round(lng / 15.0))
+    if hours == 0:
+        return "Etc/GMT"
+    return f"Etc/GMT{-hours:+d}"
+
+
+def get_index() -> Optional[TimezoneIndex]:
+    """The process-wide index, loaded on first use (None if not built)."""
+    global _index, _index_loaded
+    if _index_loaded:
+        return _index
+    with _index_lock:
+        if not _index_loaded:
+            path = getattr(settings, "TIMEZONE_INDEX_PATH", "")
+            if path and os.path.exists(path):
+                try:
+                    _index = TimezoneIndex(path)
+                    logger.info(f"Loaded timezone index {path} ({len(_index.zones)} zones)")
+                except (OSError, ValueError, struct.error) as e:
+                    logger.error(f"Could not load timezone index {path}: {e}")
+            _index_loaded = True
+    return _index
+
+
+def reset_index() -> None:
+    """Drop the loaded index so the next lookup reloads it (tests, rebuilds)."""
+    global _index, _index_loaded
+    with _index_lock:
+        if _index is not None:
+            _index.close()
+        _index = None
+        _index_loaded = False
+
+
+def resolve_timezone(lat, lng, when=None) -> Optional[dict]:
+    """
+    Timezone and UTC offset (now, or at `when`) for a coordinate, without network calls.
+
+    Returns:
+        {"time_zone": tzid, "utc_offset": seconds, "source": "offline"}, or None
+        if no index is available
+    """
+    index = get_index()
+    if index is None:
+        return None
+    tzid = index.lookup(lat, lng)
+    try:
+        zone = ZoneInfo(tzid)
+        offset = (datetime.now(zone) if when is None else when.astimezone(zone)).utcoffset()
+    except ZoneInfoNotFoundError:
+        logger.warning(f"Timezone {tzid} missing from the tz database")
+        return None
+    return {"time_zone": tzid, "utc_offset": int(offset.total_seconds()), "source": "offline"}
+
+
+# ==================== BUILDING ====================
+
+def _polygons_of(geometry) -> List[List[List[Tuple[float, float]]]]:
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _full_cells(rings, row_range, col_range, cell_degrees):
+    """
+    Grid cells lying entirely inside a polygon: cells no ring edge passes
+    through whose centre is inside (even-odd over exterior and holes).
+    """
+    touched = set()
+    edges = []
+    for ring in rings:
+        for (x1, y1, *_), (x2, y2, *_) in zip(ring, ring[1:] + ring[:1]):
+            edges.append((x1, y1, x2, y2))
+            for row in range(int((min(y1, y2) + 90) // cell_degrees), int((max(y1, y2) + 90) // cell_degrees) + 1):
+                for col in range(int((min(x1, x2) + 180) // cell_degrees), int((max(x1, x2) + 180) // cell_degrees) + 1):
+                    touched.add((row, col))
+
+    full = []
+    for row in row_range:
+        y = (row + 0.5) * cell_degrees - 90
+        crossings = sorted(
+            x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            for x1, y1, x2, y2 in edges
+            if (y1 > y) != (y2 > y)
+        )
+        for col in col_range:
+            if (row, col) in touched:
+                continue
+            x = (col + 0.5) * cell_degrees - 180
+            if bisect.bisect(crossings, x) % 2:
+                full.append(row * round(360 / cell_degrees) + col)
+    return full
+
+
+def build_index(features: Iterable[dict], path, cell_degrees: float = DEFAULT_CELL_DEGREES) -> dict:
+    """
+    Pack GeoJSON timezone features ({"properties": {"tzid": ...}, "geometry": ...})
+    into an index file at path.
+
+    Returns:
+        Counts of zones, polygons, rings and points written
+    """
+    zones, zone_ids = [], {}
+    polygons, rings, points = [], [], array("f")
+    cols, rows = int(round(360 / cell_degrees)), int(round(180 / cell_degrees))
+    grid = [[] for _ in range(rows * cols)]
+    full = {}  # cell -> polygon covering all of it
+
+    for feature in features:
+        tzid = feature["properties"]["tzid"]
+        zone = zone_ids.setdefault(tzid, len(zone_ids))
+        if zone == len(zones):
+            zones.append(tzid)
+        for polygon_rings in _polygons_of(feature["geometry"]):
+            exterior = polygon_rings[0]
+            lngs = [p[0] for p in exterior]
+            lats = [p[1] for p in exterior]
+            bbox = (min(lngs), min(lats), max(lngs), max(lats))
+            polygon_id = len(polygons)
+            polygons.append((zone, len(rings), len(polygon_rings), bbox))
+            for ring in polygon_rings:
+                rings.append((len(points) // 2, len(ring)))
+                for point in ring:
+                    points.extend((point[0], point[1]))
+
+            col_lo = max(0, int((bbox[0] + 180) // cell_degrees))
+            col_hi = min(cols - 1, int((bbox[2] + 180) // cell_degrees))
+            row_lo = max(0, int((bbox[1] + 90) // cell_degrees))
+            row_hi = min(rows - 1, int((bbox[3] + 90) // cell_degrees))
+            for row in range(row_lo, row_hi + 1):
+                for col in range(col_lo, col_hi + 1):
+                    grid[row * cols + col].append(polygon_id)
+            for cell in _full_cells(polygon_rings, range(row_lo, row_hi + 1),
+                                    range(col_lo, col_hi + 1), cell_degrees):
+                full[cell] = polygon_id
+
+    zones_blob = "\n".join(zones).encode("utf-8")
+    grid_offsets, grid_entries = array("I", [0]), array("I")
+    for index, cell in enumerate(grid):
+        # Zones don't overlap, so a covered cell needs no other candidates
+        grid_entries.extend((full[index], FULL_CELL) if index in full else cell)
+        grid_offsets.append(len(grid_entries))
+    if sys.byteorder != "little":
+        for values in (points, grid_offsets, grid_entries):
+            values.byteswap()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, cell_degrees, len(zones_blob), len(polygons),
+                            len(rings), len(points) // 2, len(grid_entries)))
+        f.write(zones_blob)
+        for zone, first_ring, ring_count, bbox in polygons:
+            f.write(POLYGON.pack(zone, 0, first_ring, ring_count, *bbox))
+        for start, count in rings:
+            f.write(RING.pack(start, count))
+        f.write(points.tobytes())
+        f.write(grid_offsets.tobytes())
+        f.write(grid_entries.tobytes())
+    os.replace(tmp_path, path)
+
+    return {"zones": len(zones), "polygons": len(polygons), "rings": len(rings), "points": len(points) // 2}
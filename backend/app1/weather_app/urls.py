@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
     WeatherView,
+    BatchWeatherView,
     WeatherAPIStatusView,
     PlaceSuggestionsView,
     SavedLocationListCreateView,
@@ -15,6 +16,7 @@ from .proxy_views import (
     GeoapifyPlacesProxyView,
     OpenWeatherProxyView,
     OpenWeatherTileProxyView,
+    WeatherTileProxyView,
     WAQIProxyView,
     MapboxGeocodingProxyView,
     MapTileConfigView,
@@ -22,6 +24,7 @@ from .proxy_views import (
 
 urlpatterns = [
     path("weather/", WeatherView.as_view(), name="weather_view"),
+    path("weather/batch/", BatchWeatherView.as_view(), name="weather_batch"),
     path(
         "weather/api-status/", WeatherAPIStatusView.as_view(), name="weather_api_status"
     ),
@@ -76,6 +79,11 @@ urlpatterns = [
         OpenWeatherTileProxyView.as_view(),
         name="proxy_tile_url",
     ),
+    path(
+        "proxy/tiles/<slug:layer>/<int:z>/<int:x>/<int:y>.png",
+        WeatherTileProxyView.as_view(),
+        name="proxy_tile",
+    ),
     path(
         "proxy/waqi/",
         WAQIProxyView.as_view(),
@@ -1,8 +1,9 @@
 import requests
 import hashlib
 import logging
+import time
 from django.conf import settings
-from django.core.cache import cache
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.views import APIView
 
 from .weather_codes import weather_code_descriptions
@@ -12,10 +13,40 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from .weather_codes import weather_code_descriptions
 from .models import SavedLocation
-from .serializers import SavedLocationSerializer, SavedLocationReorderSerializer
+from .serializers import (
+    BatchWeatherRequestSerializer,
+    SavedLocationSerializer,
+    SavedLocationReorderSerializer,
+)
 from .services import weather_service
 from datetime import datetime, timedelta, timezone
-from app1.cache_utils import cached_api_view, CacheableMixin, generate_cache_key
+from app1.cache_utils import (
+    CacheableMixin,
+    generate_cache_key,
+    get_many,
+    get_or_revalidate,
+    schedule_revalidation,
+    Uncached,
+)
+from app1.fanout import fan_out
+from .autocomplete import autocomplete_cache
+from .geocoding import geocode_store
+from .grid import snap
+from .prefetch import record_access
+from .tiles import tile_store
+from .timezones import resolve_timezone
+from .normalization import (
+    COLUMNAR,
+    build_time_index,
+    closest_row,
+    index_series,
+    series_column,
+    series_row,
+    to_columnar_layout,
+    to_row_layout,
+)
+from app1.http_client import http_get
+from app1.cache_metrics import metered_get, metered_set
 
 logger = logging.getLogger(__name__)
 
@@ -90,8 +121,9 @@ class SavedLocationSetPrimaryView(APIView):
 
 
 class PlaceSuggestionsView(APIView):
-    """Get location suggestions from Google Places API with input validation."""
+    """Get location suggestions from Google Places API with input validation and prefix caching."""
     permission_classes = [AllowAny]
+    UPSTREAM_LIMIT = 5  # Places Autocomplete returns at most 5 predictions
 
     def get(self, request):
         user_input = request.query_params.get("input", "").strip()
@@ -135,18 +167,27 @@ class PlaceSuggestionsView(APIView):
         encoded_input = quote(user_input)
         url = f"https://maps.googleapis.com/maps/api/place/autocomplete/json?input={encoded_input}&types=geocode&key={settings.GOOGLE_API_KEY}"
 
-        try:
-            response = requests.get(url, timeout=10)
+        def fetch():
+            response = http_get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             predictions = data.get("predictions", [])
-            suggestions = [
+            return [
                 {
                     "description": prediction["description"],
                     "place_id": prediction["place_id"],
                 }
                 for prediction in predictions[:10]  # Limit to 10 suggestions
             ]
+
+        try:
+            suggestions = autocomplete_cache.get_or_fetch(
+                "place_suggestions",
+                user_input,
+                fetch,
+                limit=self.UPSTREAM_LIMIT,
+                match=lambda suggestion: suggestion["description"],
+            )
             return Response({"suggestions": suggestions}, status=status.HTTP_200_OK)
 
         except requests.exceptions.Timeout:
@@ -161,6 +202,15 @@ class PlaceSuggestionsView(APIView):
             )
 
 
+class LayoutContentNegotiation(DefaultContentNegotiation):
+    """Treats ?format=columnar as a JSON payload layout rather than a renderer."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        if request.query_params.get(self.settings.URL_FORMAT_OVERRIDE) == COLUMNAR:
+            format_suffix = "json"
+        return super().select_renderer(request, renderers, format_suffix)
+
+
 class WeatherView(APIView):
     """
     Weather API endpoint with multi-API fallbacks and intelligent caching.
@@ -177,16 +227,21 @@ class WeatherView(APIView):
     
     Caching Strategy:
     - Weather data cached for 5-15 minutes depending on type
-    - Geocode/timezone cached for 24 hours (static data)
+    - Geocodes persisted in the GeocodeEntry table behind an in-process LRU
+    - Timezones resolved offline, or cached for 24 hours from Google
     - Cache keys based on location coordinates
+    - Combined payload cached with columnar hourly/daily/minutely_15 series;
+      ?format=columnar returns them as-is, otherwise they are expanded to rows
     """
     permission_classes = [AllowAny]
+    content_negotiation_class = LayoutContentNegotiation
 
     # Cache TTLs (in seconds)
-    GEOCODE_CACHE_TTL = settings.CACHE_TTL.get("weather_geocode", 86400)  # 24 hours
     TIMEZONE_CACHE_TTL = settings.CACHE_TTL.get("weather_timezone", 86400)  # 24 hours
     WEATHER_CACHE_TTL = settings.CACHE_TTL.get("weather_forecast", 900)  # 15 minutes
     COMBINED_CACHE_TTL = settings.WEATHER_CACHE_TTL.get("forecast", 900)
+    COMBINED_STALE_TTL = getattr(settings, "CACHE_STALE_TTL", {}).get("weather_combined", 0)
+    UPSTREAM_DEADLINE = 12  # seconds before a cold request answers with whatever sections arrived
 
     # Lightweight server-side mapping for background videos (aligns with frontend assets)
     VIDEO_MAP = {
@@ -237,75 +292,46 @@ class WeatherView(APIView):
             return mapping.get("day" if is_day else "night") or mapping.get("day")
         return mapping
 
-    def _find_closest_by_time(self, entries):
+    def _find_closest_by_time(self, entries, indexed=None):
+        """
+        Entry of a series (rows or columnar) whose time is closest to now.
+
+        Args:
+            indexed: The series' entry in the payload's time index (built here if absent)
+        """
         if not entries:
             return None
-        now = datetime.now(timezone.utc)
-        best = None
-        best_diff = None
-        for item in entries:
-            t_str = item.get("time") or item.get("timestamp") or item.get("dt")
-            if not t_str:
-                continue
-            try:
-                # datetime.fromisoformat handles offset-aware strings; fallback to parse naive
-                parsed = datetime.fromisoformat(t_str.replace("Z", "+00:00"))
-            except Exception:
-                try:
-                    parsed = datetime.strptime(t_str, "%Y-%m-%d %H:%M")
-                except Exception:
-                    continue
-            if parsed.tzinfo is None:
-                parsed = parsed.replace(tzinfo=timezone.utc)
-            diff = abs((parsed - now).total_seconds())
-            if best_diff is None or diff < best_diff:
-                best_diff = diff
-                best = item
-        return best or entries[0]
-
-    def _compute_is_day(self, current, daily, time_zone_data):
+        if indexed is None:
+            indexed = index_series(entries)
+        return series_row(entries, closest_row(indexed, time.time()) or 0)
+
+    def _compute_is_day(self, current, time_index):
         if current and "is_day" in current:
             return 1 if current.get("is_day") else 0
 
-        tzid = None
-        if time_zone_data:
-            tzid = time_zone_data.get("time_zone") or time_zone_data.get("timezone")
-        tz = timezone.utc
-        if tzid:
-            try:
-                # Python 3.9+ standard library
-                from zoneinfo import ZoneInfo
-
-                tz = ZoneInfo(tzid)
-            except Exception:
-                tz = timezone.utc
-
-        try:
-            now = datetime.now(tz)
-            if daily:
-                today = daily[0]
-                sunrise = today.get("sunrise")
-                sunset = today.get("sunset")
-                if sunrise and sunset:
-                    sunrise_dt = datetime.fromisoformat(sunrise.replace("Z", "+00:00"))
-                    sunset_dt = datetime.fromisoformat(sunset.replace("Z", "+00:00"))
-                    if sunrise_dt.tzinfo is None:
-                        sunrise_dt = sunrise_dt.replace(tzinfo=timezone.utc)
-                    if sunset_dt.tzinfo is None:
-                        sunset_dt = sunset_dt.replace(tzinfo=timezone.utc)
-                    sunrise_local = sunrise_dt.astimezone(tz)
-                    sunset_local = sunset_dt.astimezone(tz)
-                    return 1 if sunrise_local <= now <= sunset_local else 0
-        except Exception:
-            pass
+        sunrise = time_index.get("sunrise")
+        sunset = time_index.get("sunset")
+        if sunrise is not None and sunset is not None:
+            return 1 if sunrise <= time.time() <= sunset else 0
         return 1
 
-    def _compute_ui_meta(self, weather_data, time_zone_data=None):
+    def _compute_ui_meta(self, weather_data, time_index=None):
+        """
+        Current condition, day/night, background video and heatbar range.
+
+        Args:
+            time_index: build_time_index(weather_data), as stored in the cached payload
+        """
         hourly = weather_data.get("hourly") or []
         minutely = weather_data.get("minutely_15") or []
         daily = weather_data.get("daily") or []
+        if time_index is None:
+            time_index = build_time_index(weather_data)
 
-        current = self._find_closest_by_time(hourly) or self._find_closest_by_time(minutely) or (hourly[0] if hourly else (minutely[0] if minutely else None))
+        current = (
+            self._find_closest_by_time(hourly, time_index.get("hourly"))
+            or self._find_closest_by_time(minutely, time_index.get("minutely_15"))
+        )
         # `weather_code` may be either a numeric WMO code (int) or an already
         # human-readable description (string) depending on which upstream API
         # produced the data. Handle both.
@@ -323,12 +349,14 @@ class WeatherView(APIView):
             else:
                 # Assume it's already a description string
                 condition = str(raw_weather_code)
-        is_day = self._compute_is_day(current, daily, time_zone_data)
+        is_day = self._compute_is_day(current, time_index)
 
         temps = [
-            (d.get("min_temperature"), d.get("max_temperature"))
-            for d in daily
-            if d.get("min_temperature") is not None and d.get("max_temperature") is not None
+            (low, high)
+            for low, high in zip(
+                series_column(daily, "min_temperature"), series_column(daily, "max_temperature")
+            )
+            if low is not None and high is not None
         ]
         if temps:
             min_vals = [t[0] for t in temps]
@@ -357,24 +385,30 @@ class WeatherView(APIView):
     def _get_cache_key(self, prefix, *args):
         """Generate a cache key from prefix and arguments"""
         key_string = f"{prefix}:{':'.join(str(a) for a in args)}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        return f"{prefix}:{hashlib.md5(key_string.encode()).hexdigest()}"
 
     def get_coordinates(self, location):
-        """Get coordinates from Google Geocoding with caching"""
-        cache_key = self._get_cache_key("geocode", location.lower())
-        cached = cache.get(cache_key)
-        if cached:
-            logger.info(f"Geocode cache hit for {location}")
-            return cached
+        """Get coordinates from the persistent geocode store, falling back to Google Geocoding"""
+        coords = geocode_store.get(location)
+        if coords:
+            logger.info(f"Geocode store hit for {location}")
+            return coords
 
         url = f"https://maps.googleapis.com/maps/api/geocode/json?address={location}&key={settings.GOOGLE_API_KEY}"
         try:
-            response = requests.get(url, timeout=10)
+            response = http_get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             if data["results"]:
-                coords = data["results"][0]["geometry"]["location"]
-                cache.set(cache_key, coords, self.GEOCODE_CACHE_TTL)
+                result = data["results"][0]
+                coords = result["geometry"]["location"]
+                geocode_store.put(
+                    location,
+                    coords["lat"],
+                    coords["lng"],
+                    result.get("place_id", ""),
+                    result.get("formatted_address", ""),
+                )
                 return coords
             else:
                 logger.warning(f"No results found for location: {location}")
@@ -382,11 +416,20 @@ class WeatherView(APIView):
             logger.error(f"Error in get_coordinates: {e}")
         return None
 
+    def timezone_cache_key(self, lat, lng):
+        """Cache key of the timezone grid cell containing (lat, lng)."""
+        return self._get_cache_key("timezone", snap(lat, lng, "timezone").key)
+
     def get_time_zone(self, lat, lng):
-        """Get timezone from Google Timezone API with caching"""
-        # Round coordinates for cache key (timezone doesn't vary by minor coord changes)
-        cache_key = self._get_cache_key("timezone", round(lat, 2), round(lng, 2))
-        cached = cache.get(cache_key)
+        """Get timezone from the offline index, falling back to the Google Timezone API with caching"""
+        # Resolved locally (exact point, current offset) when the index is built
+        time_zone_data = resolve_timezone(lat, lng)
+        if time_zone_data:
+            return time_zone_data
+
+        # Snap to the timezone grid (~25km): timezones don't vary by minor coord changes
+        cache_key = self.timezone_cache_key(lat, lng)
+        cached = metered_get(cache_key)
         if cached:
             logger.info(f"Timezone cache hit for {lat}, {lng}")
             return cached
@@ -394,7 +437,7 @@ class WeatherView(APIView):
         timestamp = int(datetime.now().timestamp())
         url = f"https://maps.googleapis.com/maps/api/timezone/json?location={lat},{lng}&timestamp={timestamp}&key={settings.GOOGLE_API_KEY}"
         try:
-            response = requests.get(url, timeout=10)
+            response = http_get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -408,9 +451,10 @@ class WeatherView(APIView):
             time_zone_data = {
                 "time_zone": time_zone_id,
                 "utc_offset": total_offset,
+                "source": "Google",
             }
 
-            cache.set(cache_key, time_zone_data, self.TIMEZONE_CACHE_TTL)
+            metered_set(cache_key, time_zone_data, self.TIMEZONE_CACHE_TTL)
             return time_zone_data
 
         except requests.exceptions.RequestException as e:
@@ -492,72 +536,254 @@ class WeatherView(APIView):
             )
 
         lat, lng = coordinates["lat"], coordinates["lng"]
+        record_access(lat, lng)
+
+        cache_key = self.combined_cache_key(lat, lng)
+        # Concurrent misses for the same location wait for one upstream fan-out
+        # (single-flight); expired entries are served stale while refreshed in the background.
+        # Partial payloads (some sections failed) are returned with an "errors" map, uncached.
+        errors = {}
+        combined_data, cache_state, age = get_or_revalidate(
+            cache_key,
+            lambda: self._build_combined_data(lat, lng, coordinates, errors),
+            self.COMBINED_CACHE_TTL,
+            self.COMBINED_STALE_TTL,
+        )
+        if combined_data is None:
+            return Response(
+                {"error": errors.get("error", "Could not retrieve weather data")},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
-        cache_key = generate_cache_key(
-            "weather_combined",
-            round(lat, 3),
-            round(lng, 3),
+        combined_data = self.present(
+            combined_data, coordinates, cache_state, request.query_params.get("format") == COLUMNAR
         )
-        cached_combined = cache.get(cache_key)
-        if cached_combined:
-            # Recompute UI meta so day/night and video change immediately without waiting for cache expiry
+
+        # Add HTTP cache headers
+        response = Response(combined_data, status=status.HTTP_200_OK)
+        response['Cache-Control'] = f'public, max-age={self.WEATHER_CACHE_TTL}'
+        response['Vary'] = 'Accept'
+        response['X-Cache'] = cache_state
+        if cache_state != "MISS":
+            response['Age'] = str(age)
+        return response
+
+    def present(self, combined_data, coordinates, cache_state, columnar=False):
+        """Shape a (possibly cached) combined payload for one caller."""
+        if cache_state != "MISS":
+            # Recompute UI meta so day/night and video change immediately without waiting for cache expiry;
+            # the stored time index makes this a couple of bisects (entries cached before it existed build one)
             try:
-                weather_data_cached = cached_combined.get("weather_data") or {}
-                tz_data_cached = cached_combined.get("time_zone_data") or {}
-                cached_combined = {
-                    **cached_combined,
-                    "ui_meta": self._compute_ui_meta(weather_data_cached, tz_data_cached),
+                combined_data = {
+                    **combined_data,
+                    "ui_meta": self._compute_ui_meta(
+                        combined_data.get("weather_data") or {}, combined_data.get("time_index")
+                    ),
                 }
             except Exception:
                 pass
+        combined_data = {key: value for key, value in combined_data.items() if key != "time_index"}
+
+        # The entry is shared by the whole grid cell: echo the caller's own coordinates
+        if columnar:
+            return {
+                **combined_data,
+                "coordinates": coordinates,
+                "weather_data": to_columnar_layout(combined_data.get("weather_data")),
+                "layout": COLUMNAR,
+            }
+        return {
+            **combined_data,
+            "coordinates": coordinates,
+            "weather_data": to_row_layout(combined_data.get("weather_data")),
+        }
 
-            response = Response(cached_combined, status=status.HTTP_200_OK)
-            response['Cache-Control'] = f'public, max-age={self.WEATHER_CACHE_TTL}'
-            response['Vary'] = 'Accept'
-            return response
+    @staticmethod
+    def combined_cache_key(lat, lng):
+        """Cache key of the combined payload for a location (forecast grid cell)."""
+        return generate_cache_key(snap(lat, lng, "forecast").key, prefix="weather_combined")
 
-        time_zone_data = self.get_time_zone(lat, lng)
-        if time_zone_data is None:
-            return Response(
-                {"error": "Could not retrieve time zone data"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+    def _build_combined_data(self, lat, lng, coordinates, errors):
+        """
+        Fetch forecast, AQI/UV and timezone concurrently and assemble the payload.
 
-        air_uv_data = self.get_air_uv(lat, lng)
-        if air_uv_data is None:
-            return Response(
-                {"error": "Could not retrieve air quality and UV data"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+        Sections that fail or miss UPSTREAM_DEADLINE are None and listed under
+        "errors"; such partial payloads are returned Uncached so they are served
+        but not stored. Returns None and sets errors["error"] if every section failed.
+        """
+        results, section_errors = fan_out(
+            {
+                "weather_data": lambda: self.get_weather_data(lat, lng),
+                "air_uv_data": lambda: self.get_air_uv(lat, lng),
+                "time_zone_data": lambda: self.get_time_zone(lat, lng),
+            },
+            timeout=self.UPSTREAM_DEADLINE,
+        )
+        if not results:
+            errors["error"] = "Could not retrieve weather data"
+            return None
 
-        weather_data = self.get_weather_data(lat, lng)
-        if weather_data is None:
-            return Response(
-                {"error": "Could not retrieve weather data"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+        time_zone_data = results.get("time_zone_data")
+        air_uv_data = results.get("air_uv_data")
+        # Stored compactly; expanded to rows per request unless ?format=columnar
+        weather_data = to_columnar_layout(results.get("weather_data"))
+
+        time_index = build_time_index(weather_data)
+        try:
+            ui_meta = self._compute_ui_meta(weather_data or {}, time_index)
+        except Exception:
+            ui_meta = None
 
         combined_data = {
             "time_zone_data": time_zone_data,
             "coordinates": coordinates,
             "air_uv_data": air_uv_data,
             "weather_data": weather_data,
-            "ui_meta": self._compute_ui_meta(weather_data, time_zone_data),
+            "ui_meta": ui_meta,
+            "time_index": time_index,   # internal; stripped by present()
             "data_sources": {
-                "weather": weather_data.get("source", "Unknown"),
-                "air_quality": air_uv_data.get("source", "Unknown"),
+                "weather": (weather_data or {}).get("source", "Unknown"),
+                "air_quality": (air_uv_data or {}).get("source", "Unknown"),
                 "geocoding": "Google",
-                "timezone": "Google",
+                "timezone": "Offline" if (time_zone_data or {}).get("source") == "offline" else "Google",
             },
         }
+        if section_errors:
+            logger.warning(f"Partial weather payload for {lat}, {lng}: {section_errors}")
+            combined_data["errors"] = section_errors
+            return Uncached(combined_data)
+        return combined_data
 
-        cache.set(cache_key, combined_data, timeout=self.COMBINED_CACHE_TTL)
 
-        # Add HTTP cache headers
-        response = Response(combined_data, status=status.HTTP_200_OK)
-        response['Cache-Control'] = f'public, max-age={self.WEATHER_CACHE_TTL}'
-        response['Vary'] = 'Accept'
-        return response
+class BatchWeatherView(APIView):
+    """
+    Weather for several locations in one request.
+    POST /api/weather/batch/
+
+    Expects JSON body:
+    {
+        "coordinates": [{"lat": 29.76, "lng": -95.37}, ...],
+        "location_ids": [3, 7],        # the user's SavedLocation IDs
+        "format": "rows" | "columnar"   # optional, as ?format= on /api/weather/
+    }
+
+    Cached combined payloads are read with one get_many, expired ones served stale
+    while they refresh in the background. For the rest, forecasts
+    missing from the cache are fetched together in one multi-location Open-Meteo
+    request; AQI/UV, timezone and any forecast Open-Meteo couldn't answer then go
+    through the per-location chain of WeatherView, concurrently.
+
+    Returns:
+        {"results": [{"id"?, "coordinates", "cache", ...payload} | {"coordinates", "error"}]}
+        in request order (coordinates first, then location_ids)
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = BatchWeatherRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        requested = [(None, point["lat"], point["lng"]) for point in data["coordinates"]]
+        if data["location_ids"]:
+            if not request.user.is_authenticated:
+                return Response(
+                    {"error": "Authentication required for location_ids"},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+            saved = {
+                location.id: location
+                for location in SavedLocation.objects.filter(
+                    user=request.user, id__in=data["location_ids"]
+                )
+            }
+            missing = [pk for pk in data["location_ids"] if pk not in saved]
+            if missing:
+                return Response(
+                    {"error": f"Unknown location IDs: {missing}"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            requested += [
+                (pk, float(saved[pk].latitude), float(saved[pk].longitude))
+                for pk in data["location_ids"]
+            ]
+
+        view = WeatherView()
+        payloads = self._combined_payloads(view, [(lat, lng) for _, lat, lng in requested])
+
+        results = []
+        for pk, lat, lng in requested:
+            coordinates = {"lat": lat, "lng": lng}
+            combined_data, cache_state = payloads.get(view.combined_cache_key(lat, lng), (None, None))
+            if combined_data is None:
+                entry = {"coordinates": coordinates, "error": "Could not retrieve weather data"}
+            else:
+                record_access(lat, lng)
+                entry = {
+                    **view.present(combined_data, coordinates, cache_state, data["format"] == COLUMNAR),
+                    "cache": cache_state,
+                }
+            if pk is not None:
+                entry = {"id": pk, **entry}
+            results.append(entry)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    def _combined_payloads(self, view, points):
+        """
+        Combined payloads per cache key: cached entries from one get_many (expired
+        ones served stale and refreshed in the background, as WeatherView does),
+        the rest built after one batched forecast fetch.
+
+        Returns:
+            Dict of cache key -> (payload or None, "HIT" | "STALE" | "MISS")
+        """
+        keys = {}
+        for lat, lng in points:
+            keys.setdefault(view.combined_cache_key(lat, lng), (lat, lng))
+
+        now = time.time()
+        payloads = {}
+        for key, envelope in get_many(list(keys)).items():
+            if not isinstance(envelope, dict) or "expires_at" not in envelope:
+                continue
+            if envelope["expires_at"] > now:
+                payloads[key] = (envelope["value"], "HIT")
+            elif view.COMBINED_STALE_TTL:
+                lat, lng = keys[key]
+                schedule_revalidation(
+                    key,
+                    lambda lat=lat, lng=lng: view._build_combined_data(lat, lng, {"lat": lat, "lng": lng}, {}),
+                    view.COMBINED_CACHE_TTL,
+                    view.COMBINED_STALE_TTL,
+                )
+                payloads[key] = (envelope["value"], "STALE")
+
+        misses = {key: point for key, point in keys.items() if key not in payloads}
+        if not misses:
+            return payloads
+
+        # Warm the forecast cells in one upstream call; each build below then reads them from cache
+        weather_service.get_weather_data_many(list(misses.values()))
+
+        def build(lat, lng):
+            errors = {}
+            combined_data, cache_state, _ = get_or_revalidate(
+                view.combined_cache_key(lat, lng),
+                lambda: view._build_combined_data(lat, lng, {"lat": lat, "lng": lng}, errors),
+                view.COMBINED_CACHE_TTL,
+                view.COMBINED_STALE_TTL,
+            )
+            return combined_data, cache_state
+
+        built, _ = fan_out(
+            {key: lambda lat=lat, lng=lng: build(lat, lng) for key, (lat, lng) in misses.items()},
+            timeout=view.UPSTREAM_DEADLINE,
+        )
+        payloads.update(built)
+        return payloads
 
 
 class WeatherAPIStatusView(APIView):
@@ -568,13 +794,15 @@ class WeatherAPIStatusView(APIView):
 
     permission_classes = [AllowAny]
     
-    @cached_api_view(ttl=3600, key_prefix="weather_status")  # 1 hour cache
-
+    # Not cached: circuit and quota state are read live from the shared cache
     def get(self, request):
         api_status = weather_service.get_api_status()
         return Response(
             {
                 "apis": api_status,
+                "geocode_store": geocode_store.status(),
+                "autocomplete_cache": autocomplete_cache.status(),
+                "tile_store": tile_store.status(),
                 "architecture": {
                     "weather": {
                         "primary": "Open-Meteo (unlimited free)",
@@ -594,7 +822,7 @@ class WeatherAPIStatusView(APIView):
                         "places": "Google Places Autocomplete",
                     },
                     "map_tiles": {
-                        "provider": "OpenWeatherMap",
+                        "provider": "OpenWeatherMap (via on-disk tile proxy)",
                         "layers": [
                             "precipitation",
                             "temperature",
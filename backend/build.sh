@@ -16,4 +16,11 @@ python manage.py migrate --noinput
 # Collect static files
 python manage.py collectstatic --noinput
 
+# Build the offline timezone index. Without it every cold weather request calls
+# the Google Timezone API, so a failed build fails the deploy. Override
+# TIMEZONE_BOUNDARIES_URL to pin another timezone-boundary-builder release (or a
+# mirror); the features are streamed, so a small build instance is enough.
+TIMEZONE_BOUNDARIES_URL="${TIMEZONE_BOUNDARIES_URL:-https://github.com/evansiroky/timezone-boundary-builder/releases/download/2024b/timezones-with-oceans.geojson.zip}"
+python manage.py build_timezone_index --source "$TIMEZONE_BOUNDARIES_URL"
+
 echo "Build completed successfully!"